@@ -0,0 +1,161 @@
+"""Инкрементальная агрегация результатов тренировок по пользователям.
+
+Итоги копятся по мере поступления результатов: за всё время и в
+скользящих окнах из дневных корзин (сутки, неделя). Обновление и запрос
+стоят O(1) - не больше числа дней в окне, - и не требуют пересчёта
+истории сырых пакетов.
+"""
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Deque, Dict, Hashable, Iterable, Optional, Tuple
+
+from homework import InfoMessage, Training
+
+# Ключ итогов по всем типам тренировок пользователя
+ALL_TYPES: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Totals:
+    """Накопленные итоги тренировок."""
+
+    count: int = 0
+    duration: float = 0.0
+    distance: float = 0.0
+    calories: float = 0.0
+
+    @property
+    def mean_speed(self) -> float:
+        """Средняя скорость за все тренировки, км/ч."""
+        return self.distance / self.duration if self.duration else 0.0
+
+    def add(self, info: InfoMessage) -> None:
+        """Учесть результат одной тренировки."""
+        self.count += 1
+        self.duration += info.duration
+        self.distance += info.distance
+        self.calories += info.calories
+
+    def merge(self, other: 'Totals') -> None:
+        """Прибавить итоги другого объекта."""
+        self.count += other.count
+        self.duration += other.duration
+        self.distance += other.distance
+        self.calories += other.calories
+
+
+class RollingWindow:
+    """Скользящее окно из дневных корзин длиной days дней."""
+
+    def __init__(self, days: int) -> None:
+        """Создать пустое окно длиной days дней."""
+        if days < 1:
+            raise ValueError('Окно должно быть не короче одного дня')
+        self.days = days
+        self.buckets: Deque[Tuple[int, Totals]] = deque()
+        self.total = Totals()
+
+    def evict(self, today: int) -> None:
+        """Выбросить корзины, выпавшие из окна к дню today."""
+        if not self.buckets or self.buckets[0][0] > today - self.days:
+            return
+        while self.buckets and self.buckets[0][0] <= today - self.days:
+            self.buckets.popleft()
+        # Итог пересобирается из оставшихся корзин, а не вычитанием,
+        # чтобы не копить ошибку округления
+        self.total = Totals()
+        for _, bucket in self.buckets:
+            self.total.merge(bucket)
+
+    def add(self, day: int, info: InfoMessage) -> None:
+        """Учесть результат за день day (номер дня по date.toordinal())."""
+        newest = self.buckets[-1][0] if self.buckets else day
+        if day <= newest - self.days:
+            return
+        self.evict(max(day, newest))
+        self.bucket(day).add(info)
+        self.total.add(info)
+
+    def bucket(self, day: int) -> Totals:
+        """Найти корзину дня или вставить пустую, сохраняя порядок дней."""
+        index = len(self.buckets)
+        while index and self.buckets[index - 1][0] > day:
+            index -= 1
+        if index and self.buckets[index - 1][0] == day:
+            return self.buckets[index - 1][1]
+        bucket = Totals()
+        self.buckets.insert(index, (day, bucket))
+        return bucket
+
+    def totals(self, today: int) -> Totals:
+        """Копия итогов окна, заканчивающегося днём today.
+
+        В итоги входят только корзины дней из (today - days, today];
+        само окно не меняется, корзины выбрасывает только add().
+        """
+        start = today - self.days
+        if (not self.buckets or self.buckets[0][0] > start
+                and self.buckets[-1][0] <= today):
+            return replace(self.total)
+        total = Totals()
+        for day, bucket in self.buckets:
+            if day > today:
+                break
+            if day > start:
+                total.merge(bucket)
+        return total
+
+
+class Aggregator:
+    """Итоги тренировок по пользователям и типам тренировок."""
+
+    WINDOWS: Dict[str, int] = {'daily': 1, 'weekly': 7}
+
+    def __init__(self, windows: Optional[Dict[str, int]] = None) -> None:
+        """Задать окна: имя -> длина в днях."""
+        self.windows = dict(windows or self.WINDOWS)
+        self.lifetime: Dict[Tuple[Hashable, Optional[str]], Totals] = {}
+        self.rolling: Dict[Tuple[Hashable, Optional[str], str],
+                           RollingWindow] = {}
+
+    def update(self, user_id: Hashable, day: date,
+               info: InfoMessage) -> None:
+        """Учесть результат тренировки пользователя за день day."""
+        ordinal = day.toordinal()
+        for training_type in (info.training_type, ALL_TYPES):
+            key = (user_id, training_type)
+            self.lifetime.setdefault(key, Totals()).add(info)
+            for name, days in self.windows.items():
+                window = self.rolling.get(key + (name,))
+                if window is None:
+                    window = self.rolling[key + (name,)] = RollingWindow(days)
+                window.add(ordinal, info)
+
+    def add_training(self, user_id: Hashable, day: date,
+                     training: Training) -> InfoMessage:
+        """Рассчитать тренировку и учесть её результат."""
+        info = training.show_training_info()
+        self.update(user_id, day, info)
+        return info
+
+    def extend(self, records: Iterable[Tuple[Hashable, date,
+                                             InfoMessage]]) -> None:
+        """Учесть поток результатов (пользователь, день, результат)."""
+        for user_id, day, info in records:
+            self.update(user_id, day, info)
+
+    def totals(self, user_id: Hashable,
+               training_type: Optional[str] = ALL_TYPES) -> Totals:
+        """Копия итогов пользователя за всё время."""
+        return replace(self.lifetime.get((user_id, training_type), Totals()))
+
+    def window(self, user_id: Hashable, name: str, today: date,
+               training_type: Optional[str] = ALL_TYPES) -> Totals:
+        """Копия итогов пользователя в окне name до дня today."""
+        if name not in self.windows:
+            raise KeyError(f'{name} является недопустимым окном')
+        window = self.rolling.get((user_id, training_type, name))
+        if window is None:
+            return Totals()
+        return window.totals(today.toordinal())
@@ -0,0 +1,113 @@
+"""Векторный расчёт тренировок пакетами на NumPy.
+
+Формулы повторяют методы классов из homework.py операция в операцию,
+поэтому результаты совпадают со скалярным расчётом до бита.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Sequence
+
+import numpy as np
+
+from homework import InfoMessage, Running, SportsWalking, Swimming
+
+
+@dataclass
+class BatchResult:
+    """Результаты расчёта пакета тренировок одного типа."""
+
+    training_type: str
+    duration: np.ndarray
+    distance: np.ndarray
+    speed: np.ndarray
+    calories: np.ndarray
+
+    def __len__(self) -> int:
+        """Число тренировок в пакете."""
+        return len(self.duration)
+
+    def messages(self) -> Iterator[InfoMessage]:
+        """Вернуть результаты в виде объектов InfoMessage."""
+        for row in zip(self.duration.tolist(), self.distance.tolist(),
+                       self.speed.tolist(), self.calories.tolist()):
+            yield InfoMessage(self.training_type, *row)
+
+
+def as_column(values: Sequence[float]) -> np.ndarray:
+    """Привести колонку данных датчиков к массиву float64."""
+    return np.asarray(values, dtype=np.float64)
+
+
+def running_batch(action: np.ndarray,
+                  duration: np.ndarray,
+                  weight: np.ndarray) -> BatchResult:
+    """Рассчитать пакет тренировок: бег."""
+    action, duration, weight = map(as_column, (action, duration, weight))
+    distance = action * Running.LEN_STEP / Running.M_IN_KM
+    speed = distance / duration
+    calories = ((Running.CALORIES_MEAN_SPEED_MULTIPLIER
+                * speed + Running.CALORIES_MEAN_SPEED_SHIFT)
+                * weight / Running.M_IN_KM
+                * duration * Running.MIN_IN_H)
+    return BatchResult(Running.__name__, duration, distance, speed, calories)
+
+
+def walking_batch(action: np.ndarray,
+                  duration: np.ndarray,
+                  weight: np.ndarray,
+                  height: np.ndarray) -> BatchResult:
+    """Рассчитать пакет тренировок: спортивная ходьба."""
+    action, duration, weight, height = map(
+        as_column, (action, duration, weight, height))
+    distance = action * SportsWalking.LEN_STEP / SportsWalking.M_IN_KM
+    speed = distance / duration
+    # float_power, в отличие от оператора **, вызывает тот же pow() из libm,
+    # что и float.__pow__, и не подменяет возведение в квадрат умножением.
+    calories = ((SportsWalking.CALORIES_WEIGHT_MULTIPLIER * weight
+                + (np.float_power(speed * SportsWalking.KMH_IN_MSEC, 2)
+                 / (height / SportsWalking.CM_IN_M))
+                * SportsWalking.CALORIES_SPEED_HEIGHT_MULTIPLIER
+                * weight) * duration
+                * SportsWalking.MIN_IN_H)
+    return BatchResult(SportsWalking.__name__,
+                       duration, distance, speed, calories)
+
+
+def swimming_batch(action: np.ndarray,
+                   duration: np.ndarray,
+                   weight: np.ndarray,
+                   length_pool: np.ndarray,
+                   count_pool: np.ndarray) -> BatchResult:
+    """Рассчитать пакет тренировок: плавание."""
+    action, duration, weight, length_pool, count_pool = map(
+        as_column, (action, duration, weight, length_pool, count_pool))
+    distance = action * Swimming.LEN_STEP / Swimming.M_IN_KM
+    speed = (length_pool * count_pool
+             / Swimming.M_IN_KM / duration)
+    calories = ((speed + Swimming.CALORIES_MEAN_SPEED_SHIFT)
+                * Swimming.CALORIES_WEIGHT_MULTIPLIER
+                * weight * duration)
+    return BatchResult(Swimming.__name__, duration, distance, speed, calories)
+
+
+BATCH_OF_TRAINING: Dict[str, Callable[..., BatchResult]] = {
+    'SWM': swimming_batch,
+    'RUN': running_batch,
+    'WLK': walking_batch,
+}
+
+
+def calculate_batch(workout_type: str,
+                    columns: Sequence[Sequence[float]]) -> BatchResult:
+    """Рассчитать пакет тренировок по колонкам данных датчиков.
+
+    Колонки идут в том же порядке, что и аргументы конструктора
+    соответствующего класса тренировки.
+    """
+    if workout_type not in BATCH_OF_TRAINING:
+        raise KeyError(f'{workout_type} является недопустимым значением')
+    return BATCH_OF_TRAINING[workout_type](*columns)
+
+
+def rows_to_columns(rows: Sequence[Sequence[float]]) -> np.ndarray:
+    """Преобразовать список пакетов одного типа в колонки."""
+    return np.asarray(rows, dtype=np.float64).T
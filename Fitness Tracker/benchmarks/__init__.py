@@ -0,0 +1 @@
+"""Бенчмарки фитнес-трекера; запускаются как модули: python -m."""
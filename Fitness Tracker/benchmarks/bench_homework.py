@@ -0,0 +1,203 @@
+"""Набор бенчмарков горячего пути фитнес-трекера.
+
+Для каждого размера (по умолчанию 1k и 100k пакетов, 10M - по запросу)
+генерируются синтетические пакеты каждого типа, и замеряется время
+read_package(), get_spent_calories(), show_training_info() и
+get_message(), а для сравнения - пакетного движка и render().
+Данные генерируются и замеряются кусками, поэтому 10M пакетов не
+требуют держать всё в памяти.
+
+Запуск из каталога проекта:
+    python -m benchmarks.bench_homework --sizes 1000 100000 10000000
+    python -m benchmarks.bench_homework --json result.json
+    python -m benchmarks.bench_homework --compare result.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from homework import read_package
+from render import render
+
+CHUNK_SIZE: int = 100_000
+SIZES: Tuple[int, ...] = (1_000, 100_000)
+# Во сколько раз результат может быть медленнее базового без тревоги
+THRESHOLD: float = 1.2
+
+
+def running_data(rng: random.Random) -> list:
+    """Синтетические данные бега."""
+    return [rng.randint(1000, 30000), rng.uniform(0.25, 3),
+            rng.uniform(45, 120)]
+
+
+def walking_data(rng: random.Random) -> list:
+    """Синтетические данные спортивной ходьбы."""
+    return running_data(rng) + [rng.uniform(150, 200)]
+
+
+def swimming_data(rng: random.Random) -> list:
+    """Синтетические данные плавания."""
+    return [rng.randint(100, 3000), rng.uniform(0.25, 3),
+            rng.uniform(45, 120), rng.choice((25, 50)),
+            rng.randint(10, 80)]
+
+
+GENERATORS: Dict[str, Callable[[random.Random], list]] = {
+    'RUN': running_data,
+    'WLK': walking_data,
+    'SWM': swimming_data,
+}
+
+
+def generate_packages(workout_type: str, count: int,
+                      seed: int = 0) -> Iterator[list]:
+    """Сгенерировать count пакетов одного типа кусками по CHUNK_SIZE."""
+    rng = random.Random(f'{workout_type}-{seed}')
+    generate = GENERATORS[workout_type]
+    while count > 0:
+        size = min(count, CHUNK_SIZE)
+        yield [generate(rng) for _ in range(size)]
+        count -= size
+
+
+def bench_read_package(workout_type: str, chunk: list) -> int:
+    """Время диспетчеризации и создания объектов тренировок."""
+    start = time.perf_counter_ns()
+    for data in chunk:
+        read_package(workout_type, data)
+    return time.perf_counter_ns() - start
+
+
+def bench_calories(workout_type: str, chunk: list) -> int:
+    """Время get_spent_calories() на готовых объектах."""
+    trainings = [read_package(workout_type, data) for data in chunk]
+    start = time.perf_counter_ns()
+    for training in trainings:
+        training.get_spent_calories()
+    return time.perf_counter_ns() - start
+
+
+def bench_show_training_info(workout_type: str, chunk: list) -> int:
+    """Время show_training_info() на свежих объектах."""
+    trainings = [read_package(workout_type, data) for data in chunk]
+    start = time.perf_counter_ns()
+    for training in trainings:
+        training.show_training_info()
+    return time.perf_counter_ns() - start
+
+
+def bench_get_message(workout_type: str, chunk: list) -> int:
+    """Время get_message() на готовых результатах."""
+    infos = [read_package(workout_type, data).show_training_info()
+             for data in chunk]
+    start = time.perf_counter_ns()
+    for info in infos:
+        info.get_message()
+    return time.perf_counter_ns() - start
+
+
+def bench_render(workout_type: str, chunk: list) -> int:
+    """Время пакетного render() на готовых результатах."""
+    infos = [read_package(workout_type, data).show_training_info()
+             for data in chunk]
+    start = time.perf_counter_ns()
+    render(infos)
+    return time.perf_counter_ns() - start
+
+
+def bench_batch(workout_type: str, chunk: list) -> int:
+    """Время пакетного движка на NumPy, включая сборку колонок."""
+    # NumPy нужен только этому бенчмарку
+    from batch import calculate_batch, rows_to_columns
+
+    start = time.perf_counter_ns()
+    calculate_batch(workout_type, rows_to_columns(chunk))
+    return time.perf_counter_ns() - start
+
+
+BENCHMARKS: Dict[str, Callable[[str, list], int]] = {
+    'read_package': bench_read_package,
+    'get_spent_calories': bench_calories,
+    'show_training_info': bench_show_training_info,
+    'get_message': bench_get_message,
+    'render': bench_render,
+    'batch': bench_batch,
+}
+
+
+def run(sizes: Tuple[int, ...], names: List[str],
+        seed: int = 0) -> List[dict]:
+    """Прогнать бенчмарки и вернуть строки результатов."""
+    results = []
+    for size in sizes:
+        for workout_type in GENERATORS:
+            for name in names:
+                total = 0
+                for chunk in generate_packages(workout_type, size, seed):
+                    total += BENCHMARKS[name](workout_type, chunk)
+                results.append({'benchmark': name,
+                                'workout_type': workout_type,
+                                'size': size,
+                                'ns_per_package': total / size})
+    return results
+
+
+def result_key(row: dict) -> Tuple[str, str, int]:
+    """Ключ для сопоставления строк результатов."""
+    return row['benchmark'], row['workout_type'], row['size']
+
+
+def compare(results: List[dict], baseline: List[dict],
+            threshold: float) -> List[str]:
+    """Найти бенчмарки, замедлившиеся относительно базовых сильнее порога."""
+    base = {result_key(row): row['ns_per_package'] for row in baseline}
+    regressions = []
+    for row in results:
+        before = base.get(result_key(row))
+        if before and row['ns_per_package'] > before * threshold:
+            regressions.append(
+                '{} {} {}: {:.0f} нс -> {:.0f} нс'.format(
+                    *result_key(row), before, row['ns_per_package']))
+    return regressions
+
+
+def print_table(results: List[dict]) -> None:
+    """Напечатать результаты таблицей."""
+    print(f'{"бенчмарк":<20}{"тип":<5}{"размер":>10}{"нс/пакет":>12}')
+    for row in results:
+        print(f'{row["benchmark"]:<20}{row["workout_type"]:<5}'
+              f'{row["size"]:>10}{row["ns_per_package"]:>12.0f}')
+
+
+def main() -> None:
+    """Главная функция."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS,
+                        default=list(BENCHMARKS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='сохранить результаты в файл')
+    parser.add_argument('--compare', help='файл с базовыми результатами')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    results = run(tuple(args.sizes), args.only, args.seed)
+    print_table(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f'Регрессия: {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Микробенчмарк производных метрик в show_training_info().
+
+Сравнивает классы из homework.py, где средняя скорость считается один
+раз и передаётся в формулу калорий, с прежним вариантом, в котором
+get_spent_calories() заново вызывал get_mean_speed() и get_distance().
+
+Запуск из каталога проекта: python -m benchmarks.bench_metrics [--number N]
+"""
+import argparse
+import cProfile
+import pstats
+import timeit
+
+from homework import InfoMessage, Running, SportsWalking, Swimming
+
+
+class ChainedMixin:
+    """show_training_info(), где калории заново считают скорость."""
+
+    def show_training_info(self) -> InfoMessage:
+        """Вернуть сообщение, посчитав скорость дважды."""
+        return InfoMessage(self.__class__.__name__,
+                           self.duration,
+                           self.get_distance(),
+                           self.get_mean_speed(),
+                           self.get_spent_calories())
+
+
+class ChainedRunning(ChainedMixin, Running):
+    """Прежний расчёт: бег."""
+
+
+class ChainedSportsWalking(ChainedMixin, SportsWalking):
+    """Прежний расчёт: спортивная ходьба."""
+
+
+class ChainedSwimming(ChainedMixin, Swimming):
+    """Прежний расчёт: плавание."""
+
+
+CASES = [
+    (Running, ChainedRunning, (15000, 1.5, 75)),
+    (SportsWalking, ChainedSportsWalking, (9000, 1.5, 75, 180)),
+    (Swimming, ChainedSwimming, (720, 1.5, 80, 25, 40)),
+]
+
+
+def count_calls(training) -> int:
+    """Посчитать вызовы функций внутри одного show_training_info()."""
+    profiler = cProfile.Profile()
+    profiler.runcall(training.show_training_info)
+    return pstats.Stats(profiler).total_calls
+
+
+def best_time(statement, number: int, repeat: int) -> float:
+    """Лучшее время одного вызова в наносекундах."""
+    timings = timeit.repeat(statement, number=number, repeat=repeat)
+    return min(timings) / number * 1e9
+
+
+def main() -> None:
+    """Главная функция."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=25)
+    args = parser.parse_args()
+    print(f'{"класс":<15}{"режим":<10}{"вызовы":>8}'
+          f'{"новый, нс":>12}{"повтор, нс":>12}')
+    for current, chained, data in CASES:
+        for label, training in (('прежний', chained), ('текущий', current)):
+            instance = training(*data)
+            calls = count_calls(training(*data))
+            fresh = best_time(lambda: training(*data).show_training_info(),
+                              args.number, args.repeat)
+            repeat = best_time(instance.show_training_info,
+                               args.number, args.repeat)
+            print(f'{current.__name__:<15}{label:<10}{calls:>8}'
+                  f'{fresh:>12.0f}{repeat:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
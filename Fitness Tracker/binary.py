@@ -0,0 +1,141 @@
+"""Двоичный формат пакетов датчиков с чтением через memory map.
+
+Файл начинается с 16-байтового заголовка (сигнатура, версия, размер
+записи), за ним идут записи фиксированной длины: код типа тренировки
+и пять чисел float32 - 21 байт на запись, меньше строки того же пакета
+в JSONL. Неиспользуемые типом тренировки поля равны нулю.
+
+float32 хранит около семи значащих цифр - больше, чем дают датчики, -
+и целые числа шагов и гребков до 2**24 без потерь. Расчёт ведётся в
+float64, так что результаты совпадают со скалярным расчётом по
+значениям, округлённым до float32.
+
+Запуск: python binary.py packages.jsonl packages.bin
+"""
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from batch import BatchResult, calculate_batch
+from homework import TRAINING_FIELDS, Training, read_package
+from pipeline import chunked, detect_format, read_packages
+
+MAGIC: bytes = b'FTPK'
+VERSION: int = 2
+HEADER = struct.Struct('<4sHH8x')
+
+TYPE_CODES: Dict[str, int] = {'SWM': 1, 'RUN': 2, 'WLK': 3}
+TYPE_NAMES: Dict[int, str] = {code: name for name, code in TYPE_CODES.items()}
+
+VALUE_FIELDS: Tuple[str, ...] = ('action', 'duration', 'weight',
+                                 'param1', 'param2')
+# Записи упакованы без выравнивания: 21 байт вместо 24 с выравниванием
+RECORD_DTYPE = np.dtype(
+    [('workout_type', 'u1')] + [(name, '<f4') for name in VALUE_FIELDS])
+# Сколько полей данных использует каждый тип тренировки
+ARITY: Dict[str, int] = {workout_type: len(fields)
+                         for workout_type, fields in TRAINING_FIELDS.items()}
+CHUNK_SIZE: int = 65536
+
+
+def to_records(packages: Iterable[Tuple[str, list]]) -> np.ndarray:
+    """Преобразовать пакеты (тип, данные) в массив двоичных записей."""
+    codes = []
+    rows = []
+    width = len(VALUE_FIELDS)
+    for workout_type, data in packages:
+        if workout_type not in TYPE_CODES:
+            raise KeyError(f'{workout_type} является недопустимым значением')
+        if len(data) != ARITY[workout_type]:
+            raise ValueError(f'Для {workout_type} ожидается '
+                             f'{ARITY[workout_type]} полей, '
+                             f'получено {len(data)}')
+        codes.append(TYPE_CODES[workout_type])
+        rows.append(list(data) + [0.0] * (width - len(data)))
+    records = np.zeros(len(codes), dtype=RECORD_DTYPE)
+    records['workout_type'] = codes
+    values = np.asarray(rows, dtype=np.float64).reshape(len(codes), width)
+    if (np.abs(values[np.isfinite(values)])
+            > np.finfo(np.float32).max).any():
+        raise ValueError('Значение не помещается в float32')
+    for index, name in enumerate(VALUE_FIELDS):
+        records[name] = values[:, index]
+    return records
+
+
+def write_packages(path: str,
+                   packages: Iterable[Tuple[str, list]],
+                   chunk_size: int = CHUNK_SIZE) -> int:
+    """Записать пакеты в двоичный файл кусками. Вернуть число записей."""
+    count = 0
+    with open(path, 'wb') as stream:
+        stream.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        for chunk in chunked(packages, chunk_size):
+            stream.write(to_records(chunk).tobytes())
+            count += len(chunk)
+    return count
+
+
+def open_packages(path: str) -> np.ndarray:
+    """Открыть двоичный файл как структурированный массив без копирования.
+
+    Данные отображаются в память через np.memmap и подгружаются ОС по мере
+    обращения; срезы и колонки массива тоже не копируют данные.
+    """
+    with open(path, 'rb') as stream:
+        magic, version, itemsize = HEADER.unpack(stream.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} не является файлом пакетов версии '
+                         f'{VERSION}')
+    if itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError(f'Размер записи {itemsize} не совпадает '
+                         f'с ожидаемым {RECORD_DTYPE.itemsize}')
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size)
+
+
+def record_data(record: np.void) -> list:
+    """Получить список данных датчиков из одной записи."""
+    workout_type = TYPE_NAMES[int(record['workout_type'])]
+    return [float(record[name])
+            for name in VALUE_FIELDS[:ARITY[workout_type]]]
+
+
+def iter_trainings(records: np.ndarray) -> Iterator[Training]:
+    """Построить объекты тренировок из записей по одной."""
+    for record in records:
+        workout_type = TYPE_NAMES[int(record['workout_type'])]
+        yield read_package(workout_type, record_data(record))
+
+
+def calculate_records(records: np.ndarray
+                      ) -> Iterator[Tuple[np.ndarray, BatchResult]]:
+    """Рассчитать записи пакетным движком, по результату на тип.
+
+    Вместе с результатом возвращаются номера его записей в records,
+    чтобы результаты можно было сопоставить с исходными пакетами.
+    """
+    codes = records['workout_type']
+    for workout_type, code in TYPE_CODES.items():
+        index = np.flatnonzero(codes == code)
+        if not len(index):
+            continue
+        selected = records[index]
+        yield index, calculate_batch(
+            workout_type,
+            [selected[name]
+             for name in VALUE_FIELDS[:ARITY[workout_type]]])
+
+
+def main() -> None:
+    """Главная функция: конвертировать текстовые пакеты в двоичные."""
+    source, target = sys.argv[1:3]
+    with open(source, encoding='utf-8', newline='') as stream:
+        count = write_packages(target,
+                               read_packages(stream, detect_format(source)))
+    print(f'Записано пакетов: {count}')
+
+
+if __name__ == '__main__':
+    main()
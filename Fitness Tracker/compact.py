@@ -0,0 +1,195 @@
+"""Компактное хранение тренировок и результатов.
+
+Классы из homework.py хранят атрибуты экземпляров в __dict__. Здесь
+собраны их варианты со __slots__ и контейнер InfoMessageBatch, который
+держит результаты в типизированных массивах вместо списка объектов.
+"""
+import inspect
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+
+from homework import (InfoMessage, Running, SportsWalking, Swimming,
+                      TYPE_OF_TRAINING, Training)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def make_init(fields: tuple) -> Any:
+    """Собрать __init__, который присваивает поля без вызова super()."""
+    args = ', '.join(fields)
+    body = ''.join(f'\n    self.{name} = {name}' for name in fields)
+    namespace: Dict[str, Any] = {}
+    exec(f'def __init__(self, {args}) -> None:{body}', namespace)
+    return namespace['__init__']
+
+
+class Inherited:
+    """Атрибут класса, который читается из исходного класса тренировки.
+
+    Константы не копируются при импорте: изменение Running.LEN_STEP
+    сразу видно и у CompactRunning.
+    """
+
+    __slots__ = ('training', 'name')
+
+    def __init__(self, training: Type[Training], name: str) -> None:
+        """Запомнить класс тренировки и имя атрибута."""
+        self.training = training
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        """Значение атрибута класса тренировки."""
+        return getattr(self.training, self.name)
+
+
+def slotted(training: Type[Training], name: str) -> Type[Training]:
+    """Создать вариант класса тренировки без __dict__ у экземпляров.
+
+    Методы всей иерархии копируются в новый класс, а константы читаются
+    из исходного класса. У нового класса то же имя, поэтому
+    show_training_info() возвращает тот же training_type, а __qualname__
+    совпадает с именем name в этом модуле, чтобы объекты можно было
+    сохранить через pickle. Подклассом Training новый класс не является:
+    у подкласса класса без __slots__ всегда есть __dict__.
+    """
+    fields = tuple(inspect.signature(training).parameters)
+    namespace: Dict[str, Any] = {}
+    for klass in reversed(training.__mro__[:-1]):
+        namespace.update(vars(klass))
+    for attribute in ('__dict__', '__weakref__'):
+        namespace.pop(attribute, None)
+    for attribute, value in namespace.items():
+        if not attribute.startswith('__') and not hasattr(value, '__get__'):
+            namespace[attribute] = Inherited(training, attribute)
+    namespace.update(__slots__=fields,
+                     __init__=make_init(fields),
+                     __module__=__name__,
+                     __qualname__=name)
+    return type(training.__name__, (), namespace)
+
+
+CompactRunning = slotted(Running, 'CompactRunning')
+CompactSportsWalking = slotted(SportsWalking, 'CompactSportsWalking')
+CompactSwimming = slotted(Swimming, 'CompactSwimming')
+
+COMPACT_TYPE_OF_TRAINING: dict = {'SWM': CompactSwimming,
+                                  'RUN': CompactRunning,
+                                  'WLK': CompactSportsWalking}
+
+
+def read_compact_package(workout_type: str, data: list) -> Any:
+    """Прочитать данные датчиков в компактный объект тренировки."""
+    if workout_type not in COMPACT_TYPE_OF_TRAINING:
+        raise KeyError(f'{workout_type} является недопустимым значением')
+    return COMPACT_TYPE_OF_TRAINING[workout_type](*data)
+
+
+def as_doubles(values: Iterable[float]) -> array:
+    """Значения колонки в массиве double.
+
+    Массив NumPy приводится к непрерывному float64 и копируется байтами,
+    без объекта на каждое число: колонки batch.rows_to_columns() - это
+    срезы транспонированной матрицы, и их буфер не непрерывен.
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        return array('d', np.ascontiguousarray(values,
+                                               dtype=np.float64).tobytes())
+    return array('d', values)
+
+
+class InfoMessageBatch:
+    """Результаты тренировок, хранящиеся по колонкам.
+
+    Тип тренировки хранится номером в training_types, числовые поля -
+    в массивах double, так что одна запись занимает 33 байта. Номера
+    типов у каждого контейнера свои: встроенные типы идут первыми,
+    новые дописываются по мере появления.
+    """
+
+    TRAINING_TYPES: Tuple[str, ...] = tuple(
+        training.__name__ for training in TYPE_OF_TRAINING.values())
+    FIELDS = ('duration', 'distance', 'speed', 'calories')
+    __slots__ = ('training_type', 'training_types', 'type_codes') + FIELDS
+
+    def __init__(self, messages: Iterable[InfoMessage] = ()) -> None:
+        """Создать пачку и добавить в неё messages."""
+        self.training_type = array('B')
+        self.training_types: List[str] = list(self.TRAINING_TYPES)
+        self.type_codes: Dict[str, int] = {
+            name: code for code, name in enumerate(self.training_types)}
+        for name in self.FIELDS:
+            setattr(self, name, array('d'))
+        self.extend(messages)
+
+    def __len__(self) -> int:
+        """Число сообщений в пачке."""
+        return len(self.training_type)
+
+    def __getitem__(self, index: int) -> InfoMessage:
+        """Собрать сообщение с номером index."""
+        return InfoMessage(self.training_types[self.training_type[index]],
+                           self.duration[index],
+                           self.distance[index],
+                           self.speed[index],
+                           self.calories[index])
+
+    def __iter__(self) -> Iterator[InfoMessage]:
+        """Перебрать сообщения пачки по порядку."""
+        types = self.training_types
+        for code, *row in zip(self.training_type, self.duration,
+                              self.distance, self.speed, self.calories):
+            yield InfoMessage(types[code], *row)
+
+    def type_code(self, training_type: str) -> int:
+        """Получить номер типа тренировки, зарегистрировав новый тип."""
+        code = self.type_codes.get(training_type)
+        if code is None:
+            code = self.type_codes[training_type] = len(self.training_types)
+            self.training_types.append(training_type)
+        return code
+
+    def append(self, info: InfoMessage) -> None:
+        """Добавить одно сообщение."""
+        self.training_type.append(self.type_code(info.training_type))
+        self.duration.append(info.duration)
+        self.distance.append(info.distance)
+        self.speed.append(info.speed)
+        self.calories.append(info.calories)
+
+    def extend(self, messages: Iterable[InfoMessage]) -> None:
+        """Добавить сообщения из итерируемого источника."""
+        for info in messages:
+            self.append(info)
+
+    def extend_columns(self, training_type: str,
+                       duration: Iterable[float],
+                       distance: Iterable[float],
+                       speed: Iterable[float],
+                       calories: Iterable[float]) -> None:
+        """Добавить колонки результатов одного типа тренировки.
+
+        Подходит для результатов batch.calculate_batch(): массивы NumPy
+        копируются через буфер без создания объектов на каждую запись.
+        Колонки должны быть одной длины; при ошибке контейнер не
+        меняется.
+        """
+        columns = [as_doubles(values)
+                   for values in (duration, distance, speed, calories)]
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError(f'Колонки разной длины: '
+                             f'{[len(column) for column in columns]}')
+        code = self.type_code(training_type)
+        for name, column in zip(self.FIELDS, columns):
+            getattr(self, name).extend(column)
+        self.training_type.extend([code] * len(columns[0]))
+
+    @property
+    def nbytes(self) -> int:
+        """Объём данных в колонках в байтах."""
+        return sum(len(column) * column.itemsize
+                   for column in (self.training_type, self.duration,
+                                  self.distance, self.speed, self.calories))
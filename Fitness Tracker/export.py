@@ -0,0 +1,274 @@
+"""Колоночная выгрузка результатов тренировок для аналитики.
+
+Результаты show_training_info() пишутся по колонкам группами строк
+(row groups), чтобы аналитика читала только нужные колонки, например
+distance и calories, и не разбирала текст get_message() из логов.
+
+Форматы:
+    parquet - Apache Parquet, нужен pyarrow;
+    arrow   - Arrow IPC (Feather v2), нужен pyarrow;
+    ftc     - собственный колоночный формат на чистом Python: заголовок,
+              затем группы строк; в группе словарь типов тренировок,
+              коды типов и четыре колонки double подряд.
+
+Запуск: python export.py packages.jsonl results.parquet
+        [--format parquet|arrow|ftc] [--row-group-size N]
+"""
+import argparse
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+from typing import (IO, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Tuple)
+
+from homework import InfoMessage
+from pipeline import detect_format, process, read_packages
+from render import message_fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import ipc
+except ImportError:
+    pa = None
+
+RowGroup = Dict[str, Sequence]
+
+ROW_GROUP_SIZE: int = 65536
+COLUMNS: Tuple[str, ...] = ('training_type', 'duration', 'distance',
+                            'speed', 'calories')
+VALUE_COLUMNS: Tuple[str, ...] = COLUMNS[1:]
+FORMATS: Tuple[str, ...] = ('parquet', 'arrow', 'ftc')
+EXTENSIONS: Dict[str, str] = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ftc': 'ftc',
+}
+
+MAGIC: bytes = b'FTCL'
+VERSION: int = 1
+# Сигнатура, версия, число колонок
+HEADER = struct.Struct('<4sHH8x')
+# Число строк группы и длина словаря типов в байтах
+GROUP_HEADER = struct.Struct('<II')
+# Колонки хранятся в little-endian независимо от платформы
+SWAP_BYTES: bool = sys.byteorder != 'little'
+
+
+def row_groups(messages: Iterable[InfoMessage],
+               size: int = ROW_GROUP_SIZE) -> Iterator[RowGroup]:
+    """Собрать результаты в группы строк по size записей."""
+    if size < 1:
+        raise ValueError('Размер группы строк должен быть положительным')
+    messages = iter(messages)
+    while True:
+        rows = list(map(message_fields, islice(messages, size)))
+        if not rows:
+            return
+        # Транспонирование через zip() заметно быстрее, чем
+        # раскладывать поля каждой записи по колонкам в цикле
+        training_types, *values = zip(*rows)
+        group: RowGroup = {'training_type': list(training_types)}
+        group.update((name, array('d', column))
+                     for name, column in zip(VALUE_COLUMNS, values))
+        yield group
+
+
+def arrow_batch(group: RowGroup) -> 'pa.RecordBatch':
+    """Преобразовать группу строк в Arrow RecordBatch.
+
+    Колонки array('d') передаются в Arrow буфером, без копирования.
+    """
+    rows = len(group['training_type'])
+    arrays = [pa.array(group['training_type'], pa.string())]
+    arrays.extend(
+        pa.Array.from_buffers(pa.float64(), rows,
+                              [None, pa.py_buffer(group[name])])
+        for name in VALUE_COLUMNS)
+    return pa.RecordBatch.from_arrays(arrays, names=list(COLUMNS))
+
+
+def arrow_schema() -> 'pa.Schema':
+    """Схема таблицы результатов."""
+    return pa.schema([('training_type', pa.string())]
+                     + [(name, pa.float64()) for name in VALUE_COLUMNS])
+
+
+def write_parquet(path: str, groups: Iterable[RowGroup]) -> None:
+    """Записать группы строк в Parquet, по row group на группу."""
+    with pq.ParquetWriter(path, arrow_schema()) as writer:
+        for group in groups:
+            writer.write_table(pa.Table.from_batches([arrow_batch(group)]))
+
+
+def write_arrow(path: str, groups: Iterable[RowGroup]) -> None:
+    """Записать группы строк в файл Arrow IPC, по батчу на группу."""
+    with ipc.new_file(path, arrow_schema()) as writer:
+        for group in groups:
+            writer.write_batch(arrow_batch(group))
+
+
+def pack_group(group: RowGroup) -> bytes:
+    """Упаковать группу строк в байты формата ftc."""
+    index: Dict[str, int] = {}
+    codes = array('H', [index.setdefault(name, len(index))
+                        for name in group['training_type']])
+    names = '\n'.join(index).encode('utf-8')
+    columns = [codes] + [group[name] for name in VALUE_COLUMNS]
+    if SWAP_BYTES:
+        columns = [array(column.typecode, column) for column in columns]
+        for column in columns:
+            column.byteswap()
+    return b''.join([GROUP_HEADER.pack(len(codes), len(names)), names]
+                    + [column.tobytes() for column in columns])
+
+
+def write_ftc(path: str, groups: Iterable[RowGroup]) -> None:
+    """Записать группы строк в колоночный формат ftc."""
+    with open(path, 'wb') as stream:
+        stream.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS)))
+        for group in groups:
+            stream.write(pack_group(group))
+
+
+def read_column(stream: IO[bytes], typecode: str, rows: int) -> array:
+    """Прочитать колонку из rows значений."""
+    column = array(typecode)
+    column.frombytes(stream.read(rows * column.itemsize))
+    if SWAP_BYTES:
+        column.byteswap()
+    return column
+
+
+def read_ftc(path: str,
+             columns: Optional[Sequence[str]] = None) -> Iterator[RowGroup]:
+    """Читать файл ftc по группам строк.
+
+    Ненужные колонки не читаются, а пропускаются через seek().
+    """
+    columns = COLUMNS if columns is None else columns
+    for name in columns:
+        if name not in COLUMNS:
+            raise KeyError(f'{name} является недопустимой колонкой')
+    with open(path, 'rb') as stream:
+        magic, version, count = HEADER.unpack(stream.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} не является файлом ftc версии '
+                             f'{VERSION}')
+        if count != len(COLUMNS):
+            raise ValueError(f'Число колонок {count} не совпадает '
+                             f'с ожидаемым {len(COLUMNS)}')
+        while True:
+            header = stream.read(GROUP_HEADER.size)
+            if not header:
+                return
+            rows, names_size = GROUP_HEADER.unpack(header)
+            group: RowGroup = {}
+            if 'training_type' in columns:
+                names = stream.read(names_size).decode('utf-8').split('\n')
+                codes = read_column(stream, 'H', rows)
+                group['training_type'] = [names[code] for code in codes]
+            else:
+                stream.seek(names_size + rows * 2, os.SEEK_CUR)
+            for name in VALUE_COLUMNS:
+                if name in columns:
+                    group[name] = read_column(stream, 'd', rows)
+                else:
+                    stream.seek(rows * 8, os.SEEK_CUR)
+            yield {name: group[name] for name in columns}
+
+
+def require_pyarrow(fmt: str) -> None:
+    """Убедиться, что для формата fmt установлен pyarrow."""
+    if fmt != 'ftc' and pa is None:
+        raise ImportError(f'Для формата {fmt} нужен pyarrow; '
+                          f'без него доступен формат ftc')
+
+
+def output_format(path: str) -> str:
+    """Определить формат по расширению файла.
+
+    Для незнакомых расширений выбирается parquet, если установлен
+    pyarrow, иначе ftc.
+    """
+    fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        return 'ftc' if pa is None else 'parquet'
+    return fmt
+
+
+WRITERS: Dict[str, Callable[[str, Iterable[RowGroup]], None]] = {
+    'parquet': write_parquet,
+    'arrow': write_arrow,
+    'ftc': write_ftc,
+}
+
+
+def export(messages: Iterable[InfoMessage], path: str,
+           fmt: Optional[str] = None,
+           row_group_size: int = ROW_GROUP_SIZE) -> int:
+    """Выгрузить результаты в колоночный файл. Вернуть число записей."""
+    fmt = fmt or output_format(path)
+    if fmt not in WRITERS:
+        raise KeyError(f'{fmt} является недопустимым форматом')
+    require_pyarrow(fmt)
+    if row_group_size < 1:
+        # Проверка до открытия файла: иначе останется пустая выгрузка
+        raise ValueError('Размер группы строк должен быть положительным')
+    count = 0
+
+    def counted() -> Iterator[RowGroup]:
+        nonlocal count
+        for group in row_groups(messages, row_group_size):
+            count += len(group['training_type'])
+            yield group
+
+    WRITERS[fmt](path, counted())
+    return count
+
+
+def read_columns(path: str, columns: Optional[Sequence[str]] = None,
+                 fmt: Optional[str] = None) -> Dict[str, list]:
+    """Прочитать колонки файла целиком в списки."""
+    fmt = fmt or output_format(path)
+    if fmt not in WRITERS:
+        raise KeyError(f'{fmt} является недопустимым форматом')
+    require_pyarrow(fmt)
+    columns = list(COLUMNS if columns is None else columns)
+    if fmt == 'parquet':
+        return pq.read_table(path, columns=columns).to_pydict()
+    if fmt == 'arrow':
+        with ipc.open_file(path) as reader:
+            return reader.read_all().select(columns).to_pydict()
+    result: Dict[str, list] = {name: [] for name in columns}
+    for group in read_ftc(path, columns):
+        for name in columns:
+            result[name].extend(group[name])
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Главная функция."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='файл с пакетами')
+    parser.add_argument('target', help='файл для выгрузки')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help='формат выгрузки, по умолчанию по расширению')
+    parser.add_argument('--row-group-size', type=int,
+                        default=ROW_GROUP_SIZE)
+    args = parser.parse_args(argv)
+    if args.row_group_size < 1:
+        parser.error('--row-group-size должен быть положительным')
+    with open(args.source, encoding='utf-8', newline='') as stream:
+        packages = read_packages(stream, detect_format(args.source))
+        messages = (info for chunk in process(packages) for info in chunk)
+        count = export(messages, args.target, args.format,
+                       args.row_group_size)
+    print(f'Выгружено результатов: {count}')
+
+
+if __name__ == '__main__':
+    main()
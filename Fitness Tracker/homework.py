@@ -1,7 +1,9 @@
+import inspect
 from dataclasses import dataclass
+from typing import Callable, Dict, Sequence, Tuple, Type
 
 
-@dataclass
+@dataclass(slots=True)
 class InfoMessage:
     """Информационное сообщение о тренировке."""
     training_type: str
@@ -10,14 +12,20 @@ class InfoMessage:
     speed: float
     calories: float
 
+    # Шаблон в %-формате: его можно повторить N раз и заполнить одним
+    # вызовом для целого пакета сообщений (см. render.py)
+    MESSAGE = ('Тип тренировки: %s;'
+               ' Длительность: %.3f ч.;'
+               ' Дистанция: %.3f км;'
+               ' Ср. скорость: %.3f км/ч;'
+               ' Потрачено ккал: %.3f.')
+
     def get_message(self) -> str:
-        # Не особо понимаю каким образом вынести строку в константу класса
-        # Не дружу с функцией format,решая на codewars не раз с ней сталкивался
-        return (f'Тип тренировки: {self.training_type};'
-                f' Длительность: {self.duration:.3f} ч.;'
-                f' Дистанция: {self.distance:.3f} км;'
-                f' Ср. скорость: {self.speed:.3f} км/ч;'
-                f' Потрачено ккал: {self.calories:.3f}.')
+        return self.MESSAGE % (self.training_type,
+                               self.duration,
+                               self.distance,
+                               self.speed,
+                               self.calories)
 
 
 class Training():
@@ -47,13 +55,23 @@ class Training():
         """Получить количество затраченных калорий."""
         raise NotImplementedError
 
+    def spent_calories(self, speed: float) -> float:
+        """Калории при уже посчитанной средней скорости speed.
+
+        Встроенные тренировки считают здесь свою формулу, чтобы
+        show_training_info() не пересчитывал скорость; другим подклассам
+        достаточно переопределить get_spent_calories().
+        """
+        return self.get_spent_calories()
+
     def show_training_info(self) -> InfoMessage:
         """Вернуть информационное сообщение о выполненной тренировке."""
+        speed = self.get_mean_speed()
         return InfoMessage(self.__class__.__name__,
                            self.duration,
                            self.get_distance(),
-                           self.get_mean_speed(),
-                           self.get_spent_calories()
+                           speed,
+                           self.spent_calories(speed)
                            )
 
 
@@ -64,8 +82,12 @@ class Running(Training):
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
+        return self.spent_calories(self.get_mean_speed())
+
+    def spent_calories(self, speed: float) -> float:
+        """Калории при уже посчитанной средней скорости speed."""
         return ((self.CALORIES_MEAN_SPEED_MULTIPLIER
-                * self.get_mean_speed() + self.CALORIES_MEAN_SPEED_SHIFT)
+                * speed + self.CALORIES_MEAN_SPEED_SHIFT)
                 * self.weight / self.M_IN_KM
                 * self.duration * self.MIN_IN_H)
 
@@ -86,8 +108,12 @@ class SportsWalking(Training):
         self.height = height
 
     def get_spent_calories(self) -> float:
+        return self.spent_calories(self.get_mean_speed())
+
+    def spent_calories(self, speed: float) -> float:
+        """Калории при уже посчитанной средней скорости speed."""
         return ((self.CALORIES_WEIGHT_MULTIPLIER * self.weight
-                + ((self.get_mean_speed() * self.KMH_IN_MSEC)
+                + ((speed * self.KMH_IN_MSEC)
                  ** 2 / (self.height / self.CM_IN_M))
                 * self.CALORIES_SPEED_HEIGHT_MULTIPLIER
                 * self.weight) * self.duration
@@ -115,21 +141,87 @@ class Swimming(Training):
                 / self.M_IN_KM / self.duration)
 
     def get_spent_calories(self) -> float:
-        return ((self.get_mean_speed() + self.CALORIES_MEAN_SPEED_SHIFT)
+        return self.spent_calories(self.get_mean_speed())
+
+    def spent_calories(self, speed: float) -> float:
+        """Калории при уже посчитанной средней скорости speed."""
+        return ((speed + self.CALORIES_MEAN_SPEED_SHIFT)
                 * self.CALORIES_WEIGHT_MULTIPLIER
                 * self.weight * self.duration)
 
 
-TYPE_OF_TRAINING: dict = {'SWM': Swimming,
-                          'RUN': Running,
-                          'WLK': SportsWalking}
+TYPE_OF_TRAINING: dict = {}
+# Схема полей пакета каждого типа тренировки в порядке данных датчиков
+TRAINING_FIELDS: Dict[str, Tuple[str, ...]] = {}
+# Скомпилированные конструкторы: данные датчиков -> объект тренировки
+CONSTRUCTORS: Dict[str, Callable[[Sequence], Training]] = {}
+
+
+def compile_constructor(workout_type: str,
+                        training: Type[Training],
+                        fields: Tuple[str, ...],
+                        call_init: bool) -> Callable[[Sequence], Training]:
+    """Собрать конструктор тренировки под конкретную схему полей.
+
+    Данные распаковываются в именованные переменные без *args. Если
+    call_init ложно, объект создаётся без вызова __init__ и цепочки
+    super().__init__: поля схемы присваиваются напрямую, как это делает
+    __init__ встроенных тренировок.
+    """
+    args = ', '.join(fields)
+    if call_init:
+        body = f'    return training({args})\n'
+    else:
+        body = ('    self = new(training)\n'
+                + ''.join(f'    self.{name} = {name}\n' for name in fields)
+                + '    return self\n')
+    source = (f'def build(data):\n'
+              f'    try:\n'
+              f'        {args}, = data\n'
+              f'    except ValueError:\n'
+              f'        raise ValueError(error % len(data)) from None\n'
+              + body)
+    error = (f'{workout_type}: ожидается {len(fields)} полей, '
+             f'получено %d')
+    namespace = {'training': training, 'new': object.__new__,
+                 'error': error}
+    exec(source, namespace)
+    return namespace['build']
+
+
+def register_training(workout_type: str, call_init: bool = True
+                      ) -> Callable[[Type[Training]], Type[Training]]:
+    """Зарегистрировать класс тренировки под кодом (декоратор).
+
+    Поля пакета в порядке данных датчиков - параметры __init__ класса.
+    call_init=False включает быстрый конструктор без вызова __init__:
+    он годится, только если __init__ лишь присваивает свои параметры
+    одноимённым атрибутам.
+    """
+    def decorator(training: Type[Training]) -> Type[Training]:
+        schema = tuple(inspect.signature(training).parameters)
+        TYPE_OF_TRAINING[workout_type] = training
+        TRAINING_FIELDS[workout_type] = schema
+        CONSTRUCTORS[workout_type] = compile_constructor(
+            workout_type, training, schema, call_init)
+        return training
+    return decorator
+
+
+# __init__ встроенных тренировок только присваивает поля
+register_training('SWM', call_init=False)(Swimming)
+register_training('RUN', call_init=False)(Running)
+register_training('WLK', call_init=False)(SportsWalking)
 
 
 def read_package(workout_type: str, data: list) -> Training:
     """Прочитать данные полученные от датчиков."""
-    if workout_type not in TYPE_OF_TRAINING:
-        raise KeyError(f'{workout_type} является недопустимым значением')
-    return TYPE_OF_TRAINING[workout_type](*data)
+    try:
+        build = CONSTRUCTORS[workout_type]
+    except KeyError:
+        raise KeyError(
+            f'{workout_type} является недопустимым значением') from None
+    return build(data)
 
 
 def main(training: Training) -> None:
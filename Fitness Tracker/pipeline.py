@@ -0,0 +1,352 @@
+"""Потоковая обработка пакетов датчиков с ограниченным расходом памяти.
+
+Пакеты читаются из файла или stdin построчно (JSON lines или CSV),
+обрабатываются кусками по chunk_size и отдаются генератором: следующий
+кусок не читается, пока потребитель не забрал предыдущий.
+
+Для больших файлов есть параллельный режим: файл режется на диапазоны
+байтов по границам строк, и каждый процесс сам читает и считает свой
+диапазон, так что через pickle возвращаются только результаты.
+
+С --profile время по этапам (чтение, создание объектов, расчёт,
+форматирование) пишется в файл, см. profiling.py; '-' - таблица в stderr.
+С --rejects пакеты проверяются до расчёта (validation.py): негодные
+не останавливают обработку, а пишутся в файл с причинами.
+
+Запуск: python pipeline.py packages.jsonl [--format csv] [--chunk-size N]
+        [--workers N] [--unordered] [--profile FILE] [--rejects FILE]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import (FIRST_COMPLETED, Future,
+                                ProcessPoolExecutor, wait)
+from itertools import islice
+from typing import (IO, Callable, Deque, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+from homework import InfoMessage, read_package
+from profiling import Profiler
+from render import render
+
+Package = Tuple[str, list]
+
+
+@dataclass
+class Unparsed:
+    """Строка входного файла, которую не удалось разобрать в пакет."""
+
+    line: str
+    error: str
+
+
+Row = Union[Package, Unparsed]
+Check = Callable[[List[Row]], List[Package]]
+
+CHUNK_SIZE: int = 1000
+# Сколько кусков на процесс держать в очереди пула одновременно
+TASKS_PER_WORKER: int = 2
+# Сколько диапазонов файла приходится на процесс: мелкие диапазоны
+# выравнивают нагрузку, крупные уменьшают накладные расходы на задачу
+SHARDS_PER_WORKER: int = 4
+# Верхняя граница размера диапазона, чтобы результаты одной задачи
+# не занимали слишком много памяти на больших файлах
+SHARD_BYTES: int = 8 * 1024 * 1024
+FORMATS: Tuple[str, ...] = ('jsonl', 'csv')
+
+
+def parse_number(value: str) -> Union[int, float]:
+    """Преобразовать поле CSV в число, сохраняя целые как int."""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def parse_field(value: str) -> Union[int, float, str]:
+    """Поле CSV как число, а если это не число - как есть."""
+    try:
+        return parse_number(value)
+    except ValueError:
+        return value
+
+
+def parse_record(record: object) -> Package:
+    """Пакет из разобранной строки JSON: списка или словаря.
+
+    Поддерживаются ["SWM", [...]] и {"workout_type": "SWM", "data": [...]},
+    иначе ValueError.
+    """
+    if isinstance(record, dict):
+        if set(record) != {'workout_type', 'data'}:
+            raise ValueError('Ожидается словарь с ключами workout_type '
+                             'и data')
+        return record['workout_type'], record['data']
+    if not isinstance(record, list) or len(record) != 2:
+        raise ValueError('Ожидается пара [тип тренировки, данные]')
+    workout_type, data = record
+    return workout_type, data
+
+
+def read_jsonl(stream: IO[str],
+               keep_errors: bool = False) -> Iterator[Row]:
+    """Читать пакеты вида ["SWM", [720, 1, 80, 25, 40]] по строке.
+
+    С keep_errors вместо исключения на неразобранную строку отдаётся
+    Unparsed, и чтение продолжается.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield parse_record(json.loads(line))
+        except ValueError as error:
+            if not keep_errors:
+                raise
+            yield Unparsed(line.rstrip('\r\n'), str(error))
+
+
+def read_csv(stream: IO[str], keep_errors: bool = False) -> Iterator[Row]:
+    """Читать пакеты вида SWM,720,1,80,25,40 по строке.
+
+    С keep_errors нечисловые поля остаются строками: их отбракует
+    проверка пакетов (validation.py).
+    """
+    for row in csv.reader(stream):
+        if not row:
+            continue
+        workout_type, *data = row
+        if keep_errors:
+            yield workout_type, [parse_field(value) for value in data]
+        else:
+            yield workout_type, [parse_number(value) for value in data]
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def detect_format(path: str) -> str:
+    """Определить формат файла по расширению."""
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_packages(stream: IO[str], fmt: str = 'jsonl',
+                  keep_errors: bool = False) -> Iterator[Row]:
+    """Читать пакеты из открытого текстового потока."""
+    if fmt not in READERS:
+        raise ValueError(f'{fmt} является недопустимым форматом')
+    return READERS[fmt](stream, keep_errors)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Разбить поток на списки длиной не больше size."""
+    if size < 1:
+        raise ValueError('Размер куска должен быть положительным')
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_chunk(chunk: List[Package]) -> List[InfoMessage]:
+    """Рассчитать кусок пакетов."""
+    return [read_package(workout_type, data).show_training_info()
+            for workout_type, data in chunk]
+
+
+def process(packages: Iterable[Row],
+            chunk_size: int = CHUNK_SIZE,
+            check: Optional[Check] = None) -> Iterator[List[InfoMessage]]:
+    """Лениво рассчитывать поток пакетов кусками.
+
+    check, если задан, получает каждый кусок и возвращает пакеты, которые
+    можно рассчитывать, например validation.RejectWriter.check.
+    """
+    for chunk in chunked(packages, chunk_size):
+        yield process_chunk(check(chunk) if check else chunk)
+
+
+def process_file(path: str,
+                 fmt: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE,
+                 check: Optional[Check] = None
+                 ) -> Iterator[List[InfoMessage]]:
+    """Лениво рассчитывать пакеты из файла; '-' означает stdin.
+
+    С check неразобранные строки не прерывают чтение, а передаются
+    в check как Unparsed.
+    """
+    fmt = fmt or detect_format(path)
+    keep_errors = check is not None
+    if path == '-':
+        yield from process(read_packages(sys.stdin, fmt, keep_errors),
+                           chunk_size, check)
+        return
+    with open(path, encoding='utf-8', newline='') as stream:
+        yield from process(read_packages(stream, fmt, keep_errors),
+                           chunk_size, check)
+
+
+def run_in_pool(func: Callable, tasks: Iterable, workers: Optional[int],
+                ordered: bool) -> Iterator:
+    """Выполнять задачи в пуле процессов, держа в работе ограниченное число.
+
+    Задачи берутся из итератора по мере освобождения места, поэтому поток
+    входных данных не вычитывается целиком заранее.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = workers * TASKS_PER_WORKER
+    tasks = iter(tasks)
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for task in islice(tasks, limit):
+            pending.append(executor.submit(func, task))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                yield future.result()
+                for task in islice(tasks, 1):
+                    pending.append(executor.submit(func, task))
+
+
+def process_parallel(packages: Iterable[Package],
+                     workers: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE,
+                     ordered: bool = True) -> Iterator[List[InfoMessage]]:
+    """Рассчитывать поток пакетов кусками в пуле процессов."""
+    return run_in_pool(process_chunk, chunked(packages, chunk_size),
+                       workers, ordered)
+
+
+def split_file(path: str, shards: int,
+               max_bytes: int = SHARD_BYTES) -> List[Tuple[int, int]]:
+    """Разбить файл на диапазоны байтов примерно равного размера."""
+    size = os.path.getsize(path)
+    step = max(min(size // max(shards, 1), max_bytes), 1)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def read_lines(path: str, start: int, end: int) -> Iterator[str]:
+    """Читать строки, которые начинаются в диапазоне [start, end)."""
+    with open(path, 'rb') as stream:
+        if start:
+            # Строка, начатая в предыдущем диапазоне, принадлежит ему
+            stream.seek(start - 1)
+            stream.readline()
+        position = stream.tell()
+        while position < end:
+            line = stream.readline()
+            if not line:
+                return
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def process_shard(shard: Tuple[str, str, int, int]) -> List[InfoMessage]:
+    """Прочитать и рассчитать диапазон файла в процессе пула."""
+    path, fmt, start, end = shard
+    return process_chunk(list(read_packages(read_lines(path, start, end),
+                                            fmt)))
+
+
+def process_file_parallel(path: str,
+                          fmt: Optional[str] = None,
+                          workers: Optional[int] = None,
+                          ordered: bool = True
+                          ) -> Iterator[List[InfoMessage]]:
+    """Рассчитывать файл параллельно по диапазонам байтов."""
+    fmt = fmt or detect_format(path)
+    if fmt not in READERS:
+        raise ValueError(f'{fmt} является недопустимым форматом')
+    workers = workers or os.cpu_count() or 1
+    shards = ((path, fmt, start, end)
+              for start, end in split_file(path, workers * SHARDS_PER_WORKER))
+    return run_in_pool(process_shard, shards, workers, ordered)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разобрать аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default='-',
+                        help='файл с пакетами, по умолчанию stdin')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help='формат входных данных')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='сколько пакетов обрабатывать за раз')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='число процессов, 0 - по числу ядер')
+    parser.add_argument('--unordered', action='store_true',
+                        help='выводить результаты по мере готовности')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='записать время по этапам: .prof, .folded '
+                             'или таблица; - означает stderr')
+    parser.add_argument('--rejects', metavar='FILE',
+                        help='проверять пакеты и писать негодные в файл')
+    args = parser.parse_args(argv)
+    for option in ('profile', 'rejects'):
+        if getattr(args, option) and args.workers != 1:
+            parser.error(f'--{option} работает только с --workers 1')
+    return args
+
+
+def enable_profiling(profiler: Profiler) -> None:
+    """Включить замеры горячего пути, чтения пакетов и render()."""
+    profiler.enable()
+    for fmt in list(READERS):
+        profiler.instrument(READERS, fmt, 'parse', fmt, kind='iter')
+    # main() ищет render в глобальных именах модуля при каждом вызове
+    profiler.instrument(globals(), 'render', 'format', 'render',
+                        kind='batch')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Главная функция."""
+    args = parse_args(argv)
+    ordered = not args.unordered
+    rejects = None
+    if args.rejects:
+        # NumPy нужен только для проверки пакетов
+        from validation import RejectWriter
+        rejects = RejectWriter(open(args.rejects, 'w', encoding='utf-8'))
+    if args.workers == 1:
+        chunks = process_file(args.path, args.format, args.chunk_size,
+                              rejects and rejects.check)
+    elif args.path == '-':
+        chunks = process_parallel(
+            read_packages(sys.stdin, args.format or 'jsonl'),
+            args.workers, args.chunk_size, ordered)
+    else:
+        chunks = process_file_parallel(args.path, args.format,
+                                       args.workers, ordered)
+    profiler = Profiler()
+    if args.profile:
+        enable_profiling(profiler)
+    try:
+        for chunk in chunks:
+            sys.stdout.write(render(chunk))
+    finally:
+        profiler.disable()
+        if rejects:
+            rejects.stream.close()
+    if rejects:
+        sys.stderr.write(f'Отбраковано пакетов: {rejects.count}\n')
+    if args.profile == '-':
+        sys.stderr.write(profiler.summary() + '\n')
+    elif args.profile:
+        profiler.dump(args.profile)
+
+
+if __name__ == '__main__':
+    main()
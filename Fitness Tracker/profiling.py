@@ -0,0 +1,206 @@
+"""Встроенное профилирование горячего пути по этапам.
+
+Этапы: parse (чтение пакетов), construct (read_package), compute
+(show_training_info) и format (get_message и render). Пока профилирование
+выключено, код не меняется совсем: на время работы профилировщик
+подменяет функции обёртками с замером времени, а потом возвращает
+исходные. По каждому этапу копятся число вызовов и наносекунды.
+
+Результат выводится таблицей, в файл pstats (.prof, для snakeviz и
+python -m pstats) или в свёрнутые стеки (.folded, для flamegraph.pl).
+"""
+import marshal
+import time
+from functools import partial, wraps
+from typing import Callable, Dict, List, MutableMapping, Tuple
+
+from homework import CONSTRUCTORS, InfoMessage, Training
+
+Counter = List[int]
+
+STAGES: Tuple[str, ...] = ('parse', 'construct', 'compute', 'format')
+
+
+def timed_call(func: Callable, counter: Counter) -> Callable:
+    """Обернуть функцию замером каждого вызова."""
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += clock() - start
+    return wrapper
+
+
+def timed_batch(func: Callable, counter: Counter) -> Callable:
+    """Обернуть функцию над пачкой: число вызовов считается по записям."""
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(items, *args, **kwargs):
+        start = clock()
+        try:
+            return func(items, *args, **kwargs)
+        finally:
+            counter[0] += len(items)
+            counter[1] += clock() - start
+    return wrapper
+
+
+def timed_iter(func: Callable, counter: Counter) -> Callable:
+    """Обернуть генератор замером получения каждого элемента."""
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        iterator = iter(func(*args, **kwargs))
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                counter[1] += clock() - start
+                return
+            counter[0] += 1
+            counter[1] += clock() - start
+            yield item
+    return wrapper
+
+
+WRAPPERS: Dict[str, Callable[[Callable, Counter], Callable]] = {
+    'call': timed_call,
+    'batch': timed_batch,
+    'iter': timed_iter,
+}
+
+
+class Profiler:
+    """Счётчики этапов и подмена функций горячего пути."""
+
+    def __init__(self) -> None:
+        """Создать профилировщик без подменённых функций."""
+        self.stats: Dict[Tuple[str, str], Counter] = {}
+        # Как вернуть на место каждую подменённую функцию
+        self.restore: List[Callable[[], None]] = []
+
+    def counter(self, stage: str, label: str = '') -> Counter:
+        """Счётчик [вызовы, наносекунды] этапа stage."""
+        if stage not in STAGES:
+            raise KeyError(f'{stage} является недопустимым этапом')
+        return self.stats.setdefault((stage, label), [0, 0])
+
+    def instrument(self, namespace: MutableMapping, name: str,
+                   stage: str, label: str = '', kind: str = 'call') -> None:
+        """Подменить namespace[name] обёрткой с замером до disable().
+
+        namespace - словарь с функцией: globals() модуля, CONSTRUCTORS,
+        READERS. kind: call - обычная функция, batch - функция над пачкой,
+        iter - генератор.
+        """
+        original = namespace[name]
+        self.restore.append(partial(namespace.__setitem__, name, original))
+        namespace[name] = WRAPPERS[kind](original,
+                                         self.counter(stage, label))
+
+    def instrument_method(self, cls: type, name: str, stage: str) -> None:
+        """Подменить метод класса; этап делится по классам объектов."""
+        original = cls.__dict__[name]
+        counters: Dict[type, Counter] = {}
+        clock = time.perf_counter_ns
+
+        @wraps(original)
+        def wrapper(obj, *args, **kwargs):
+            start = clock()
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                counter = counters.get(type(obj))
+                if counter is None:
+                    counter = counters[type(obj)] = self.counter(
+                        stage, type(obj).__name__)
+                counter[0] += 1
+                counter[1] += clock() - start
+
+        self.restore.append(partial(setattr, cls, name, original))
+        setattr(cls, name, wrapper)
+
+    def enable(self) -> 'Profiler':
+        """Включить замеры read_package, show_training_info, get_message."""
+        for workout_type in list(CONSTRUCTORS):
+            self.instrument(CONSTRUCTORS, workout_type,
+                            'construct', workout_type)
+        self.instrument_method(Training, 'show_training_info', 'compute')
+        self.instrument_method(InfoMessage, 'get_message', 'format')
+        return self
+
+    def disable(self) -> None:
+        """Вернуть исходные функции; накопленные счётчики сохраняются."""
+        while self.restore:
+            self.restore.pop()()
+
+    def __enter__(self) -> 'Profiler':
+        """Включить профилирование на время блока with."""
+        return self.enable()
+
+    def __exit__(self, *exc_info) -> None:
+        """Вернуть подменённые функции на место."""
+        self.disable()
+
+    def reset(self) -> None:
+        """Обнулить счётчики."""
+        for counter in self.stats.values():
+            counter[:] = [0, 0]
+
+    def rows(self) -> List[Tuple[str, str, int, int]]:
+        """Строки (этап, метка, вызовы, нс) в порядке этапов."""
+        return sorted(((stage, label, count, ns)
+                       for (stage, label), (count, ns) in self.stats.items()
+                       if count or ns),
+                      key=lambda row: (STAGES.index(row[0]), row[1]))
+
+    def summary(self) -> str:
+        """Таблица этапов: вызовы, время, нс на вызов и доля времени."""
+        rows = self.rows()
+        total = sum(row[3] for row in rows) or 1
+        lines = [f'{"этап":<12}{"метка":<16}{"вызовы":>10}'
+                 f'{"мс":>12}{"нс/вызов":>12}{"доля":>8}']
+        for stage, label, count, ns in rows:
+            lines.append(f'{stage:<12}{label:<16}{count:>10}'
+                         f'{ns / 1e6:>12.3f}{ns / max(count, 1):>12.0f}'
+                         f'{ns / total:>8.1%}')
+        return '\n'.join(lines)
+
+    def dump_stats(self, path: str) -> None:
+        """Записать счётчики в формате pstats (читается pstats.Stats)."""
+        stats = {}
+        for stage, label, count, ns in self.rows():
+            name = f'{stage}:{label}' if label else stage
+            seconds = ns / 1e9
+            stats[('fitness', STAGES.index(stage), name)] = (
+                count, count, seconds, seconds, {})
+        with open(path, 'wb') as stream:
+            marshal.dump(stats, stream)
+
+    def dump_folded(self, path: str) -> None:
+        """Записать свёрнутые стеки для flamegraph.pl, вес - наносекунды."""
+        with open(path, 'w', encoding='utf-8') as stream:
+            for stage, label, _, ns in self.rows():
+                frames = ';'.join(filter(None, ('pipeline', stage, label)))
+                stream.write(f'{frames} {ns}\n')
+
+    def dump(self, path: str) -> None:
+        """Записать результат в файл, формат - по расширению.
+
+        .prof - pstats, .folded - свёрнутые стеки, иначе таблица.
+        """
+        if path.endswith('.prof'):
+            self.dump_stats(path)
+        elif path.endswith('.folded'):
+            self.dump_folded(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write(self.summary() + '\n')
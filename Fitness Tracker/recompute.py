@@ -0,0 +1,268 @@
+"""Пересчёт калорий при изменении коэффициентов без повторного расчёта.
+
+Формулы калорий линейны по своим коэффициентам, если разложить их на
+слагаемые из величин, от коэффициентов не зависящих:
+
+    бег:      M * v*w*t * 60/1000  +  S * w*t * 60/1000
+    ходьба:   W * w*t * 60  +  H * v²*w*t/h * 0.278² * 100 * 60
+    плавание: W * v*w*t  +  W*S * w*t
+
+где v - средняя скорость, w*t - вес на длительность, h - рост. Эти
+промежуточные величины считаются по истории один раз и сохраняются,
+а новые калории получаются произведением матрицы слагаемых на вектор
+весов из коэффициентов. Из-за иного порядка операций результат может
+отличаться от скалярного расчёта в последних битах.
+
+Запуск:
+    python recompute.py store.npz --build packages.bin
+    python recompute.py store.npz --set RUN.CALORIES_MEAN_SPEED_MULTIPLIER=20
+"""
+import argparse
+from dataclasses import dataclass, field
+from typing import (Callable, Dict, List, Mapping, Optional, Sequence, Tuple,
+                    Type)
+
+import numpy as np
+
+from batch import as_column, calculate_batch
+from binary import ARITY, TYPE_CODES, VALUE_FIELDS, open_packages
+from homework import TYPE_OF_TRAINING, Training
+
+Coefficients = Mapping[str, float]
+
+# Коэффициенты, которые можно менять без пересчёта истории
+COEFFICIENTS: Dict[str, Tuple[str, ...]] = {
+    'RUN': ('CALORIES_MEAN_SPEED_MULTIPLIER', 'CALORIES_MEAN_SPEED_SHIFT'),
+    'WLK': ('CALORIES_WEIGHT_MULTIPLIER', 'CALORIES_SPEED_HEIGHT_MULTIPLIER'),
+    'SWM': ('CALORIES_WEIGHT_MULTIPLIER', 'CALORIES_MEAN_SPEED_SHIFT'),
+}
+INTERMEDIATES: Tuple[str, ...] = ('speed', 'speed_sq', 'weight_duration',
+                                  'height', 'index')
+
+
+@dataclass
+class Intermediates:
+    """Не зависящие от коэффициентов величины тренировок одного типа.
+
+    height заполняется только для спортивной ходьбы; index - номера
+    тренировок в исходном файле пакетов, если величины посчитаны по нему.
+    """
+
+    workout_type: str
+    speed: np.ndarray
+    speed_sq: np.ndarray
+    weight_duration: np.ndarray
+    height: Optional[np.ndarray] = None
+    index: Optional[np.ndarray] = None
+    _basis: Optional[np.ndarray] = field(default=None, init=False,
+                                         repr=False, compare=False)
+
+    def __len__(self) -> int:
+        """Число тренировок."""
+        return len(self.speed)
+
+    def basis(self) -> np.ndarray:
+        """Матрица слагаемых формулы: строка на тренировку.
+
+        Считается один раз; дальше каждый пересчёт - одно умножение
+        матрицы на вектор весов.
+        """
+        if self._basis is None:
+            self._basis = BASES[self.workout_type](self)
+        return self._basis
+
+    def calories(self, overrides: Optional[Coefficients] = None
+                 ) -> np.ndarray:
+        """Калории с коэффициентами класса, заменёнными на overrides."""
+        return self.basis() @ weights(self.workout_type, overrides)
+
+
+def intermediates(workout_type: str,
+                  columns: Sequence[Sequence[float]],
+                  index: Optional[np.ndarray] = None) -> Intermediates:
+    """Рассчитать промежуточные величины по колонкам данных датчиков."""
+    result = calculate_batch(workout_type, columns)
+    weight = as_column(columns[2])
+    height = as_column(columns[3]) if workout_type == 'WLK' else None
+    return Intermediates(workout_type, result.speed,
+                         np.float_power(result.speed, 2),
+                         weight * result.duration, height, index)
+
+
+def coefficients(workout_type: str,
+                 overrides: Optional[Coefficients] = None
+                 ) -> Dict[str, float]:
+    """Коэффициенты класса тренировки с учётом замен."""
+    if workout_type not in COEFFICIENTS:
+        raise KeyError(f'{workout_type} является недопустимым значением')
+    training = TYPE_OF_TRAINING[workout_type]
+    result = {name: getattr(training, name)
+              for name in COEFFICIENTS[workout_type]}
+    for name, value in (overrides or {}).items():
+        if name not in result:
+            raise KeyError(f'{name} не является коэффициентом '
+                           f'{training.__name__}')
+        result[name] = value
+    return result
+
+
+def running_basis(values: Intermediates) -> np.ndarray:
+    """Слагаемые формулы бега."""
+    return np.column_stack((values.speed * values.weight_duration,
+                            values.weight_duration))
+
+
+def walking_basis(values: Intermediates) -> np.ndarray:
+    """Слагаемые формулы спортивной ходьбы."""
+    return np.column_stack((
+        values.weight_duration,
+        values.speed_sq * values.weight_duration / values.height))
+
+
+def swimming_basis(values: Intermediates) -> np.ndarray:
+    """Слагаемые формулы плавания."""
+    return np.column_stack((values.speed * values.weight_duration,
+                            values.weight_duration))
+
+
+def running_weights(training: Type[Training],
+                    coef: Dict[str, float]) -> Tuple[float, ...]:
+    """Веса слагаемых формулы бега."""
+    scale = training.MIN_IN_H / training.M_IN_KM
+    return (coef['CALORIES_MEAN_SPEED_MULTIPLIER'] * scale,
+            coef['CALORIES_MEAN_SPEED_SHIFT'] * scale)
+
+
+def walking_weights(training: Type[Training],
+                    coef: Dict[str, float]) -> Tuple[float, ...]:
+    """Веса слагаемых формулы спортивной ходьбы."""
+    return (coef['CALORIES_WEIGHT_MULTIPLIER'] * training.MIN_IN_H,
+            coef['CALORIES_SPEED_HEIGHT_MULTIPLIER']
+            * training.KMH_IN_MSEC ** 2 * training.CM_IN_M
+            * training.MIN_IN_H)
+
+
+def swimming_weights(training: Type[Training],
+                     coef: Dict[str, float]) -> Tuple[float, ...]:
+    """Веса слагаемых формулы плавания."""
+    return (coef['CALORIES_WEIGHT_MULTIPLIER'],
+            coef['CALORIES_WEIGHT_MULTIPLIER']
+            * coef['CALORIES_MEAN_SPEED_SHIFT'])
+
+
+BASES: Dict[str, Callable[[Intermediates], np.ndarray]] = {
+    'RUN': running_basis,
+    'WLK': walking_basis,
+    'SWM': swimming_basis,
+}
+WEIGHTS: Dict[str, Callable[[Type[Training], Dict[str, float]],
+                            Tuple[float, ...]]] = {
+    'RUN': running_weights,
+    'WLK': walking_weights,
+    'SWM': swimming_weights,
+}
+
+
+def weights(workout_type: str,
+            overrides: Optional[Coefficients] = None) -> np.ndarray:
+    """Вектор весов слагаемых для коэффициентов с учётом замен."""
+    coef = coefficients(workout_type, overrides)
+    return np.array(WEIGHTS[workout_type](TYPE_OF_TRAINING[workout_type],
+                                          coef),
+                    dtype=np.float64)
+
+
+def save_store(path: str, store: Mapping[str, Intermediates]) -> None:
+    """Сохранить промежуточные величины всех типов в файл .npz."""
+    arrays = {}
+    for workout_type, values in store.items():
+        for name in INTERMEDIATES:
+            column = getattr(values, name)
+            if column is not None:
+                arrays[f'{workout_type}.{name}'] = column
+    np.savez(path, **arrays)
+
+
+def load_store(path: str) -> Dict[str, Intermediates]:
+    """Загрузить промежуточные величины из файла .npz."""
+    columns: Dict[str, Dict[str, np.ndarray]] = {}
+    with np.load(path) as archive:
+        for key in archive.files:
+            workout_type, name = key.split('.', 1)
+            columns.setdefault(workout_type, {})[name] = archive[key]
+    return {workout_type: Intermediates(workout_type, **values)
+            for workout_type, values in columns.items()}
+
+
+def build_store(path: str) -> Dict[str, Intermediates]:
+    """Рассчитать промежуточные величины по двоичному файлу пакетов.
+
+    Вместе с величинами сохраняются номера записей в файле, чтобы
+    пересчитанные калории можно было сопоставить с исходными пакетами.
+    """
+    records = open_packages(path)
+    store = {}
+    for workout_type, code in TYPE_CODES.items():
+        index = np.flatnonzero(records['workout_type'] == code)
+        if len(index):
+            selected = records[index]
+            store[workout_type] = intermediates(
+                workout_type,
+                [selected[name]
+                 for name in VALUE_FIELDS[:ARITY[workout_type]]],
+                index)
+    return store
+
+
+def parse_overrides(items: Sequence[str]) -> Dict[str, Dict[str, float]]:
+    """Разобрать замены вида RUN.CALORIES_MEAN_SPEED_SHIFT=1.8.
+
+    Тип тренировки и имя коэффициента проверяются по COEFFICIENTS:
+    опечатка не должна молча оставлять старое значение.
+    """
+    overrides: Dict[str, Dict[str, float]] = {}
+    for item in items:
+        key, sign, value = item.partition('=')
+        workout_type, dot, name = key.partition('.')
+        if not sign or not dot:
+            raise ValueError(f'{item}: ожидается TYPE.NAME=VALUE')
+        if workout_type not in COEFFICIENTS:
+            raise ValueError(f'{item}: {workout_type} является '
+                             f'недопустимым значением')
+        if name not in COEFFICIENTS[workout_type]:
+            raise ValueError(f'{item}: {name} не является коэффициентом '
+                             f'{workout_type}, допустимы '
+                             f'{", ".join(COEFFICIENTS[workout_type])}')
+        try:
+            overrides.setdefault(workout_type, {})[name] = float(value)
+        except ValueError:
+            raise ValueError(f'{item}: {value!r} не является '
+                             f'числом') from None
+    return overrides
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Главная функция."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('store', help='файл .npz с промежуточными величинами')
+    parser.add_argument('--build', metavar='PACKAGES',
+                        help='рассчитать хранилище по двоичному файлу')
+    parser.add_argument('--set', nargs='*', default=[], dest='overrides',
+                        metavar='TYPE.NAME=VALUE',
+                        help='новые значения коэффициентов')
+    args = parser.parse_args(argv)
+    try:
+        overrides = parse_overrides(args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.build:
+        save_store(args.store, build_store(args.build))
+    store = load_store(args.store)
+    for workout_type, values in store.items():
+        calories = values.calories(overrides.get(workout_type))
+        print(f'{workout_type}: тренировок {len(values)}, '
+              f'ккал всего {calories.sum():.3f}')
+
+
+if __name__ == '__main__':
+    main()
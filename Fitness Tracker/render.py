@@ -0,0 +1,76 @@
+"""Массовое форматирование результатов тренировок.
+
+Вместо строки на каждое сообщение шаблон InfoMessage.MESSAGE повторяется
+по числу записей и заполняется одним оператором %, так что на пакет
+получается одна строка с тем же текстом, что дают вызовы get_message().
+"""
+import os
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+from typing import Iterable, Sequence
+
+from homework import InfoMessage
+
+LINE: str = InfoMessage.MESSAGE + '\n'
+# Сколько сообщений форматировать за раз при записи в файл
+CHUNK_SIZE: int = 4096
+
+message_fields = attrgetter('training_type', 'duration', 'distance',
+                            'speed', 'calories')
+
+
+@lru_cache(maxsize=32)
+def template(count: int) -> str:
+    """Получить шаблон на count строк; частые размеры кэшируются."""
+    return LINE * count
+
+
+def render(messages: Sequence[InfoMessage]) -> str:
+    """Отформатировать пакет сообщений в одну строку, по строке на запись."""
+    values = tuple(chain.from_iterable(map(message_fields, messages)))
+    return template(len(messages)) % values
+
+
+def render_columns(training_type: str,
+                   duration: Sequence[float],
+                   distance: Sequence[float],
+                   speed: Sequence[float],
+                   calories: Sequence[float]) -> str:
+    """Отформатировать колонки результатов одного типа тренировки.
+
+    Подходит для batch.BatchResult и compact.InfoMessageBatch: объекты
+    InfoMessage не создаются совсем.
+    """
+    count = len(duration)
+    values = tuple(chain.from_iterable(
+        zip([training_type] * count, duration, distance, speed, calories)))
+    return template(count) % values
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """Записать байты в дескриптор целиком, с учётом частичной записи."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def write_messages(messages: Iterable[InfoMessage], fd: int,
+                   chunk_size: int = CHUNK_SIZE) -> int:
+    """Записать сообщения прямо в файловый дескриптор, минуя print().
+
+    Возвращает количество записанных сообщений.
+    """
+    count = 0
+    chunk = []
+    for info in messages:
+        chunk.append(info)
+        if len(chunk) == chunk_size:
+            write_all(fd, render(chunk).encode('utf-8'))
+            count += len(chunk)
+            chunk.clear()
+    if chunk:
+        write_all(fd, render(chunk).encode('utf-8'))
+        count += len(chunk)
+    return count
@@ -0,0 +1,277 @@
+"""Asyncio-сервер для потоковой телеметрии фитнес-трекера.
+
+Устройства присылают пакеты по одному в строке, в формате JSON lines
+из pipeline.py: ["RUN", [15000, 1, 75]] или {"workout_type": "RUN",
+"data": [15000, 1, 75]}. На каждую строку сервер отвечает
+строкой JSON с полями InfoMessage либо {"error": "..."} в том же порядке.
+Пакеты всех соединений копятся в общей очереди и считаются пачками раз
+в batch_interval секунд или по накоплении batch_size пакетов, так что
+одним циклом событий обслуживаются тысячи соединений.
+
+Запуск: python server.py [--host H] [--port P | --unix PATH]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+from homework import read_package
+from pipeline import parse_record
+from render import message_fields
+
+logger = logging.getLogger(__name__)
+
+BATCH_INTERVAL: float = 0.005
+BATCH_SIZE: int = 1000
+# Сколько ответов одно соединение может ждать, прежде чем сервер
+# перестанет читать из него новые строки
+MAX_IN_FLIGHT: int = 1000
+STATS_INTERVAL: float = 10.0
+# Очередь входящих соединений: значение по умолчанию (100) не выдерживает
+# одновременного подключения тысяч устройств; ядро урежет до somaxconn
+BACKLOG: int = 4096
+# Поля ответа; dataclasses.asdict() глубоко копирует значения и на
+# плоском InfoMessage в разы медленнее прямой выборки полей
+RESPONSE_FIELDS: Tuple[str, ...] = ('training_type', 'duration', 'distance',
+                                    'speed', 'calories')
+
+Request = Tuple[str, list, 'asyncio.Future[bytes]', float]
+
+
+@dataclass
+class Stats:
+    """Счётчики нагрузки и задержек сервера."""
+
+    started: float = field(default_factory=time.monotonic)
+    connections: int = 0
+    active: int = 0
+    requests: int = 0
+    errors: int = 0
+    batches: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=10000))
+
+    def observe(self, latency: float) -> None:
+        """Учесть задержку обработки одного пакета."""
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latencies.append(latency)
+
+    def percentile(self, share: float) -> float:
+        """Процентиль задержки по последним пакетам, в секундах."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+    def summary(self) -> str:
+        """Сводка для лога."""
+        elapsed = time.monotonic() - self.started
+        return (f'соединений: {self.active}/{self.connections}, '
+                f'пакетов: {self.requests} '
+                f'({self.requests / elapsed:.0f}/с), '
+                f'ошибок: {self.errors}, пачек: {self.batches}, '
+                f'p50: {self.percentile(0.5) * 1000:.2f} мс, '
+                f'p99: {self.percentile(0.99) * 1000:.2f} мс, '
+                f'max: {self.latency_max * 1000:.2f} мс')
+
+
+def encode(payload: dict) -> bytes:
+    """Закодировать ответ в строку JSON."""
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def error_response(error: Exception) -> bytes:
+    """Строка ответа с описанием ошибки."""
+    return encode({'error': f'{type(error).__name__}: {error}'})
+
+
+class TelemetryServer:
+    """Сервер, собирающий пакеты всех соединений в общие пачки."""
+
+    def __init__(self, batch_interval: float = BATCH_INTERVAL,
+                 batch_size: int = BATCH_SIZE) -> None:
+        """Задать паузу между пачками и наибольший размер пачки."""
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.queue: Deque[Request] = deque()
+        self.wakeup = asyncio.Event()
+        self.stats = Stats()
+
+    def submit(self, workout_type: str, data: list) -> 'asyncio.Future[bytes]':
+        """Поставить пакет в очередь на расчёт."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append((workout_type, data, future, time.monotonic()))
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+        return future
+
+    def process_batch(self) -> None:
+        """Рассчитать всё, что накопилось в очереди."""
+        batch: List[Request] = []
+        while self.queue and len(batch) < self.batch_size:
+            batch.append(self.queue.popleft())
+        for workout_type, data, future, queued in batch:
+            if future.cancelled():
+                continue
+            try:
+                info = read_package(workout_type, data).show_training_info()
+                response = encode(
+                    dict(zip(RESPONSE_FIELDS, message_fields(info))))
+            except Exception as error:
+                # Любой негодный пакет, в том числе с числом, которое не
+                # влезает во float, получает ответ с ошибкой, а не роняет
+                # пачку и всех, кто в ней ждёт
+                self.stats.errors += 1
+                response = error_response(error)
+            future.set_result(response)
+            # Задержка снимается после ответа, чтобы в неё вошли расчёт
+            # и кодирование, а не только ожидание в очереди
+            self.stats.observe(time.monotonic() - queued)
+        self.stats.requests += len(batch)
+        self.stats.batches += 1
+
+    async def batcher(self) -> None:
+        """Раз в batch_interval или по заполнении пачки считать очередь."""
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(),
+                                       self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            while self.queue:
+                try:
+                    self.process_batch()
+                except Exception:
+                    logger.exception('Сбой при расчёте пачки')
+                # Дать соединениям забрать ответы между пачками
+                await asyncio.sleep(0)
+
+    async def reply(self, writer: asyncio.StreamWriter,
+                    pending: 'asyncio.Queue[asyncio.Future[bytes]]') -> None:
+        """Отправлять ответы соединению в порядке поступления пакетов."""
+        while True:
+            future = await pending.get()
+            writer.write(await future)
+            if pending.empty():
+                await writer.drain()
+            pending.task_done()
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Обслужить одно соединение устройства."""
+        self.stats.connections += 1
+        self.stats.active += 1
+        pending: 'asyncio.Queue[asyncio.Future[bytes]]' = asyncio.Queue(
+            MAX_IN_FLIGHT)
+        replier = asyncio.create_task(self.reply(writer, pending))
+        try:
+            async for line in reader:
+                if line.strip():
+                    await pending.put(self.parse(line))
+            # Устройство закончило передачу: дождаться отправки ответов
+            # или обрыва соединения, если отправка не удалась
+            drained = asyncio.create_task(pending.join())
+            await asyncio.wait((drained, replier),
+                               return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+        except ConnectionError:
+            pass
+        finally:
+            await self.finish(replier, writer)
+
+    def parse(self, line: bytes) -> 'asyncio.Future[bytes]':
+        """Разобрать строку и вернуть будущий ответ на неё."""
+        try:
+            workout_type, data = parse_record(json.loads(line))
+        except (TypeError, ValueError) as error:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(error_response(error))
+            self.stats.errors += 1
+            return future
+        return self.submit(workout_type, data)
+
+    async def finish(self, replier: asyncio.Task,
+                     writer: asyncio.StreamWriter) -> None:
+        """Остановить отправку ответов и закрыть соединение."""
+        self.stats.active -= 1
+        replier.cancel()
+        try:
+            await replier
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def report(self, interval: float) -> None:
+        """Периодически писать метрики в лог."""
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(self.stats.summary())
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765,
+                unix: Optional[str] = None,
+                batch_interval: float = BATCH_INTERVAL,
+                batch_size: int = BATCH_SIZE,
+                stop: Optional[asyncio.Event] = None) -> Stats:
+    """Запустить сервер и работать до установки события stop."""
+    server = TelemetryServer(batch_interval, batch_size)
+    stop = stop or asyncio.Event()
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix,
+                                                   backlog=BACKLOG)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port,
+                                              backlog=BACKLOG)
+    tasks = [asyncio.create_task(server.batcher()),
+             asyncio.create_task(server.report(STATS_INTERVAL))]
+    logger.info('Сервер слушает %s', unix or f'{host}:{port}')
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(server.stats.summary())
+    return server.stats
+
+
+def main() -> None:
+    """Главная функция."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='путь к Unix-сокету вместо TCP')
+    parser.add_argument('--batch-interval', type=float,
+                        default=BATCH_INTERVAL)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await serve(args.host, args.port, args.unix,
+                    args.batch_interval, args.batch_size, stop)
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,18 @@ import sys
 from pathlib import Path
 from io import StringIO
 
+import pytest
+
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR))
 
+# По пакету каждого встроенного типа тренировки
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
 
 class Capturing(list):
     """
@@ -29,3 +38,33 @@ class Capturing(list):
 
 def pytest_make_parametrize_id(config, val):
     return repr(val)
+
+
+@pytest.fixture
+def packages():
+    """Пакеты датчиков: по одному на встроенный тип тренировки."""
+    return [(workout_type, list(data)) for workout_type, data in PACKAGES]
+
+
+@pytest.fixture(params=PACKAGES)
+def package(request):
+    """Один пакет каждого встроенного типа тренировки по очереди."""
+    workout_type, data = request.param
+    return workout_type, list(data)
+
+
+@pytest.fixture
+def show_info():
+    """Результаты пакетов, рассчитанные по одному через homework."""
+    import homework
+
+    def show(packages):
+        return [homework.read_package(*package).show_training_info()
+                for package in packages]
+    return show
+
+
+@pytest.fixture
+def expected_messages(packages, show_info):
+    """Результаты пакетов из фикстуры packages."""
+    return show_info(packages)
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+import pytest
+
+import aggregation
+import homework
+
+DAY = date(2023, 5, 1)
+
+
+def info(workout_type, data):
+    return homework.read_package(workout_type, data).show_training_info()
+
+
+def test_lifetime_totals_per_type_and_overall():
+    aggregator = aggregation.Aggregator()
+    run = info('RUN', [15000, 1, 75])
+    swim = info('SWM', [720, 1, 80, 25, 40])
+    aggregator.update('alice', DAY, run)
+    aggregator.update('alice', DAY, run)
+    aggregator.update('alice', DAY, swim)
+    aggregator.update('bob', DAY, swim)
+
+    running = aggregator.totals('alice', 'Running')
+    assert running.count == 2
+    assert running.distance == run.distance * 2
+    overall = aggregator.totals('alice')
+    assert overall.count == 3
+    assert overall.calories == pytest.approx(run.calories * 2 + swim.calories)
+    assert overall.mean_speed == pytest.approx(
+        overall.distance / overall.duration)
+    assert aggregator.totals('carol').count == 0
+
+
+def test_rolling_windows_evict_old_days():
+    aggregator = aggregation.Aggregator()
+    walk = info('WLK', [9000, 1, 75, 180])
+    for offset in range(10):
+        aggregator.update('alice', DAY + timedelta(days=offset), walk)
+    today = DAY + timedelta(days=9)
+
+    assert aggregator.window('alice', 'daily', today).count == 1
+    weekly = aggregator.window('alice', 'weekly', today)
+    assert weekly.count == 7
+    assert weekly.distance == pytest.approx(walk.distance * 7)
+    later = today + timedelta(days=3)
+    assert aggregator.window('alice', 'weekly', later).count == 4
+    assert aggregator.window('alice', 'weekly', later + timedelta(7)).count == 0
+
+
+def test_rolling_window_accepts_late_records():
+    window = aggregation.RollingWindow(7)
+    run = info('RUN', [15000, 1, 75])
+    window.add(100, run)
+    window.add(98, run)
+    window.add(90, run)
+    assert [day for day, _ in window.buckets] == [98, 100]
+    assert window.totals(100).count == 2
+    assert window.totals(105).count == 1
+
+
+def test_rolling_window_ignores_days_after_today():
+    window = aggregation.RollingWindow(7)
+    run = info('RUN', [15000, 1, 75])
+    window.add(100, run)
+    window.add(103, run)
+    assert window.totals(101).count == 1
+    assert window.totals(99).count == 0
+    assert window.totals(103).count == 2
+
+
+def test_rolling_window_totals_do_not_evict():
+    window = aggregation.RollingWindow(7)
+    run = info('RUN', [15000, 1, 75])
+    window.add(100, run)
+    window.add(101, run)
+    assert window.totals(120).count == 0
+    assert window.totals(101).count == 2
+    assert window.totals(107).count == 1
+    assert [day for day, _ in window.buckets] == [100, 101]
+
+
+def test_totals_are_snapshots():
+    aggregator = aggregation.Aggregator()
+    aggregator.update('alice', DAY, info('RUN', [15000, 1, 75]))
+    aggregator.totals('alice').count += 10
+    aggregator.window('alice', 'weekly', DAY).count += 10
+    assert aggregator.totals('alice').count == 1
+    assert aggregator.window('alice', 'weekly', DAY).count == 1
+
+
+def test_unknown_window():
+    with pytest.raises(KeyError):
+        aggregation.Aggregator().window('alice', 'monthly', DAY)
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+import batch  # noqa: E402
+import homework
+
+
+@pytest.mark.parametrize('workout_type, rows', [
+    ('SWM', [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4],
+             [1206, 12, 6, 12, 6]]),
+    ('RUN', [[15000, 1, 75], [420, 4, 20], [1206, 12, 6]]),
+    ('WLK', [[9000, 1, 75, 180], [9000, 1.5, 75, 180],
+             [3000.33, 2.512, 75.8, 180.1]]),
+])
+def test_calculate_batch_matches_scalar(workout_type, rows):
+    result = batch.calculate_batch(workout_type, batch.rows_to_columns(rows))
+    expected = [
+        homework.read_package(workout_type, data).show_training_info()
+        for data in rows
+    ]
+    assert len(result) == len(rows)
+    assert list(result.messages()) == expected, (
+        'Пакетный расчёт должен совпадать со скалярным до бита.'
+    )
+
+
+def test_calculate_batch_unknown_type():
+    with pytest.raises(KeyError):
+        batch.calculate_batch('XXX', [[1], [1], [1]])
@@ -0,0 +1,18 @@
+from benchmarks import bench_homework
+
+
+def test_generate_packages_is_reproducible():
+    first = list(bench_homework.generate_packages('SWM', 5, seed=1))
+    second = list(bench_homework.generate_packages('SWM', 5, seed=1))
+    assert first == second
+    assert [len(data) for data in first[0]] == [5] * 5
+
+
+def test_run_and_compare():
+    names = ['read_package', 'show_training_info', 'get_message']
+    results = bench_homework.run((10,), names)
+    assert len(results) == len(names) * len(bench_homework.GENERATORS)
+    slower = [dict(row, ns_per_package=row['ns_per_package'] / 10)
+              for row in results]
+    assert bench_homework.compare(results, results, 1.2) == []
+    assert len(bench_homework.compare(results, slower, 1.2)) == len(results)
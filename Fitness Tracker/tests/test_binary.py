@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import binary  # noqa: E402
+
+
+@pytest.fixture
+def packages(packages):
+    return packages + [('WLK', [3000.33, 2.512, 75.8, 180.1])]
+
+
+@pytest.fixture
+def expected_messages(packages, show_info):
+    # Файл хранит значения во float32: сверяемся с расчётом по ним же
+    return show_info([(workout_type, [float(np.float32(value))
+                                      for value in data])
+                      for workout_type, data in packages])
+
+
+@pytest.fixture
+def packages_file(tmp_path, packages):
+    path = str(tmp_path / 'packages.bin')
+    assert binary.write_packages(path, packages, chunk_size=3) == 4
+    return path
+
+
+def test_open_packages_is_memory_mapped(packages_file, packages):
+    records = binary.open_packages(packages_file)
+    assert len(records) == len(packages)
+    assert records.dtype == binary.RECORD_DTYPE
+    assert not records.flags.owndata, (
+        'Записи должны читаться из файла без копирования.'
+    )
+
+
+def test_iter_trainings(packages_file, expected_messages):
+    records = binary.open_packages(packages_file)
+    result = [training.show_training_info()
+              for training in binary.iter_trainings(records)]
+    assert result == expected_messages
+
+
+def test_calculate_records(packages_file, expected_messages):
+    records = binary.open_packages(packages_file)
+    result = [None] * len(records)
+    for index, batch_result in binary.calculate_records(records):
+        for position, info in zip(index.tolist(), batch_result.messages()):
+            result[position] = info
+    assert result == expected_messages
+
+
+def test_record_size():
+    assert binary.RECORD_DTYPE.itemsize == 21
+
+
+def test_to_records_rejects_values_too_big_for_float32():
+    with pytest.raises(ValueError):
+        binary.to_records([('RUN', [1e300, 1, 75])])
+
+
+def test_to_records_rejects_bad_arity():
+    with pytest.raises(ValueError):
+        binary.to_records([('RUN', [15000, 1])])
+
+
+def test_open_packages_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'packages.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        binary.open_packages(str(path))
@@ -0,0 +1,54 @@
+import pytest
+
+import compact
+import homework
+
+
+@pytest.mark.parametrize('read', [homework.read_package,
+                                  compact.read_compact_package])
+def test_cached_metrics_follow_inputs(read):
+    training = read('RUN', [9000, 1, 75])
+    assert training.get_distance() == 5.85
+    assert training.get_mean_speed() == 5.85
+    training.action = 420
+    training.duration = 4
+    assert training.get_distance() == 0.273, (
+        'После изменения входных данных дистанция должна пересчитываться.'
+    )
+    assert training.get_mean_speed() == 0.06825, (
+        'После изменения входных данных скорость должна пересчитываться.'
+    )
+
+
+@pytest.mark.parametrize('read', [homework.read_package,
+                                  compact.read_compact_package])
+def test_cached_swimming_speed_follows_pool(read):
+    training = read('SWM', [720, 1, 80, 25, 40])
+    assert training.get_mean_speed() == 1.0
+    training.count_pool = 4
+    training.length_pool = 42
+    training.duration = 4
+    assert training.get_mean_speed() == 0.042
+
+
+def test_show_training_info_stable_on_repeat():
+    training = homework.read_package('WLK', [9000, 1.5, 75, 180])
+    assert training.show_training_info() == training.show_training_info()
+
+
+def test_show_training_info_keeps_no_state():
+    training = homework.read_package('RUN', [15000, 1, 75])
+    before = dict(vars(training))
+    training.show_training_info()
+    assert vars(training) == before, (
+        'Расчёт не должен хранить промежуточные метрики в объекте.'
+    )
+
+
+def test_spent_calories_reuses_speed():
+    for workout_type, data in [('SWM', [720, 1, 80, 25, 40]),
+                               ('RUN', [15000, 1, 75]),
+                               ('WLK', [9000, 1, 75, 180])]:
+        training = homework.read_package(workout_type, data)
+        assert training.spent_calories(training.get_mean_speed()) == (
+            training.get_spent_calories())
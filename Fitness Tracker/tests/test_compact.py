@@ -0,0 +1,90 @@
+import pickle
+
+import pytest
+
+import compact
+import homework
+
+
+def test_compact_training_matches_original(package):
+    workout_type, data = package
+    training = compact.read_compact_package(workout_type, data)
+    assert not hasattr(training, '__dict__'), (
+        'Компактный вариант тренировки не должен иметь `__dict__`.'
+    )
+    expected = homework.read_package(workout_type, data).show_training_info()
+    assert training.show_training_info() == expected
+
+
+def test_compact_training_pickles(package):
+    training = compact.read_compact_package(*package)
+    restored = pickle.loads(pickle.dumps(training))
+    assert type(restored) is type(training)
+    assert restored.show_training_info() == training.show_training_info()
+
+
+def test_compact_training_reads_constants_from_original(monkeypatch):
+    monkeypatch.setattr(homework.Running, 'LEN_STEP', 1.0)
+    training = compact.read_compact_package('RUN', [15000, 1, 75])
+    assert compact.CompactRunning.LEN_STEP == 1.0
+    assert training.get_distance() == 15.0
+
+
+def test_info_message_is_slotted():
+    info = homework.InfoMessage('Running', 1, 2, 3, 4)
+    assert not hasattr(info, '__dict__'), (
+        '`InfoMessage` должен объявлять `__slots__`.'
+    )
+
+
+def test_info_message_batch_roundtrip(expected_messages):
+    messages = expected_messages
+    batch = compact.InfoMessageBatch(messages)
+    assert len(batch) == len(messages)
+    assert list(batch) == messages
+    assert batch[1] == messages[1]
+    assert batch.nbytes == len(messages) * 33
+
+
+def test_info_message_batch_extend_columns():
+    batch = compact.InfoMessageBatch()
+    batch.extend_columns('Running', [1.0, 2.0], [3.0, 4.0],
+                         [5.0, 6.0], [7.0, 8.0])
+    assert list(batch) == [
+        homework.InfoMessage('Running', 1.0, 3.0, 5.0, 7.0),
+        homework.InfoMessage('Running', 2.0, 4.0, 6.0, 8.0),
+    ]
+
+
+def test_info_message_batch_extend_columns_from_batch_result(package,
+                                                             show_info):
+    np = pytest.importorskip('numpy')
+    import batch as batch_module
+    workout_type, data = package
+    result = batch_module.calculate_batch(
+        workout_type, batch_module.rows_to_columns([data, data]))
+    batch = compact.InfoMessageBatch()
+    batch.extend_columns(result.training_type, result.duration,
+                         result.distance, result.speed, result.calories)
+    assert list(batch) == list(result.messages())
+    np.testing.assert_allclose(
+        [info.calories for info in batch],
+        [info.calories for info in show_info([package, package])])
+
+
+def test_info_message_batch_extend_columns_is_atomic():
+    batch = compact.InfoMessageBatch()
+    with pytest.raises(ValueError):
+        batch.extend_columns('Running', [1, 2], [3], [5, 6], [7, 8])
+    with pytest.raises(TypeError):
+        batch.extend_columns('Running', [1, 2], [3, 'x'], [5, 6], [7, 8])
+    assert len(batch) == 0
+    assert all(len(getattr(batch, name)) == 0 for name in batch.FIELDS)
+
+
+def test_info_message_batch_types_are_per_instance():
+    message = homework.InfoMessage('Cycling', 1.0, 2.0, 3.0, 4.0)
+    batch = compact.InfoMessageBatch([message])
+    assert list(batch) == [message]
+    assert 'Cycling' not in compact.InfoMessageBatch().training_types
+    assert 'Cycling' not in compact.InfoMessageBatch.TRAINING_TYPES
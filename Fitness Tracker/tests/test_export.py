@@ -0,0 +1,124 @@
+import pytest
+
+import export
+
+
+@pytest.fixture
+def packages(packages):
+    return packages + [('WLK', [3000.33, 2.512, 75.8, 180.1]),
+                       ('RUN', [1206, 12, 6])]
+
+
+@pytest.fixture
+def messages(expected_messages):
+    return expected_messages
+
+
+def expected_columns(messages):
+    return {name: [getattr(info, name) for info in messages]
+            for name in export.COLUMNS}
+
+
+def test_row_groups_split_by_size(messages):
+    groups = list(export.row_groups(messages, size=2))
+    assert [len(group['training_type']) for group in groups] == [2, 2, 1], (
+        'Результаты должны делиться на группы по size строк.'
+    )
+
+
+@pytest.mark.parametrize('fmt', export.FORMATS)
+def test_export_roundtrip(tmp_path, messages, fmt):
+    if fmt != 'ftc':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'results.{fmt}')
+    assert export.export(messages, path, row_group_size=2) == len(messages)
+    assert export.read_columns(path) == expected_columns(messages), (
+        f'Колонки формата {fmt} должны совпадать с полями InfoMessage.'
+    )
+
+
+@pytest.mark.parametrize('fmt', export.FORMATS)
+def test_read_selected_columns(tmp_path, messages, fmt):
+    if fmt != 'ftc':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'results.out')
+    export.export(messages, path, fmt, row_group_size=3)
+    result = export.read_columns(path, ['calories', 'distance'], fmt)
+    expected = expected_columns(messages)
+    assert result == {'calories': expected['calories'],
+                      'distance': expected['distance']}
+
+
+def test_parquet_row_groups(tmp_path, messages):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'results.parquet')
+    export.export(messages, path, row_group_size=2)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+
+
+def test_read_ftc_by_groups(tmp_path, messages):
+    path = str(tmp_path / 'results.ftc')
+    export.export(messages, path, row_group_size=2)
+    groups = list(export.read_ftc(path, ['training_type']))
+    assert [group['training_type'] for group in groups] == [
+        ['Swimming', 'Running'], ['SportsWalking', 'SportsWalking'],
+        ['Running']]
+
+
+def test_read_ftc_rejects_unknown_file(tmp_path):
+    path = tmp_path / 'results.ftc'
+    path.write_bytes(b'\0' * 16)
+    with pytest.raises(ValueError):
+        list(export.read_ftc(str(path)))
+
+
+def test_read_ftc_rejects_unknown_column(tmp_path, messages):
+    path = str(tmp_path / 'results.ftc')
+    export.export(messages, path)
+    with pytest.raises(KeyError):
+        list(export.read_ftc(path, ['pace']))
+
+
+def test_export_without_pyarrow(monkeypatch, tmp_path, messages):
+    monkeypatch.setattr(export, 'pa', None)
+    with pytest.raises(ImportError):
+        export.export(messages, str(tmp_path / 'results.parquet'))
+    path = str(tmp_path / 'results.out')
+    export.export(messages, path)
+    assert export.read_columns(path) == expected_columns(messages), (
+        'Без pyarrow файл с незнакомым расширением пишется в формате ftc.'
+    )
+
+
+def test_export_rejects_unknown_format(tmp_path, messages):
+    with pytest.raises(KeyError):
+        export.export(messages, str(tmp_path / 'results.csv'), 'csv')
+
+
+@pytest.mark.parametrize('size', [0, -1])
+def test_export_rejects_bad_row_group_size(tmp_path, messages, size):
+    path = tmp_path / 'results.ftc'
+    with pytest.raises(ValueError):
+        export.export(messages, str(path), row_group_size=size)
+    assert not path.exists()
+    with pytest.raises(ValueError):
+        next(export.row_groups(messages, size))
+
+
+def test_main_rejects_bad_row_group_size(tmp_path, capsys):
+    target = tmp_path / 'results.ftc'
+    with pytest.raises(SystemExit):
+        export.main([str(tmp_path / 'packages.jsonl'), str(target),
+                     '--row-group-size', '0'])
+    assert '--row-group-size' in capsys.readouterr().err
+    assert not target.exists()
+
+
+def test_main(tmp_path, capsys, packages):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('\n'.join(
+        f'["{workout_type}", {data}]' for workout_type, data in packages))
+    target = str(tmp_path / 'results.ftc')
+    export.main([str(source), target, '--row-group-size', '2'])
+    assert 'Выгружено результатов: 5' in capsys.readouterr().out
+    assert len(export.read_columns(target)['calories']) == len(packages)
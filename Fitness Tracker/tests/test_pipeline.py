@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+import pipeline
+
+
+@pytest.mark.parametrize('fmt, text', [
+    ('jsonl', '["SWM", [720, 1, 80, 25, 40]]\n'
+              '\n'
+              '{"workout_type": "RUN", "data": [15000, 1, 75]}\n'
+              '["WLK", [9000, 1, 75, 180]]\n'),
+    ('csv', 'SWM,720,1,80,25,40\nRUN,15000,1,75\nWLK,9000,1,75,180\n'),
+])
+def test_read_packages(fmt, text, packages):
+    assert list(pipeline.read_packages(io.StringIO(text), fmt)) == packages
+
+
+def test_process_yields_chunks_lazily(packages, expected_messages):
+    consumed = []
+
+    def source():
+        for package in packages:
+            consumed.append(package)
+            yield package
+
+    chunks = pipeline.process(source(), chunk_size=2)
+    first = next(chunks)
+    assert len(first) == 2
+    assert len(consumed) == 2, (
+        'Следующий кусок не должен читаться до запроса потребителя.'
+    )
+    assert first + next(chunks) == expected_messages
+
+
+def test_process_file(tmp_path, expected_messages):
+    path = tmp_path / 'packages.csv'
+    path.write_text('SWM,720,1,80,25,40\nRUN,15000,1,75\nWLK,9000,1,75,180\n')
+    messages = [info for chunk in pipeline.process_file(str(path))
+                for info in chunk]
+    assert messages == expected_messages
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_process_parallel(ordered, packages, expected_messages):
+    chunks = pipeline.process_parallel(packages * 50, workers=2,
+                                       chunk_size=7, ordered=ordered)
+    messages = [info for chunk in chunks for info in chunk]
+    expected = expected_messages * 50
+    if ordered:
+        assert messages == expected
+    else:
+        assert sorted(map(repr, messages)) == sorted(map(repr, expected))
+
+
+@pytest.mark.parametrize('shards', [1, 3, 64])
+def test_split_file_covers_every_line(tmp_path, shards):
+    path = tmp_path / 'packages.jsonl'
+    path.write_text(''.join(
+        f'["RUN", [{action}, 1, 75]]\n' for action in range(100)))
+    lines = [line
+             for start, end in pipeline.split_file(str(path), shards)
+             for line in pipeline.read_lines(str(path), start, end)]
+    assert lines == path.read_text().splitlines(keepends=True)
+
+
+def test_process_file_parallel(tmp_path, expected_messages):
+    path = tmp_path / 'packages.csv'
+    path.write_text(
+        'SWM,720,1,80,25,40\nRUN,15000,1,75\nWLK,9000,1,75,180\n' * 20)
+    messages = [info for chunk in pipeline.process_file_parallel(
+        str(path), workers=2) for info in chunk]
+    assert messages == expected_messages * 20
@@ -0,0 +1,110 @@
+import pstats
+
+import pytest
+
+import homework
+import pipeline
+import profiling
+import render
+
+@pytest.fixture
+def packages(packages):
+    return packages + [('RUN', [420, 4, 20])]
+
+
+def run_packages(packages):
+    for workout_type, data in packages:
+        homework.read_package(workout_type, data).show_training_info(
+        ).get_message()
+
+
+def test_counts_per_stage(packages):
+    with profiling.Profiler() as profiler:
+        run_packages(packages)
+    counts = {(stage, label): count
+              for stage, label, count, _ in profiler.rows()}
+    assert counts == {
+        ('construct', 'RUN'): 2,
+        ('construct', 'SWM'): 1,
+        ('construct', 'WLK'): 1,
+        ('compute', 'Running'): 2,
+        ('compute', 'SportsWalking'): 1,
+        ('compute', 'Swimming'): 1,
+        ('format', 'InfoMessage'): 4,
+    }, 'Профилировщик должен считать вызовы по этапам и типам.'
+
+
+def test_disable_restores_originals(packages):
+    constructors = dict(homework.CONSTRUCTORS)
+    show_training_info = homework.Training.__dict__['show_training_info']
+    get_message = homework.InfoMessage.__dict__['get_message']
+    profiler = profiling.Profiler().enable()
+    assert homework.CONSTRUCTORS['RUN'] is not constructors['RUN']
+    profiler.disable()
+    assert homework.CONSTRUCTORS == constructors
+    assert (homework.Training.__dict__['show_training_info']
+            is show_training_info)
+    assert homework.InfoMessage.__dict__['get_message'] is get_message, (
+        'После disable() горячий путь должен работать без обёрток.'
+    )
+    run_packages(packages)
+    assert not profiler.rows()
+
+
+def test_results_are_unchanged(packages, show_info):
+    expected = [info.get_message() for info in show_info(packages)]
+    with profiling.Profiler():
+        result = [info.get_message() for info in show_info(packages)]
+    assert result == expected
+
+
+def test_instrument_iter_and_batch():
+    profiler = profiling.Profiler()
+    namespace = {'read': lambda: iter(range(3)), 'render': len}
+    profiler.instrument(namespace, 'read', 'parse', kind='iter')
+    profiler.instrument(namespace, 'render', 'format', kind='batch')
+    assert list(namespace['read']()) == [0, 1, 2]
+    assert namespace['render']([1, 2]) == 2
+    profiler.disable()
+    assert namespace['render'] is len
+    assert [row[:3] for row in profiler.rows()] == [('parse', '', 3),
+                                                    ('format', '', 2)]
+
+
+def test_unknown_stage():
+    with pytest.raises(KeyError):
+        profiling.Profiler().counter('io')
+
+
+def test_dump_stats_and_folded(tmp_path, packages):
+    with profiling.Profiler() as profiler:
+        run_packages(packages)
+    prof = str(tmp_path / 'stages.prof')
+    profiler.dump(prof)
+    stats = pstats.Stats(prof).stats
+    assert stats[('fitness', 1, 'construct:RUN')][:2] == (2, 2)
+    folded = tmp_path / 'stages.folded'
+    profiler.dump(str(folded))
+    lines = folded.read_text().splitlines()
+    assert len(lines) == len(profiler.rows())
+    assert lines[0].startswith('pipeline;construct;RUN ')
+
+
+def test_pipeline_main_profile(tmp_path, capsys, packages):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('\n'.join(
+        f'["{workout_type}", {data}]' for workout_type, data in packages))
+    pipeline.main([str(source), '--profile', '-'])
+    captured = capsys.readouterr()
+    assert captured.out.count('\n') == len(packages)
+    for stage in profiling.STAGES:
+        assert stage in captured.err, (
+            f'В сводке профилирования не хватает этапа {stage}.'
+        )
+    assert pipeline.render is render.render
+    assert pipeline.READERS['jsonl'] is pipeline.read_jsonl
+
+
+def test_pipeline_profile_needs_single_worker(tmp_path):
+    with pytest.raises(SystemExit):
+        pipeline.parse_args(['-', '--workers', '2', '--profile', '-'])
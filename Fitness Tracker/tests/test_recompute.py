@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import batch  # noqa: E402
+import binary  # noqa: E402
+import homework  # noqa: E402
+import recompute  # noqa: E402
+
+ROWS = {
+    'SWM': [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4], [1206, 12, 6, 12, 6]],
+    'RUN': [[15000, 1, 75], [420, 4, 20], [1206, 12, 6]],
+    'WLK': [[9000, 1, 75, 180], [9000, 1.5, 75, 180],
+            [3000.33, 2.512, 75.8, 180.1]],
+}
+
+
+def store_for(workout_type):
+    return recompute.intermediates(
+        workout_type, batch.rows_to_columns(ROWS[workout_type]))
+
+
+@pytest.mark.parametrize('workout_type', ROWS)
+def test_calories_match_scalar(workout_type):
+    expected = [homework.read_package(workout_type, data).get_spent_calories()
+                for data in ROWS[workout_type]]
+    np.testing.assert_allclose(
+        store_for(workout_type).calories(), expected, rtol=1e-12,
+        err_msg='Без замен калории должны совпадать с расчётом классов.')
+
+
+@pytest.mark.parametrize('workout_type, name, value', [
+    ('RUN', 'CALORIES_MEAN_SPEED_MULTIPLIER', 20),
+    ('RUN', 'CALORIES_MEAN_SPEED_SHIFT', 1.5),
+    ('WLK', 'CALORIES_WEIGHT_MULTIPLIER', 0.04),
+    ('WLK', 'CALORIES_SPEED_HEIGHT_MULTIPLIER', 0.031),
+    ('SWM', 'CALORIES_WEIGHT_MULTIPLIER', 2.5),
+    ('SWM', 'CALORIES_MEAN_SPEED_SHIFT', 1.2),
+])
+def test_calories_with_new_coefficient(monkeypatch, workout_type, name,
+                                       value):
+    values = store_for(workout_type)
+    result = values.calories({name: value})
+    monkeypatch.setattr(homework.TYPE_OF_TRAINING[workout_type], name, value)
+    expected = [homework.read_package(workout_type, data).get_spent_calories()
+                for data in ROWS[workout_type]]
+    np.testing.assert_allclose(
+        result, expected, rtol=1e-12,
+        err_msg=f'Пересчёт с новым {name} должен совпадать с полным.')
+
+
+def test_basis_is_computed_once():
+    values = store_for('RUN')
+    assert values.basis() is values.basis()
+
+
+def test_unknown_coefficient():
+    with pytest.raises(KeyError):
+        store_for('RUN').calories({'LEN_STEP': 1})
+
+
+def test_store_roundtrip(tmp_path):
+    path = str(tmp_path / 'packages.bin')
+    binary.write_packages(path, [(workout_type, data)
+                                 for workout_type, rows in ROWS.items()
+                                 for data in rows])
+    store = recompute.build_store(path)
+    store_path = str(tmp_path / 'store.npz')
+    recompute.save_store(store_path, store)
+    loaded = recompute.load_store(store_path)
+    assert loaded.keys() == ROWS.keys()
+    assert loaded['SWM'].height is None
+    np.testing.assert_array_equal(loaded['SWM'].index, [0, 1, 2])
+    np.testing.assert_array_equal(loaded['WLK'].index, [6, 7, 8])
+    for workout_type in ROWS:
+        np.testing.assert_array_equal(loaded[workout_type].calories(),
+                                      store[workout_type].calories())
+
+
+def test_parse_overrides():
+    assert recompute.parse_overrides(
+        ['RUN.CALORIES_MEAN_SPEED_SHIFT=1.8', 'SWM.CALORIES_WEIGHT_MULTIPLIER=3']
+    ) == {'RUN': {'CALORIES_MEAN_SPEED_SHIFT': 1.8},
+          'SWM': {'CALORIES_WEIGHT_MULTIPLIER': 3.0}}
+
+
+@pytest.mark.parametrize('item', [
+    'RUN.CALORIES_MEAN_SPEED_SHIFT',
+    'RUN=1.8',
+    'CYC.CALORIES_MEAN_SPEED_SHIFT=1.8',
+    'RUN.CALORIES_MEAN_SPEED_SHIF=1.8',
+    'RUN.LEN_STEP=1',
+    'RUN.CALORIES_MEAN_SPEED_SHIFT=много',
+])
+def test_parse_overrides_rejects_bad_items(item):
+    with pytest.raises(ValueError, match='RUN|CYC'):
+        recompute.parse_overrides([item])
+
+
+def test_main_reports_bad_override(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        recompute.main([str(tmp_path / 'store.npz'),
+                        '--set', 'RUN.CALORIES_MEAN_SPEED_SHIF=1.8'])
+    assert 'CALORIES_MEAN_SPEED_SHIF' in capsys.readouterr().err
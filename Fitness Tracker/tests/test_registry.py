@@ -0,0 +1,73 @@
+import pytest
+
+import homework
+
+
+class Cycling(homework.Training):
+    """Тренировка: велосипед."""
+    LEN_STEP = 5.0
+
+    def get_spent_calories(self) -> float:
+        return self.weight * self.duration
+
+
+@pytest.fixture
+def registries(monkeypatch):
+    for registry in ('TYPE_OF_TRAINING', 'TRAINING_FIELDS', 'CONSTRUCTORS'):
+        monkeypatch.setattr(homework, registry,
+                            dict(getattr(homework, registry)))
+
+
+@pytest.fixture
+def registered_cycling(registries):
+    homework.register_training('CYC')(Cycling)
+    return Cycling
+
+
+def test_register_new_training(registered_cycling):
+    training = homework.read_package('CYC', [1000, 2, 70])
+    assert isinstance(training, Cycling)
+    assert homework.TRAINING_FIELDS['CYC'] == ('action', 'duration', 'weight')
+    assert training.show_training_info() == homework.InfoMessage(
+        'Cycling', 2, 5.0, 2.5, 140)
+
+
+@pytest.mark.parametrize('workout_type, data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+])
+def test_compiled_constructor_matches_init(workout_type, data):
+    training = homework.read_package(workout_type, data)
+    expected = homework.TYPE_OF_TRAINING[workout_type](*data)
+    assert vars(training) == vars(expected)
+
+
+def test_read_package_rejects_wrong_arity():
+    with pytest.raises(ValueError, match='RUN: ожидается 3 полей'):
+        homework.read_package('RUN', [15000, 1])
+    with pytest.raises(ValueError):
+        homework.read_package('RUN', [15000, 1, 75, 180])
+
+
+def test_read_package_rejects_unknown_type():
+    with pytest.raises(KeyError):
+        homework.read_package('XXX', [1, 2, 3])
+
+
+class Rowing(homework.Training):
+    """Тренировка: гребля, __init__ которой не только присваивает поля."""
+
+    def __init__(self, action: int, duration: float, weight: float) -> None:
+        super().__init__(action, duration, weight)
+        self.strokes_per_minute = action / duration / 60
+
+    def get_spent_calories(self) -> float:
+        return self.weight * self.duration
+
+
+def test_register_calls_init_by_default(registries):
+    homework.register_training('ROW')(Rowing)
+    training = homework.read_package('ROW', [1200, 0.5, 80])
+    assert training.strokes_per_minute == 40
+    assert homework.TRAINING_FIELDS['ROW'] == ('action', 'duration', 'weight')
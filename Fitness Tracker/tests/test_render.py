@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+import render
+
+
+@pytest.fixture
+def packages():
+    return [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [1206, 12, 6]),
+            ('WLK', [3000.33, 2.512, 75.8, 180.1])]
+
+
+def expected_text(infos):
+    return ''.join(info.get_message() + '\n' for info in infos)
+
+
+def test_render_matches_get_message(expected_messages):
+    infos = expected_messages
+    assert render.render(infos) == expected_text(infos), (
+        'Пакетное форматирование должно давать тот же текст, '
+        'что и `get_message`.'
+    )
+    assert render.render([]) == ''
+
+
+def test_render_columns(expected_messages):
+    infos = [info for info in expected_messages
+             if info.training_type == 'SportsWalking']
+    text = render.render_columns(
+        'SportsWalking',
+        *[[getattr(info, field) for info in infos]
+          for field in ('duration', 'distance', 'speed', 'calories')])
+    assert text == expected_text(infos)
+
+
+def test_write_messages_to_fd(tmp_path, expected_messages):
+    infos = expected_messages * 3
+    path = tmp_path / 'out.txt'
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+    try:
+        written = render.write_messages(iter(infos), fd, chunk_size=4)
+    finally:
+        os.close(fd)
+    assert written == len(infos)
+    assert path.read_text(encoding='utf-8') == expected_text(infos)
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import server
+
+
+async def client(path, lines):
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(''.join(line + '\n' for line in lines).encode())
+    await writer.drain()
+    writer.write_eof()
+    responses = [json.loads(line) async for line in reader]
+    writer.close()
+    return responses
+
+
+def test_server_answers_many_clients_in_order(tmp_path, packages,
+                                              expected_messages):
+    path = str(tmp_path / 'server.sock')
+    lines = [json.dumps(package) for package in packages] * 20
+    lines.insert(5, 'not json')
+    lines.insert(7, '["XXX", [1, 2, 3]]')
+
+    async def scenario():
+        stop = asyncio.Event()
+        serving = asyncio.create_task(server.serve(
+            unix=path, batch_interval=0.001, batch_size=16, stop=stop))
+        while not serving.done():
+            try:
+                results = await asyncio.gather(
+                    *(client(path, lines) for _ in range(50)))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.01)
+        stop.set()
+        return results, await serving
+
+    results, stats = asyncio.run(scenario())
+    expected = [{'training_type': info.training_type,
+                 'duration': info.duration,
+                 'distance': info.distance,
+                 'speed': info.speed,
+                 'calories': info.calories}
+                for info in expected_messages] * 20
+    for responses in results:
+        assert len(responses) == len(lines)
+        assert 'error' in responses[5] and 'error' in responses[7]
+        del responses[7], responses[5]
+        assert responses == expected, (
+            'Ответы должны приходить в порядке пакетов соединения.'
+        )
+    assert stats.connections == 50
+    assert stats.requests == 50 * (len(lines) - 1)
+    assert stats.errors == 100
+    assert stats.batches < stats.requests
+
+
+def test_bad_package_does_not_stop_server(tmp_path, packages):
+    path = str(tmp_path / 'server.sock')
+    huge = json.dumps(['RUN', [10 ** 400, 1, 75]])
+    good = json.dumps(packages[1])
+    as_dict = json.dumps({'workout_type': 'RUN', 'data': [15000, 1, 75]})
+
+    async def scenario():
+        stop = asyncio.Event()
+        serving = asyncio.create_task(server.serve(
+            unix=path, batch_interval=0.001, stop=stop))
+        while True:
+            try:
+                bad = await asyncio.wait_for(client(path, [huge, good]), 2)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.01)
+        later = await asyncio.wait_for(
+            client(path, [good, as_dict, '{"data": []}']), 2)
+        stop.set()
+        await serving
+        return bad, later
+
+    bad, later = asyncio.run(scenario())
+    assert 'OverflowError' in bad[0]['error']
+    assert later[0] == later[1] == bad[1] != bad[0], (
+        'После негодного пакета сервер должен отвечать на следующие.'
+    )
+    assert 'error' in later[2]
+
+
+def test_latency_includes_calculation(monkeypatch, packages):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(server, 'time',
+                        SimpleNamespace(monotonic=lambda: clock.now))
+    read_package = server.read_package
+
+    def slow_read_package(workout_type, data):
+        clock.now += 1
+        return read_package(workout_type, data)
+
+    monkeypatch.setattr(server, 'read_package', slow_read_package)
+
+    async def scenario():
+        telemetry = server.TelemetryServer()
+        futures = [telemetry.submit(*package) for package in packages[:2]]
+        telemetry.process_batch()
+        return telemetry.stats, [future.result() for future in futures]
+
+    stats, responses = asyncio.run(scenario())
+    assert all('error' not in json.loads(line) for line in responses)
+    assert list(stats.latencies) == [1.0, 2.0], (
+        'Задержка должна учитывать расчёт каждого пакета.'
+    )
@@ -0,0 +1,154 @@
+import json
+import math
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import homework  # noqa: E402
+import pipeline  # noqa: E402
+import validation  # noqa: E402
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('XXX', [1, 2, 3]),
+    ('RUN', [15000, 1, 75]),
+    ('RUN', [15000, 0, 75]),
+    ('WLK', [9000, 1, 75]),
+    ('WLK', [9000, 1, 75, 0]),
+    ('SWM', [720, -1, 80, 25, 40]),
+    ('RUN', [15000, 'час', 75]),
+    ('RUN', [15000, math.inf, 75]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+    (['RUN'], [1, 2, 3]),
+]
+REASONS = {
+    1: validation.UNKNOWN_TYPE,
+    3: validation.BAD_DURATION,
+    4: validation.BAD_ARITY,
+    5: validation.BAD_HEIGHT,
+    6: validation.BAD_DURATION,
+    7: validation.NOT_NUMBER,
+    8: validation.NOT_FINITE,
+    10: validation.UNKNOWN_TYPE,
+}
+VALID = [0, 2, 9]
+
+
+def test_validate_splits_rows():
+    result = validation.validate(PACKAGES)
+    assert {rejection.index: rejection.reason
+            for rejection in result.rejected} == REASONS, (
+        'Каждый негодный пакет должен быть отбракован с верной причиной.'
+    )
+    assert result.valid_packages() == [PACKAGES[index] for index in VALID]
+
+
+def test_valid_packages_can_be_calculated(show_info):
+    result = validation.validate(PACKAGES)
+    expected = sorted(show_info([PACKAGES[index] for index in VALID]),
+                      key=repr)
+    calculated = sorted((info for batch_result in result.calculate()
+                         for info in batch_result.messages()), key=repr)
+    assert calculated == expected
+
+
+def test_validate_all_rejected():
+    result = validation.validate([('RUN', [1, 0, 1])])
+    assert result.valid_packages() == []
+    assert list(result.calculate()) == []
+
+
+def test_reject_writer_numbers_rows_across_chunks(tmp_path):
+    path = tmp_path / 'rejects.jsonl'
+    with open(path, 'w', encoding='utf-8') as stream:
+        writer = validation.RejectWriter(stream)
+        valid = []
+        for chunk in pipeline.chunked(PACKAGES, 4):
+            valid.extend(writer.check(chunk))
+    assert valid == [PACKAGES[index] for index in VALID]
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row['index'] for row in rows] == sorted(REASONS)
+    assert writer.count == len(REASONS)
+    assert rows[0] == {'index': 1, 'workout_type': 'XXX', 'data': [1, 2, 3],
+                       'reason': validation.UNKNOWN_TYPE}
+
+
+def test_pipeline_main_rejects(tmp_path, capsys):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('\n'.join(
+        json.dumps([workout_type, data]) for workout_type, data in PACKAGES
+        if not isinstance(data[1], float) or math.isfinite(data[1])))
+    rejects = tmp_path / 'rejects.jsonl'
+    pipeline.main([str(source), '--rejects', str(rejects)])
+    captured = capsys.readouterr()
+    assert captured.out.count('\n') == len(VALID), (
+        'Годные пакеты должны рассчитываться, несмотря на негодные.'
+    )
+    assert 'Отбраковано пакетов: 7' in captured.err
+    assert len(rejects.read_text().splitlines()) == 7
+
+
+def test_validate_rejects_numbers_too_big_for_float():
+    result = validation.validate([('RUN', [10 ** 400, 1, 75]),
+                                  ('RUN', [15000, 1, 75])])
+    assert [(rejection.index, rejection.reason)
+            for rejection in result.rejected] == [(0, validation.NOT_NUMBER)]
+    assert result.valid_packages() == [('RUN', [15000, 1, 75])]
+
+
+def test_validate_rejects_rows_with_overflowing_result():
+    result = validation.validate([('WLK', [1e300, 1e-5, 75, 180]),
+                                  ('WLK', [9000, 1, 75, 180])])
+    assert [(rejection.index, rejection.reason)
+            for rejection in result.rejected] == [(0, validation.BAD_RESULT)]
+    assert result.valid_packages() == [('WLK', [9000, 1, 75, 180])]
+
+
+def test_pipeline_main_rejects_overflowing_rows(tmp_path, capsys):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["WLK", [1e300, 1e-5, 75, 180]]\n'
+                      '["RUN", [15000, 1, 75]]\n')
+    rejects = tmp_path / 'rejects.jsonl'
+    pipeline.main([str(source), '--rejects', str(rejects)])
+    assert capsys.readouterr().out.count('\n') == 1
+    [row] = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert row['reason'] == validation.BAD_RESULT
+
+
+def test_calculate_skips_types_unknown_to_batch_engine(monkeypatch):
+    monkeypatch.setitem(homework.TRAINING_FIELDS, 'CYC',
+                        ('action', 'duration', 'weight'))
+    result = validation.validate([('CYC', [1000, 2, 70]),
+                                  ('RUN', [15000, 1, 75])])
+    assert not result.rejected
+    [batch_result] = result.calculate()
+    assert batch_result.training_type == 'Running'
+
+
+@pytest.mark.parametrize('name, text, reason', [
+    ('packages.csv', 'RUN,15000,1,75\nRUN,15000,час,75\nWLK,9000,1,75,180\n',
+     validation.NOT_NUMBER),
+    ('packages.jsonl', '["RUN", [15000, 1, 75]]\nnot json\n'
+                       '{"workout_type": "WLK", "data": [9000, 1, 75, 180]}\n',
+     validation.NOT_PARSED),
+])
+def test_pipeline_main_rejects_unparsed_rows(tmp_path, capsys, name, text,
+                                             reason):
+    source = tmp_path / name
+    source.write_text(text, encoding='utf-8')
+    rejects = tmp_path / 'rejects.jsonl'
+    pipeline.main([str(source), '--rejects', str(rejects)])
+    assert capsys.readouterr().out.count('\n') == 2, (
+        'Неразобранная строка не должна останавливать обработку.'
+    )
+    [row] = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert row['index'] == 1
+    assert row['reason'].startswith(reason)
+
+
+def test_readers_are_strict_without_rejects():
+    with pytest.raises(ValueError):
+        list(pipeline.read_jsonl(['not json\n']))
+    [row] = pipeline.read_jsonl(['not json\n'], keep_errors=True)
+    assert isinstance(row, pipeline.Unparsed) and row.line == 'not json'
@@ -0,0 +1,208 @@
+"""Проверка пакетов датчиков перед расчётом, пачкой и на NumPy.
+
+read_package() падает на первом неизвестном типе тренировки, а нулевая
+длительность или рост приводят к делению на ноль посреди расчёта.
+validate() заранее делит пачку на годные и отбракованные пакеты:
+тип и число полей проверяются по пакетам, а значения - векторно, по
+массиву на тип тренировки. Для каждого отбракованного пакета известна
+причина, так что один неисправный датчик не останавливает всю обработку.
+Для типов, которые умеет пакетный движок, проверяется и сам результат:
+огромные, но конечные значения датчиков могут дать переполнение в
+формуле калорий.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from batch import BATCH_OF_TRAINING, BatchResult, calculate_batch
+from homework import TRAINING_FIELDS
+from pipeline import Package, Row, Unparsed
+
+NOT_PARSED: str = 'строка не разобрана'
+UNKNOWN_TYPE: str = 'неизвестный тип тренировки'
+BAD_ARITY: str = 'неверное число полей'
+NOT_NUMBER: str = 'нечисловое значение'
+NOT_FINITE: str = 'бесконечное значение или NaN'
+BAD_DURATION: str = 'длительность должна быть положительной'
+BAD_HEIGHT: str = 'рост должен быть положительным'
+BAD_RESULT: str = 'результат расчёта бесконечен или NaN'
+
+# Поля, на которые делят формулы: должны быть строго положительными
+POSITIVE_FIELDS: Dict[str, str] = {
+    'duration': BAD_DURATION,
+    'height': BAD_HEIGHT,
+}
+
+
+@dataclass
+class Rejection:
+    """Отбракованный пакет и причина."""
+
+    index: int
+    workout_type: object
+    data: object
+    reason: str
+
+
+@dataclass
+class Validation:
+    """Пачка, разделённая на годные и отбракованные пакеты.
+
+    indices - номера годных пакетов каждого типа в исходной пачке,
+    values - их данные в виде массива float64, строка на пакет.
+    """
+
+    packages: Sequence[Row]
+    indices: Dict[str, np.ndarray] = field(default_factory=dict)
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    rejected: List[Rejection] = field(default_factory=list)
+
+    def valid_packages(self) -> List[Package]:
+        """Годные пакеты в исходном порядке и в исходном виде."""
+        if not self.indices:
+            return []
+        order = np.sort(np.concatenate(list(self.indices.values())))
+        return [self.packages[index] for index in order.tolist()]
+
+    def columns(self, workout_type: str) -> np.ndarray:
+        """Колонки годных пакетов типа для calculate_batch()."""
+        return self.values[workout_type].T
+
+    def calculate(self) -> Iterator[BatchResult]:
+        """Рассчитать годные пакеты пакетным движком, по результату на тип.
+
+        Типы, которых нет в пакетном движке (добавленные через
+        register_training), пропускаются: их пакеты из valid_packages()
+        считаются по одному через read_package().
+        """
+        for workout_type in self.values:
+            if workout_type in BATCH_OF_TRAINING:
+                yield calculate_batch(workout_type,
+                                      self.columns(workout_type))
+
+
+def is_number(value: object) -> bool:
+    """Является ли значение числом, с которым справятся формулы.
+
+    Целое, которое не помещается во float, числом не считается.
+    """
+    if isinstance(value, float):
+        return True
+    if not isinstance(value, int):
+        return False
+    try:
+        float(value)
+    except OverflowError:
+        return False
+    return True
+
+
+def to_values(rows: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+    """Преобразовать строки одинаковой длины в массив чисел.
+
+    Вернуть массив и маску строк, где все значения - числа. Строки
+    с нечисловыми значениями в массиве заполнены NaN.
+    """
+    try:
+        values = np.array(rows)
+    except ValueError:
+        values = None
+    if values is not None and values.dtype.kind in 'iuf':
+        return (values.astype(np.float64, copy=False),
+                np.ones(len(rows), dtype=bool))
+    numeric = np.array([all(map(is_number, row)) for row in rows])
+    width = len(rows[0])
+    values = np.array([row if ok else [np.nan] * width
+                       for row, ok in zip(rows, numeric.tolist())],
+                      dtype=np.float64)
+    return values, numeric
+
+
+def finite_results(workout_type: str, values: np.ndarray) -> np.ndarray:
+    """Маска строк, у которых дистанция, скорость и калории конечны."""
+    with np.errstate(all='ignore'):
+        result = calculate_batch(workout_type, values.T)
+    return (np.isfinite(result.distance) & np.isfinite(result.speed)
+            & np.isfinite(result.calories))
+
+
+def unpack(row: Row) -> Tuple[object, object]:
+    """Тип и данные пакета; у неразобранной строки - None и сама строка."""
+    if isinstance(row, Unparsed):
+        return None, row.line
+    return row
+
+
+def validate(packages: Sequence[Row]) -> Validation:
+    """Проверить пачку пакетов и разделить на годные и отбракованные.
+
+    Неразобранные строки (Unparsed) отбраковываются с причиной NOT_PARSED.
+    """
+    result = Validation(packages)
+    reasons: Dict[int, str] = {}
+    by_type: Dict[str, List[int]] = {}
+    for index, package in enumerate(packages):
+        if isinstance(package, Unparsed):
+            reasons[index] = f'{NOT_PARSED}: {package.error}'
+            continue
+        workout_type, data = package
+        fields = (TRAINING_FIELDS.get(workout_type)
+                  if isinstance(workout_type, str) else None)
+        if fields is None:
+            reasons[index] = UNKNOWN_TYPE
+        elif not isinstance(data, (list, tuple)) or len(data) != len(fields):
+            reasons[index] = BAD_ARITY
+        else:
+            by_type.setdefault(workout_type, []).append(index)
+    for workout_type, indices in by_type.items():
+        rows = [packages[index][1] for index in indices]
+        fields = TRAINING_FIELDS[workout_type]
+        values, numeric = to_values(rows)
+        # Причины проверяются от общей к частной, у пакета остаётся первая
+        checks = [(~numeric, NOT_NUMBER),
+                  (~np.isfinite(values).all(axis=1), NOT_FINITE)]
+        checks.extend((values[:, fields.index(name)] <= 0, reason)
+                      for name, reason in POSITIVE_FIELDS.items()
+                      if name in fields)
+        if workout_type in BATCH_OF_TRAINING:
+            checks.append((~finite_results(workout_type, values), BAD_RESULT))
+        bad = np.zeros(len(rows), dtype=bool)
+        for mask, reason in checks:
+            for position in np.flatnonzero(mask & ~bad).tolist():
+                reasons[indices[position]] = reason
+            bad |= mask
+        if not bad.all():
+            result.indices[workout_type] = np.array(indices)[~bad]
+            result.values[workout_type] = values[~bad]
+    result.rejected = [Rejection(index, *unpack(packages[index]), reason)
+                       for index, reason in sorted(reasons.items())]
+    return result
+
+
+class RejectWriter:
+    """Проверка кусков потока с записью отбракованных пакетов в JSON lines.
+
+    Номера пакетов сквозные по всему потоку, с нуля.
+    """
+
+    def __init__(self, stream: IO[str]) -> None:
+        """Писать отбраковку в stream."""
+        self.stream = stream
+        self.offset = 0
+        self.count = 0
+
+    def check(self, chunk: List[Row]) -> List[Package]:
+        """Вернуть годные пакеты куска, записав отбракованные."""
+        result = validate(chunk)
+        for rejection in result.rejected:
+            self.stream.write(json.dumps(
+                {'index': self.offset + rejection.index,
+                 'workout_type': rejection.workout_type,
+                 'data': rejection.data,
+                 'reason': rejection.reason},
+                ensure_ascii=False, default=repr) + '\n')
+        self.offset += len(chunk)
+        self.count += len(result.rejected)
+        return result.valid_packages()
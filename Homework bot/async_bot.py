@@ -0,0 +1,226 @@
+"""Асинхронный режим бота: опрос API и отправка без блокировок.
+
+Запросы к API Практикума и к Bot API Telegram идут через aiohttp,
+а пауза между опросами - ожидание события остановки, поэтому по
+SIGINT/SIGTERM процесс завершается меньше чем за секунду, не дожидаясь
+конца RETRY_PERIOD. Уведомления уходят через очередь outbox.py, так что
+медленный Telegram не задерживает следующий опрос. from_date, статусы
+работ и последняя ошибка хранятся в StateStore, как и в homework.py:
+после перезапуска известные статусы не присылаются повторно. Проверка
+и разбор ответа общие с homework.py.
+
+Запуск: python async_bot.py
+"""
+import asyncio
+import signal
+import sys
+import time
+from functools import partial
+
+import aiohttp
+
+from exceptions import KeyNotResponse, TelegramSendError
+from homework import (ENDPOINT, PRACTICUM_TOKEN, RETRY_PERIOD, STATE_DB,
+                      TELEGRAM_CHAT_ID, TELEGRAM_TOKEN, check_response,
+                      check_tokens, diff_statuses, join_messages, logger,
+                      start_metrics)
+from logs import current_tenant
+from metrics import API_LATENCY, LAST_POLL, SEND_FAILURES, SEND_LATENCY
+from outbox import Outbox
+from scheduler import Scheduler
+from storage import StateStore
+from transport import ConnectionStats, create_session, request_json
+
+TELEGRAM_API = 'https://api.telegram.org/bot{token}/{method}'
+# Сколько ждать завершения задач после сигнала остановки, секунд
+SHUTDOWN_TIMEOUT = 0.5
+
+
+async def post_message(session, message, token=TELEGRAM_TOKEN,
+                       chat_id=TELEGRAM_CHAT_ID):
+    """Отправляет сообщение через Bot API, при отказе бросает исключение."""
+    url = TELEGRAM_API.format(token=token, method='sendMessage')
+    started = time.monotonic()
+    try:
+        async with session.post(
+            url, json={'chat_id': chat_id, 'text': message}
+        ) as response:
+            payload = await response.json(content_type=None)
+        if not payload.get('ok'):
+            raise TelegramSendError(
+                payload.get('description'), payload.get('error_code'),
+                (payload.get('parameters') or {}).get('retry_after'))
+    except Exception:
+        SEND_FAILURES.inc()
+        raise
+    finally:
+        SEND_LATENCY.observe(time.monotonic() - started)
+
+
+async def send_message(session, message, token=TELEGRAM_TOKEN,
+                       chat_id=TELEGRAM_CHAT_ID):
+    """Асинхронная отправка сообщения через Bot API."""
+    try:
+        logger.debug(f'Сообщение {message}. Начало отправки')
+        await post_message(session, message, token, chat_id)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError,
+            TelegramSendError):
+        logger.error(f'Сообщение {message} не отправлено')
+        return False
+    logger.debug(f'Сообщение {message}. Отправлено')
+    return True
+
+
+async def get_api_answer(session, timestamp, token=PRACTICUM_TOKEN):
+    """Асинхронный запрос к эндпоинту API-сервиса."""
+    started = time.monotonic()
+    try:
+        answer = await request_json(
+            session, 'GET', ENDPOINT,
+            headers={'Authorization': f'OAuth {token}'},
+            params={'from_date': timestamp}
+        )
+    except aiohttp.ClientConnectionError:
+        raise ConnectionError('Эндпоинт недоступен')
+    finally:
+        API_LATENCY.observe(time.monotonic() - started)
+    LAST_POLL.set(time.time())
+    return answer
+
+
+async def wait_stop(stop, timeout):
+    """Ждать timeout секунд; вернуть True, если пришла остановка."""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+def new_state():
+    """Начальное состояние опроса одного пользователя."""
+    return {'timestamp': int(time.time()), 'statuses': {}, 'err_mes': None}
+
+
+def load_state(store, tenant):
+    """Состояние опроса пользователя tenant, сохранённое в store."""
+    return {'timestamp': store.from_date(tenant, int(time.time())),
+            'statuses': store.statuses(tenant),
+            'err_mes': store.last_error(tenant)}
+
+
+async def notify(session, message, telegram_token, chat_id, outbox=None):
+    """Отправляет сообщение сразу или, если есть outbox, ставит в очередь."""
+    if outbox is None:
+        return await send_message(session, message, telegram_token, chat_id)
+    outbox.put(chat_id, message)
+    return True
+
+
+async def check_once(session, state, practicum_token=PRACTICUM_TOKEN,
+                     telegram_token=TELEGRAM_TOKEN,
+                     chat_id=TELEGRAM_CHAT_ID, outbox=None, store=None,
+                     tenant=None):
+    """Один опрос API и одно уведомление обо всех изменённых статусах.
+
+    Если задан store, новые статусы, from_date и последняя ошибка
+    сохраняются в нём под ключом tenant. Возвращает пару: изменились ли
+    статусы и исключение опроса или None.
+    """
+    try:
+        started = int(time.time())
+        get_api = await get_api_answer(session, state['timestamp'],
+                                       practicum_token)
+        state['timestamp'] = started
+        changes, errors = diff_statuses(check_response(get_api),
+                                        state['statuses'])
+        if changes and await notify(session, join_messages(changes),
+                                    telegram_token, chat_id, outbox):
+            state['statuses'].update(
+                (name, status) for name, status, _ in changes)
+            if store is not None:
+                store.set_statuses(tenant, [(name, status)
+                                            for name, status, _ in changes])
+        if errors:
+            raise KeyNotResponse('; '.join(errors))
+    except Exception as error:
+        message = f'Сбой в работе программы: {error}'
+        logger.error(message)
+        if message != state['err_mes']:
+            await notify(session, message, telegram_token, chat_id, outbox)
+            state['err_mes'] = message
+        return False, error
+    finally:
+        if store is not None:
+            store.save_cursor(tenant, state['timestamp'], state['err_mes'])
+    return bool(changes), None
+
+
+async def poll(session, stop, practicum_token=PRACTICUM_TOKEN,
+               telegram_token=TELEGRAM_TOKEN, chat_id=TELEGRAM_CHAT_ID,
+               period=RETRY_PERIOD, outbox=None, store=None):
+    """Цикл опроса API и уведомлений одного пользователя.
+
+    Состояние опроса берётся из store и сохраняется в нём, если он задан.
+    """
+    tenant = str(chat_id)
+    current_tenant.set(tenant)
+    state = new_state() if store is None else load_state(store, tenant)
+    scheduler = Scheduler(period)
+    while not stop.is_set():
+        changed, error = await check_once(session, state, practicum_token,
+                                          telegram_token, chat_id, outbox,
+                                          store, tenant)
+        delay = scheduler.next_delay(state['statuses'], changed, error)
+        if await wait_stop(stop, delay):
+            break
+
+
+async def shutdown(tasks):
+    """Дать задачам закончить итерацию, затем отменить оставшиеся."""
+    done, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        if not task.cancelled() and task.exception():
+            logger.error(f'Задача завершилась с ошибкой: '
+                         f'{task.exception()}')
+
+
+async def run(stop=None):
+    """Запустить асинхронный опрос и работать до события stop."""
+    if not check_tokens():
+        logger.critical('Нет обязательных переменных')
+        sys.exit()
+    stop = stop or asyncio.Event()
+    start_metrics()
+    stats = ConnectionStats()
+    store = StateStore(STATE_DB)
+    async with create_session(stats) as session:
+        outbox = Outbox(partial(post_message, session, token=TELEGRAM_TOKEN),
+                        store)
+        tasks = [asyncio.create_task(poll(
+            session, stop, PRACTICUM_TOKEN, TELEGRAM_TOKEN,
+            TELEGRAM_CHAT_ID, outbox=outbox, store=store)),
+            asyncio.create_task(outbox.run(stop))]
+        await stop.wait()
+        await shutdown(tasks)
+    store.close()
+    logger.info(stats.summary())
+
+
+def main():
+    """Асинхронный запуск бота с остановкой по сигналу."""
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await run(stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
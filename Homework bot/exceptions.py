@@ -1,3 +1,35 @@
 class KeyNotResponse(Exception):
     """Кастомный "эксепшн"."""
     pass
+
+
+class EndpointError(Exception):
+    """Эндпоинт вернул код ответа, отличный от 200."""
+    pass
+
+
+class TelegramSendError(Exception):
+    """Bot API не принял сообщение.
+
+    error_code - код ошибки Bot API, retry_after - сколько секунд
+    Telegram просит подождать при превышении лимита.
+    """
+
+    def __init__(self, description=None, error_code=None, retry_after=None):
+        """Запоминает описание, код ошибки и паузу из ответа Bot API."""
+        super().__init__(description)
+        self.error_code = error_code
+        self.retry_after = retry_after
+
+
+class RateLimitError(Exception):
+    """API ответило 429: запросов слишком много.
+
+    retry_after - сколько секунд просит подождать сервер, если сказал.
+    """
+
+    def __init__(self, retry_after=None):
+        """Запоминает паузу из заголовка Retry-After."""
+        super().__init__(f'Превышен лимит запросов, Retry-After: '
+                         f'{retry_after}')
+        self.retry_after = retry_after
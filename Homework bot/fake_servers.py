@@ -0,0 +1,236 @@
+"""Поддельные API Практикума и Bot API Telegram на локальном порту.
+
+Практикум отдаёт homework_statuses как настоящий: только работы,
+изменившиеся с from_date. Статусы меняются по расписанию: работа
+уходит на проверку (reviewing), а через заданное время получает
+вердикт. Задержку ответа и долю ответов 500 можно настроить, а коды
+ближайших ответов - задать заранее. Telegram принимает sendMessage,
+запоминает время получения каждого сообщения и отвечает 429 с
+retry_after, если в чат пишут чаще chat_interval; то же можно
+отправить и без HTTP через FakeTelegram.send.
+По времени смены статуса и времени получения сообщения считается
+задержка уведомления.
+
+Запуск отдельно: python fake_servers.py --students 100 --port 8080
+"""
+import argparse
+import asyncio
+import math
+import random
+import re
+import time
+
+from aiohttp import web
+
+from exceptions import TelegramSendError
+from homework import HOMEWORK_VERDICTS
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+TELEGRAM_PATH = '/bot{token}/{method}'
+# Часть уведомления о статусе одной работы: название и вердикт
+NOTICE = re.compile(r'работы "([^"]+)"\. ([^\n]+)')
+VERDICT_STATUSES = {verdict: status
+                    for status, verdict in HOMEWORK_VERDICTS.items()}
+
+
+class Homework:
+    """Домашняя работа и моменты смены её статуса."""
+
+    def __init__(self, name, transitions):
+        """Запоминает название и список (время, статус) по порядку."""
+        self.name = name
+        self.transitions = transitions
+
+    def current(self, now):
+        """Статус на момент now и когда он выставлен, или None."""
+        passed = [item for item in self.transitions if item[0] <= now]
+        return passed[-1] if passed else None
+
+
+class FakePracticum:
+    """API статусов домашних работ с расписанием проверок."""
+
+    def __init__(self, latency=0, error_rate=0, seed=None, retry_after=1):
+        """Задаёт задержку ответа в секундах и долю ответов 500."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.students = {}
+        self.changes = {}
+        self.scripted = []
+        self.log = []
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add(self, token, homework):
+        """Добавляет студенту работу."""
+        self.students.setdefault(token, []).append(homework)
+        for moment, status in homework.transitions:
+            self.changes[homework.name, status] = moment
+
+    def simulate(self, token, name, submitted, review_time):
+        """Добавляет работу со случайным вердиктом через review_time."""
+        verdict = self.random.choice(['approved', 'rejected'])
+        self.add(token, Homework(name, [(submitted, 'reviewing'),
+                                        (submitted + review_time, verdict)]))
+
+    def changed_at(self, name, status):
+        """Когда работа name получила статус status."""
+        return self.changes.get((name, status))
+
+    def transitions(self, until):
+        """Сколько смен статуса случилось к моменту until."""
+        return sum(moment <= until for moment in self.changes.values())
+
+    def script(self, *statuses):
+        """Следующие запросы получат ответы с кодами statuses по очереди.
+
+        Код 200 означает обычный ответ, 429 приходит с Retry-After.
+        """
+        self.scripted.extend(statuses)
+
+    async def statuses(self, request):
+        """Обработчик homework_statuses."""
+        self.requests += 1
+        token = request.headers.get('Authorization', '').rpartition(' ')[2]
+        entry = dict(request.query, token=token, time=time.monotonic())
+        self.log.append(entry)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.random.uniform(0, 2 * self.latency))
+        finally:
+            self.in_flight -= 1
+        entry['status'] = self.scripted.pop(0) if self.scripted else None
+        if entry['status'] == 429:
+            return web.json_response(
+                {'code': 'too_many_requests'}, status=429,
+                headers={'Retry-After': str(self.retry_after)})
+        if entry['status'] not in (None, 200):
+            return web.json_response({'code': 'scripted'},
+                                     status=entry['status'])
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            entry['status'] = 500
+            return web.json_response({'code': 'internal_error'}, status=500)
+        if token not in self.students:
+            entry['status'] = 401
+            return web.json_response({'code': 'not_authenticated'},
+                                     status=401)
+        entry['status'] = 200
+        from_date = int(request.query.get('from_date', 0))
+        now = time.time()
+        homeworks = []
+        for homework in self.students[token]:
+            current = homework.current(now)
+            if current and current[0] >= from_date:
+                homeworks.append({'homework_name': homework.name,
+                                  'status': current[1],
+                                  'date_updated': int(current[0])})
+        return web.json_response({'homeworks': homeworks,
+                                  'current_date': int(now)})
+
+
+class FakeTelegram:
+    """Bot API: принимает sendMessage и держит лимит на чат."""
+
+    def __init__(self, chat_interval=0, error_rate=0, seed=None):
+        """Задаёт минимальный интервал между сообщениями в чат."""
+        self.chat_interval = chat_interval
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.messages = []
+        self.last = {}
+        self.limited = 0
+
+    def reply(self, status, description, **extra):
+        """Ответ Bot API с ошибкой."""
+        return web.json_response(dict(ok=False, error_code=status,
+                                      description=description, **extra),
+                                 status=status)
+
+    def receive(self, chat_id, text):
+        """Принимает сообщение или возвращает отказ (код, описание, поля)."""
+        if self.random.random() < self.error_rate:
+            return 500, 'Internal Server Error', {}
+        now = time.time()
+        wait = self.last.get(chat_id, -math.inf) + self.chat_interval - now
+        if wait > 0:
+            self.limited += 1
+            return 429, 'Too Many Requests', {
+                'parameters': {'retry_after': math.ceil(wait)}}
+        self.last[chat_id] = now
+        self.messages.append((chat_id, text, now))
+        return None
+
+    async def handle(self, request):
+        """Обработчик методов бота; поддерживается только sendMessage."""
+        if request.match_info['method'] != 'sendMessage':
+            return self.reply(404, 'Not Found')
+        payload = await request.json()
+        refusal = self.receive(payload['chat_id'], payload['text'])
+        if refusal:
+            status, description, extra = refusal
+            return self.reply(status, description, **extra)
+        return web.json_response({'ok': True, 'result': {}})
+
+    async def send(self, chat_id, text):
+        """Отправка без HTTP, как у Outbox: отказ бросает исключение."""
+        refusal = self.receive(chat_id, text)
+        if refusal:
+            status, description, extra = refusal
+            raise TelegramSendError(
+                description, status,
+                extra.get('parameters', {}).get('retry_after'))
+
+    def notices(self):
+        """Уведомления о статусах: (работа, статус, время получения)."""
+        for _, text, received in self.messages:
+            for name, verdict in NOTICE.findall(text):
+                if verdict in VERDICT_STATUSES:
+                    yield name, VERDICT_STATUSES[verdict], received
+
+
+def create_app(practicum, telegram):
+    """Приложение aiohttp с обоими API."""
+    app = web.Application()
+    app.router.add_get(PRACTICUM_PATH, practicum.statuses)
+    app.router.add_post(TELEGRAM_PATH, telegram.handle)
+    return app
+
+
+async def start(app, host='127.0.0.1', port=0):
+    """Запускает приложение и возвращает runner и базовый адрес."""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner, f'http://{host}:{runner.addresses[0][1]}'
+
+
+def main():
+    """Запуск поддельных API отдельным процессом."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--students', type=int, default=100,
+                        help='токены token0..tokenN-1')
+    parser.add_argument('--review-time', type=float, default=60)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--chat-interval', type=float, default=1)
+    args = parser.parse_args()
+    practicum = FakePracticum(args.latency, args.error_rate)
+    now = time.time()
+    for index in range(args.students):
+        practicum.simulate(f'token{index}', f'hw{index}',
+                           now + practicum.random.uniform(0, args.review_time),
+                           args.review_time)
+    web.run_app(create_app(practicum, FakeTelegram(args.chat_interval)),
+                host='127.0.0.1', port=args.port)
+
+
+if __name__ == '__main__':
+    main()
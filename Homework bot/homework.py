@@ -7,7 +7,12 @@ import requests
 import telegram
 from dotenv import load_dotenv
 
-from exceptions import KeyNotResponse
+from exceptions import EndpointError, KeyNotResponse, RateLimitError
+from logs import current_tenant, setup_logging
+from metrics import (API_LATENCY, API_RESPONSES, CHECK_FAILURES, LAST_POLL,
+                     SEND_FAILURES, SEND_LATENCY, start_server)
+from scheduler import Scheduler, parse_retry_after
+from storage import StateStore
 
 load_dotenv()
 
@@ -15,8 +20,12 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+STATE_DB = os.getenv('STATE_DB', 'bot_state.sqlite3')
 
 RETRY_PERIOD = 600
+# Таймауты запроса к API: на соединение и на чтение ответа, секунды
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 30))
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -29,13 +38,7 @@ HOMEWORK_VERDICTS = {
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-handler = logging.FileHandler('main.log', 'w', 'utf-8')
-handler.setFormatter(
-    logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    )
-)
-logger.addHandler(handler)
+setup_logging(logger)
 
 
 def check_tokens():
@@ -44,44 +47,63 @@ def check_tokens():
 
 
 def send_message(bot, message):
-    """Отправка сообщения."""
+    """Отправка сообщения; возвращает, удалась ли она."""
+    started = time.monotonic()
     try:
         logger.debug(f'Сообщение {message}. Начало отправки')
         bot.send_message(TELEGRAM_CHAT_ID, message)
     except telegram.error.TelegramError:
+        SEND_FAILURES.inc()
         logger.error(f'Сообщение {message} не отправлено')
-    else:
-        logger.debug(f'Сообщение {message}. Отправлено')
+        return False
+    finally:
+        SEND_LATENCY.observe(time.monotonic() - started)
+    logger.debug(f'Сообщение {message}. Отправлено')
+    return True
 
 
 def get_api_answer(timestamp):
     """Делает запрос к единственному эндпоинту API-сервиса."""
+    started = time.monotonic()
     try:
         response = requests.get(
             ENDPOINT,
             headers=HEADERS,
-            params={'from_date': timestamp}
+            params={'from_date': timestamp},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
         )
     except requests.ConnectionError:
+        API_RESPONSES.inc('error')
         raise requests.ConnectionError('Эндпоинт недоступен')
-    except requests.RequestException:
+    except requests.RequestException as error:
+        API_RESPONSES.inc('error')
         logger.error('Код ответа не 200')
+        raise EndpointError(f'Ошибка запроса к API: {error}')
+    finally:
+        API_LATENCY.observe(time.monotonic() - started)
+    API_RESPONSES.inc(str(int(response.status_code)))
+    if response.status_code == 429:
+        raise RateLimitError(
+            parse_retry_after(response.headers.get('Retry-After')))
     if response.status_code in [500, 401]:
         raise requests.RequestException('Неверный код ответа 500/401')
-    return response.json()
+    answer = response.json()
+    LAST_POLL.set(time.time())
+    return answer
 
 
 def check_response(response):
     """Проверяет ответ API на соответствие документации."""
     if not isinstance(response, dict):
+        CHECK_FAILURES.inc('not_dict')
         raise TypeError('"response" не словарь')
     if 'homeworks' not in response:
+        CHECK_FAILURES.inc('no_homeworks')
         raise KeyNotResponse('Ключа "homeworks" нет в response')
     if not isinstance(response['homeworks'], list):
+        CHECK_FAILURES.inc('homeworks_not_list')
         raise TypeError('В ключе "homeworks" не список')
-    if len(response['homeworks']) == 0:
-        raise KeyNotResponse('"homeworks" пустой')
-    return response['homeworks'][0]
+    return response['homeworks']
 
 
 def parse_status(homework):
@@ -100,32 +122,96 @@ def parse_status(homework):
             f' работы "{homework_name}". {HOMEWORK_VERDICTS[verdict]}')
 
 
+def diff_statuses(homeworks, known):
+    """Находит работы, статус которых изменился относительно known.
+
+    Возвращает список (название, статус, сообщение) и список ошибок
+    разбора: одна неправильная работа не мешает сообщить об остальных.
+    """
+    changes = []
+    errors = []
+    for homework in homeworks:
+        try:
+            message = parse_status(homework)
+        except (KeyError, KeyNotResponse, TypeError) as error:
+            logger.error(f'Работа {homework} не разобрана: {error}')
+            errors.append(str(error))
+            continue
+        name = homework['homework_name']
+        if known.get(name) != homework['status']:
+            changes.append((name, homework['status'], message))
+    return changes, errors
+
+
+def join_messages(changes):
+    """Собирает изменения статусов в одно сообщение."""
+    return '\n\n'.join(message for _, _, message in changes)
+
+
+def start_metrics():
+    """Запускает сервер метрик; без него бот продолжает работу."""
+    try:
+        server = start_server()
+    except OSError as error:
+        logger.error(f'Сервер метрик не запущен: {error}')
+        return None
+    if server:
+        logger.info(f'Метрики: http://{server.server_address[0]}:'
+                    f'{server.server_address[1]}/metrics')
+    return server
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         logger.critical('Нет обязательных переменных')
         sys.exit()
+    start_metrics()
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    old_response = None
-    err_mes = None
+    store = StateStore(STATE_DB)
+    tenant = str(TELEGRAM_CHAT_ID)
+    current_tenant.set(tenant)
+    timestamp = store.from_date(tenant, int(time.time()))
+    err_mes = store.last_error(tenant)
+    scheduler = Scheduler(RETRY_PERIOD)
     while True:
+        next_timestamp = timestamp
+        changes = []
+        failure = None
         try:
+            started = int(time.time())
             get_api = get_api_answer(timestamp)
-            response = check_response(get_api)
-            status = parse_status(response)
-            if response['status'] != old_response:
-                send_message(bot, status)
-                old_response = response['status']
+            # API ответило: следующий запрос - с момента этого. Если
+            # запрос не удался, from_date не сдвигается и изменения,
+            # пришедшие за время сбоя, не теряются
+            next_timestamp = started
+            homeworks = check_response(get_api)
+            changes, errors = diff_statuses(homeworks,
+                                            store.statuses(tenant))
+            if changes:
+                if send_message(bot, join_messages(changes)):
+                    store.set_statuses(tenant, [(name, status)
+                                                for name, status, _
+                                                in changes])
+                else:
+                    # Недоставленные изменения придут снова со
+                    # следующим опросом с прежнего from_date
+                    next_timestamp = timestamp
+            if errors:
+                raise KeyNotResponse('; '.join(errors))
         except Exception as error:
             message = f'Сбой в работе программы: {error}'
             logger.error(message)
-            if message != err_mes:
-                send_message(bot, message)
+            failure = error
+            if message != err_mes and send_message(bot, message):
                 err_mes = message
         finally:
-            timestamp = int(time.time())
-            time.sleep(RETRY_PERIOD)
+            timestamp = next_timestamp
+            store.save_cursor(tenant, timestamp, err_mes)
+            delay = scheduler.next_delay(store.statuses(tenant),
+                                         bool(changes), failure)
+            logger.debug(f'Следующий запрос через {delay} с')
+            time.sleep(delay)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,144 @@
+"""Нагрузочный прогон многопользовательского бота на поддельных API.
+
+В одном процессе поднимаются fake_servers и tenants.run() на count
+студентов. У каждого студента одна работа: она уходит на проверку в
+случайный момент первой трети прогона и получает вердикт через
+review_time. В отчёте - опросы в секунду, ответы с ошибкой, сколько
+уведомлений дошло, перцентили задержки от смены статуса до получения
+сообщения в Telegram и пиковая память процесса (вместе с поддельными
+серверами). Состояние и очередь сообщений прогона живут в отдельной
+базе (по умолчанию в памяти): в рабочую базу бота поддельные
+уведомления не попадают.
+
+Запуск: python loadtest.py --tenants 2000 --duration 60 --period 5
+"""
+import argparse
+import asyncio
+import random
+import resource
+import time
+
+import async_bot
+import tenants
+from fake_servers import (PRACTICUM_PATH, TELEGRAM_PATH, FakePracticum,
+                          FakeTelegram, create_app, start)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentiles(values, points=PERCENTILES):
+    """Перцентили points списка values (ближайший ранг)."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    return {point: ordered[min(len(ordered) - 1,
+                               len(ordered) * point // 100)]
+            for point in points}
+
+
+def peak_memory():
+    """Пиковый объём памяти процесса в мегабайтах."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_load(count, duration, period, review_time=None, latency=0,
+                   error_rate=0, max_concurrency=tenants.MAX_CONCURRENCY,
+                   global_rate=1000, seed=None, state_db=':memory:'):
+    """Прогоняет бота duration секунд и возвращает словарь с итогами."""
+    review_time = review_time or duration / 3
+    rng = random.Random(seed)
+    practicum = FakePracticum(latency, error_rate, seed)
+    telegram = FakeTelegram(chat_interval=1)
+    started = time.time()
+    students = []
+    for index in range(count):
+        token = f'token{index}'
+        practicum.simulate(token, f'hw{index}',
+                           started + rng.uniform(0, duration / 3),
+                           review_time)
+        students.append(tenants.Tenant(token, index))
+    runner, base = await start(create_app(practicum, telegram))
+    saved = (async_bot.ENDPOINT, async_bot.TELEGRAM_API,
+             tenants.TELEGRAM_TOKEN)
+    async_bot.ENDPOINT = base + PRACTICUM_PATH
+    async_bot.TELEGRAM_API = base + TELEGRAM_PATH
+    tenants.TELEGRAM_TOKEN = tenants.TELEGRAM_TOKEN or 'loadtest'
+    stop = asyncio.Event()
+    asyncio.get_running_loop().call_later(duration, stop.set)
+    try:
+        await tenants.run(students, stop, period, max_concurrency,
+                          global_rate, state_db)
+    finally:
+        (async_bot.ENDPOINT, async_bot.TELEGRAM_API,
+         tenants.TELEGRAM_TOKEN) = saved
+        await runner.cleanup()
+    finished = time.time()
+    latencies = [received - practicum.changed_at(name, status)
+                 for name, status, received in telegram.notices()]
+    return {
+        'tenants': count,
+        'duration': finished - started,
+        'polls': practicum.requests,
+        'poll_rate': practicum.requests / (finished - started),
+        'api_errors': practicum.errors,
+        'expected': practicum.transitions(finished),
+        'delivered': len(latencies),
+        'messages': len(telegram.messages),
+        'telegram_429': telegram.limited,
+        'latency': percentiles(latencies),
+        'latency_max': max(latencies, default=None),
+        'memory_mb': peak_memory(),
+    }
+
+
+def format_report(report):
+    """Отчёт прогона в несколько строк."""
+    lines = [
+        f'Студентов: {report["tenants"]}, '
+        f'прогон {report["duration"]:.1f} с',
+        f'Опросов: {report["polls"]} ({report["poll_rate"]:.1f} в секунду), '
+        f'ответов 500: {report["api_errors"]}',
+        f'Уведомлений о статусах: {report["delivered"]} из '
+        f'{report["expected"]} (сообщений {report["messages"]}, '
+        f'ответов 429: {report["telegram_429"]})',
+    ]
+    if report['latency']:
+        lines.append('Задержка уведомления, с: ' + ', '.join(
+            f'p{point} {value:.2f}'
+            for point, value in report['latency'].items())
+            + f', max {report["latency_max"]:.2f}')
+    lines.append(f'Пик памяти процесса: {report["memory_mb"]:.1f} МБ')
+    return '\n'.join(lines)
+
+
+def main():
+    """Запуск нагрузочного прогона из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=60,
+                        help='длительность прогона, секунды')
+    parser.add_argument('--period', type=float, default=5,
+                        help='RETRY_PERIOD бота на время прогона')
+    parser.add_argument('--review-time', type=float,
+                        help='время проверки работы, по умолчанию '
+                             'треть прогона')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='средняя задержка ответа API, секунды')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='доля ответов 500 от API')
+    parser.add_argument('--max-concurrency', type=int,
+                        default=tenants.MAX_CONCURRENCY)
+    parser.add_argument('--global-rate', type=float, default=1000,
+                        help='лимит сообщений в секунду; у настоящего '
+                             'Telegram - 30')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    report = asyncio.run(run_load(
+        args.tenants, args.duration, args.period, args.review_time,
+        args.latency, args.error_rate, args.max_concurrency,
+        args.global_rate, args.seed))
+    print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
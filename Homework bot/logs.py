@@ -0,0 +1,104 @@
+"""Журнал бота: JSON-записи, очередь и ротация файла.
+
+Логгер кладёт запись в очередь (QueueHandler) и сразу возвращается,
+а в файл её пишет отдельный поток QueueListener - запись на диск не
+задерживает опрос. Каждая строка файла - JSON с временем, уровнем,
+текстом, полями из extra и студентом (tenant), от имени которого шёл
+опрос. Файл дописывается, а не перезаписывается при старте, и
+ротируется по размеру LOG_MAX_BYTES или, если задан LOG_ROTATE_WHEN
+(например, midnight), по времени; хранится LOG_BACKUPS старых файлов.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import (QueueHandler, QueueListener,
+                              RotatingFileHandler, TimedRotatingFileHandler)
+
+LOG_FILE = os.getenv('LOG_FILE', 'main.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.getenv('LOG_BACKUPS', 5))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
+
+# Студент, от имени которого выполняется текущий опрос. У каждой задачи
+# asyncio своя копия контекста, поэтому задачи студентов не мешают
+# друг другу
+current_tenant = contextvars.ContextVar('tenant', default=None)
+
+# Атрибуты, которые есть у любой записи: всё остальное пришло из extra
+RECORD_FIELDS = frozenset(vars(logging.LogRecord(
+    '', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class TenantFilter(logging.Filter):
+    """Добавляет в запись tenant текущего опроса."""
+
+    def filter(self, record):
+        """Дописывает tenant, если его не передали в extra."""
+        if not hasattr(record, 'tenant'):
+            record.tenant = current_tenant.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись журнала одной строкой JSON."""
+
+    def format(self, record):
+        """Собирает время, уровень, текст и дополнительные поля."""
+        data = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc).isoformat(
+                    timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update((key, value) for key, value in vars(record).items()
+                    if key not in RECORD_FIELDS)
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class Listener(QueueListener):
+    """QueueListener, который можно останавливать повторно."""
+
+    def stop(self):
+        """Дописывает очередь и останавливает поток, если он работает."""
+        # До Python 3.12 повторный stop() падает на пустом _thread
+        if self._thread is not None:
+            super().stop()
+
+
+def file_handler(path=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                 backups=LOG_BACKUPS, when=LOG_ROTATE_WHEN):
+    """Обработчик файла с ротацией по размеру или по времени."""
+    if when:
+        handler = TimedRotatingFileHandler(path, when, backupCount=backups,
+                                           encoding='utf-8')
+    else:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes,
+                                      backupCount=backups, encoding='utf-8')
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def setup_logging(logger, *handlers):
+    """Подключает к логгеру очередь, которую разбирает отдельный поток.
+
+    handlers - куда писать, по умолчанию file_handler(). Возвращает
+    запущенный QueueListener; при выходе из программы он
+    останавливается и дописывает очередь.
+    """
+    records = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(TenantFilter())
+    logger.addHandler(queue_handler)
+    listener = Listener(records, *(handlers or [file_handler()]),
+                        respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
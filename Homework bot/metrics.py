@@ -0,0 +1,223 @@
+"""Метрики бота в текстовом формате Prometheus.
+
+Счётчики и гистограммы обновляются в коде бота, а отдельный поток
+отдаёт их по HTTP на 127.0.0.1:METRICS_PORT/metrics (METRICS_PORT=0
+выключает сервер). Так о сбоях API или Telegram видно по графикам и
+алертам, а не по жалобам студентов: например, по росту
+homework_seconds_since_last_poll или telegram_send_failures_total.
+"""
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9108) or 0)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+# Границы корзин гистограмм, секунды
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, math.inf)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_value(value):
+    """Число в записи Prometheus."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def escape(value):
+    """Значение метки с экранированными спецсимволами."""
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def format_labels(names, values):
+    """Метки в фигурных скобках или пустая строка."""
+    if not names:
+        return ''
+    pairs = (f'{name}="{escape(value)}"'
+             for name, value in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+class Metric:
+    """Общее у всех метрик: имя, описание и метки."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        """Регистрирует метрику в REGISTRY."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def samples(self):
+        """Строки (суффикс, метки, значения меток, значение)."""
+        return []
+
+    def render(self):
+        """Метрика в текстовом формате Prometheus."""
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.kind}']
+        for suffix, names, values, value in self.samples():
+            lines.append(f'{self.name}{suffix}{format_labels(names, values)}'
+                         f' {format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Счётчик, который только растёт; по счётчику на набор меток."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        """Заводит метрику без значений."""
+        super().__init__(name, documentation, labels)
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        """Увеличивает счётчик с метками labels."""
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Текущее значение счётчика."""
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        """Строки (суффикс, метки, значения меток, значение)."""
+        with self.lock:
+            items = sorted(self.values.items())
+        if not self.labels and not items:
+            items = [((), 0)]
+        return [('', self.labels, labels, value) for labels, value in items]
+
+
+class Gauge(Metric):
+    """Значение, которое может и расти, и падать.
+
+    function - если задана, значение вычисляется при каждом чтении.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function=None):
+        """Заводит метрику со значением 0."""
+        super().__init__(name, documentation)
+        self.function = function
+        self.current = 0
+
+    def set(self, value):
+        """Запоминает значение."""
+        self.current = value
+
+    def value(self):
+        """Текущее значение."""
+        return self.function() if self.function else self.current
+
+    def samples(self):
+        """Строки (суффикс, метки, значения меток, значение)."""
+        return [('', (), (), self.value())]
+
+
+class Histogram(Metric):
+    """Распределение длительностей по корзинам BUCKETS."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=BUCKETS):
+        """Заводит пустые корзины."""
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Учитывает одно измерение."""
+        with self.lock:
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    def samples(self):
+        """Строки (суффикс, метки, значения меток, значение)."""
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        samples = []
+        cumulative = 0
+        for bound, bucket in zip(self.buckets, counts):
+            cumulative += bucket
+            samples.append(('_bucket', ('le',), (format_value(bound),),
+                            cumulative))
+        samples.append(('_sum', (), (), total))
+        samples.append(('_count', (), (), count))
+        return samples
+
+
+REGISTRY = []
+
+API_LATENCY = Histogram('homework_api_request_seconds',
+                        'Время запроса к API Практикума')
+API_RESPONSES = Counter('homework_api_responses_total',
+                        'Ответы API Практикума по коду; error - нет ответа',
+                        ['code'])
+CHECK_FAILURES = Counter('homework_check_failures_total',
+                         'Ответы API, не прошедшие check_response',
+                         ['reason'])
+LAST_POLL = Gauge('homework_last_poll_timestamp_seconds',
+                  'Время последнего успешного опроса API, Unix time')
+SINCE_LAST_POLL = Gauge(
+    'homework_seconds_since_last_poll',
+    'Сколько секунд назад API последний раз ответило; NaN - ещё ни разу',
+    lambda: time.time() - LAST_POLL.current if LAST_POLL.current
+    else math.nan)
+SEND_LATENCY = Histogram('telegram_send_seconds',
+                         'Время отправки сообщения в Telegram')
+SEND_FAILURES = Counter('telegram_send_failures_total',
+                        'Неудачные отправки сообщений в Telegram')
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдаёт метрики по GET /metrics."""
+
+    def do_GET(self):
+        """Ответ на GET-запрос."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы Prometheus в журнал не пишутся."""
+
+
+def start_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Запускает HTTP-сервер метрик в фоновом потоке и возвращает его.
+
+    Порт 0 значит, что сервер не нужен: возвращается None.
+    """
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
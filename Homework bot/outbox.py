@@ -0,0 +1,167 @@
+"""Очередь исходящих сообщений Telegram с отдельным отправителем.
+
+Опрос API только кладёт сообщение в очередь и сразу идёт дальше, а
+медленный или ограничивающий нас Telegram задерживает лишь доставку.
+Отправитель склеивает накопившиеся сообщения одного чата в одно (не
+длиннее MAX_LENGTH), шлёт в чат не чаще раза в CHAT_INTERVAL секунд и
+всего не больше GLOBAL_RATE сообщений в секунду - это лимиты Bot API.
+Неудачная отправка повторяется с задержкой, а пауза retry_after из
+ответа 429 соблюдается. Если задана база состояния, очередь хранится в
+ней до доставки и после перезапуска отправка продолжается.
+"""
+import asyncio
+import itertools
+import os
+
+from exceptions import TelegramSendError
+from homework import logger
+from transport import backoff
+
+CHAT_INTERVAL = float(os.getenv('CHAT_INTERVAL', 1))
+GLOBAL_RATE = float(os.getenv('GLOBAL_RATE', 30))
+MAX_LENGTH = 4096
+SEPARATOR = '\n\n'
+# Ошибки, при которых повтор не поможет: чат не найден, бот заблокирован
+PERMANENT_ERRORS = frozenset({400, 403})
+
+
+class Outbox:
+    """Очередь сообщений по чатам и задача, которая их доставляет.
+
+    post - корутина post(chat_id=..., message=...), которая отправляет
+    сообщение или бросает исключение; store - StateStore или None.
+    """
+
+    def __init__(self, post, store=None, chat_interval=CHAT_INTERVAL,
+                 global_rate=GLOBAL_RATE):
+        """Заводит пустую очередь и поднимает недоставленное из store."""
+        self.post = post
+        self.store = store
+        self.chat_interval = chat_interval
+        self.global_interval = 1 / global_rate
+        self.pending = {}
+        self.ready_at = {}
+        self.attempts = {}
+        self.busy = set()
+        self.tasks = set()
+        self.next_send = 0
+        self.sent = 0
+        self.ids = itertools.count(1)
+        self.wakeup = asyncio.Event()
+        if store is not None:
+            for id_, chat_id, text in store.pending_messages():
+                self.pending.setdefault(chat_id, []).append((id_, text))
+
+    def __len__(self):
+        """Число недоставленных сообщений."""
+        return sum(map(len, self.pending.values()))
+
+    def put(self, chat_id, text):
+        """Ставит сообщение в очередь чата."""
+        if self.store is not None:
+            id_ = self.store.push_message(chat_id, text)
+        else:
+            id_ = next(self.ids)
+        self.pending.setdefault(chat_id, []).append((id_, text))
+        self.wakeup.set()
+
+    def take(self, chat_id):
+        """Первые сообщения чата, которые влезают в одно сообщение."""
+        batch = []
+        length = -len(SEPARATOR)
+        for id_, text in self.pending[chat_id]:
+            length += len(SEPARATOR) + len(text)
+            if batch and length > MAX_LENGTH:
+                break
+            batch.append((id_, text))
+        return batch
+
+    def next_ready(self, now):
+        """Чат, которому пора отправлять, или None и сколько ждать."""
+        wait = None
+        for chat_id, queue in self.pending.items():
+            if not queue or chat_id in self.busy:
+                continue
+            delay = self.ready_at.get(chat_id, 0) - now
+            if delay <= 0:
+                return chat_id, 0
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def done(self, chat_id, batch):
+        """Убирает отправленную или безнадёжную пачку из очереди."""
+        del self.pending[chat_id][:len(batch)]
+        if not self.pending[chat_id]:
+            del self.pending[chat_id]
+        self.attempts.pop(chat_id, None)
+        if self.store is not None:
+            self.store.delete_messages([id_ for id_, _ in batch])
+
+    async def deliver(self, chat_id):
+        """Отправляет в чат склеенные сообщения из его очереди."""
+        loop = asyncio.get_running_loop()
+        batch = self.take(chat_id)
+        try:
+            await self.post(chat_id=chat_id,
+                            message=SEPARATOR.join(text for _, text in batch))
+        except TelegramSendError as error:
+            if error.error_code in PERMANENT_ERRORS:
+                logger.error(f'Сообщения в чат {chat_id} не доставлены и '
+                             f'отброшены: {error}')
+                self.done(chat_id, batch)
+            else:
+                self.retry(chat_id, error, error.retry_after)
+        except Exception as error:
+            self.retry(chat_id, error)
+        else:
+            self.done(chat_id, batch)
+            self.sent += 1
+            self.ready_at[chat_id] = loop.time() + self.chat_interval
+        finally:
+            self.busy.discard(chat_id)
+            self.wakeup.set()
+
+    def retry(self, chat_id, error, retry_after=None):
+        """Откладывает следующую попытку отправки в чат."""
+        attempt = self.attempts.get(chat_id, 0)
+        self.attempts[chat_id] = attempt + 1
+        delay = max(backoff(attempt), retry_after or 0, self.chat_interval)
+        self.ready_at[chat_id] = asyncio.get_running_loop().time() + delay
+        logger.warning(f'Отправка в чат {chat_id} не удалась ({error!r}), '
+                       f'повтор через {delay:.2f} с')
+
+    async def wait(self, stop, timeout):
+        """Ждёт новое сообщение, остановку или timeout секунд."""
+        waiters = [asyncio.ensure_future(stop.wait()),
+                   asyncio.ensure_future(self.wakeup.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def run(self, stop):
+        """Доставляет сообщения до события stop."""
+        loop = asyncio.get_running_loop()
+        try:
+            while not stop.is_set():
+                self.wakeup.clear()
+                now = loop.time()
+                chat_id, wait = self.next_ready(now)
+                if chat_id is None:
+                    await self.wait(stop, wait)
+                    continue
+                if self.next_send > now:
+                    await self.wait(stop, self.next_send - now)
+                    continue
+                self.next_send = now + self.global_interval
+                self.busy.add(chat_id)
+                task = asyncio.create_task(self.deliver(chat_id))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        finally:
+            for task in list(self.tasks):
+                task.cancel()
+            if self.pending:
+                logger.info(f'Не доставлено сообщений: {len(self)}')
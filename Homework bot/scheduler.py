@@ -0,0 +1,79 @@
+"""Интервал опроса API, подстраивающийся под состояние работ.
+
+Пока хоть одна работа на проверке (reviewing), вердикт может прийти
+в любую минуту: опрос идёт раз в ACTIVE_PERIOD. Если опрос за опросом
+ничего не меняется, интервал растёт от RETRY_PERIOD вдвое за каждый
+пустой опрос, но не выше MAX_PERIOD. Ответ 429 тоже увеличивает
+интервал, а пауза из Retry-After соблюдается всегда, даже если она
+больше MAX_PERIOD. Первый интервал после обычного опроса равен
+RETRY_PERIOD.
+"""
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+from exceptions import RateLimitError
+
+ACTIVE_PERIOD = int(os.getenv('ACTIVE_PERIOD', 120))
+MAX_PERIOD = int(os.getenv('MAX_PERIOD', 3600))
+BACKOFF_FACTOR = 2
+ACTIVE_STATUSES = frozenset({'reviewing'})
+
+
+def parse_retry_after(value, now=None):
+    """Переводит заголовок Retry-After в секунды ожидания.
+
+    Заголовок бывает числом секунд или HTTP-датой; нераспознанное
+    значение даёт None.
+    """
+    if not value:
+        return None
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(int(moment - (time.time() if now is None else now)), 0)
+
+
+class Scheduler:
+    """Считает паузу до следующего опроса по итогам предыдущего."""
+
+    def __init__(self, period, active_period=ACTIVE_PERIOD,
+                 max_period=MAX_PERIOD, factor=BACKOFF_FACTOR):
+        """Запоминает границы интервала; пустых опросов пока не было."""
+        self.period = period
+        self.active_period = min(active_period, period)
+        self.max_period = max(max_period, period)
+        self.factor = factor
+        self.idle = 0
+        self.limited = 0
+
+    def grow(self, count):
+        """Интервал после count подряд пустых или ограниченных опросов."""
+        return min(self.period * self.factor ** max(count - 1, 0),
+                   self.max_period)
+
+    def next_delay(self, statuses, changed=False, error=None):
+        """Пауза в секундах после опроса.
+
+        statuses - известные статусы работ {название: статус}, changed -
+        изменился ли какой-нибудь статус, error - исключение опроса.
+        """
+        if isinstance(error, RateLimitError):
+            self.limited += 1
+            return max(self.grow(self.limited), error.retry_after or 0)
+        self.limited = 0
+        if error is not None:
+            return self.period
+        if ACTIVE_STATUSES.intersection(statuses.values()):
+            self.idle = 0
+            return self.active_period
+        if changed:
+            self.idle = 0
+            return self.period
+        self.idle += 1
+        return self.grow(self.idle)
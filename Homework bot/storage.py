@@ -0,0 +1,126 @@
+"""Постоянное состояние бота в SQLite.
+
+Хранятся from_date следующего запроса и последняя ошибка, о которой
+сообщили, а также последний известный статус каждой домашней работы.
+Всё это - по ключу пользователя (tenant), чтобы одна база подходила и
+для обычного, и для многопользовательского режима. После перезапуска
+бот продолжает с сохранённого from_date и не присылает уже известные
+статусы повторно. Очередь исходящих сообщений (outbox.py) хранит здесь
+же ещё не доставленные сообщения.
+"""
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    tenant TEXT PRIMARY KEY,
+    from_date INTEGER NOT NULL,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS statuses (
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (tenant, homework)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id NOT NULL,
+    text TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+"""
+
+
+class StateStore:
+    """Состояние опроса пользователей в файле SQLite."""
+
+    def __init__(self, path):
+        """Открывает базу и создаёт таблицы, если их нет."""
+        self.connection = sqlite3.connect(path)
+        # WAL: запись не блокирует чтение, а fsync нужен реже
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def from_date(self, tenant, default):
+        """Возвращает сохранённый from_date или default."""
+        row = self.connection.execute(
+            'SELECT from_date FROM cursors WHERE tenant = ?', (tenant,)
+        ).fetchone()
+        return default if row is None else row[0]
+
+    def last_error(self, tenant):
+        """Возвращает текст последней отправленной ошибки."""
+        row = self.connection.execute(
+            'SELECT last_error FROM cursors WHERE tenant = ?', (tenant,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def status(self, tenant, homework):
+        """Возвращает последний известный статус домашней работы."""
+        row = self.connection.execute(
+            'SELECT status FROM statuses WHERE tenant = ? AND homework = ?',
+            (tenant, homework)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def statuses(self, tenant):
+        """Возвращает словарь {работа: статус} пользователя."""
+        return dict(self.connection.execute(
+            'SELECT homework, status FROM statuses WHERE tenant = ?',
+            (tenant,)
+        ))
+
+    def set_status(self, tenant, homework, status):
+        """Запоминает статус домашней работы."""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?)',
+                (tenant, homework, status, int(time.time()))
+            )
+
+    def set_statuses(self, tenant, items):
+        """Запоминает статусы нескольких работ одной транзакцией."""
+        updated_at = int(time.time())
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?, ?)',
+                [(tenant, homework, status, updated_at)
+                 for homework, status in items]
+            )
+
+    def save_cursor(self, tenant, from_date, last_error=None):
+        """Запоминает from_date следующего запроса и последнюю ошибку."""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)',
+                (tenant, from_date, last_error)
+            )
+
+    def push_message(self, chat_id, text):
+        """Кладёт сообщение в очередь на отправку и возвращает его id."""
+        with self.connection:
+            return self.connection.execute(
+                'INSERT INTO outbox (chat_id, text, created_at) '
+                'VALUES (?, ?, ?)',
+                (chat_id, text, int(time.time()))
+            ).lastrowid
+
+    def pending_messages(self):
+        """Возвращает недоставленные сообщения (id, chat_id, text)."""
+        return self.connection.execute(
+            'SELECT id, chat_id, text FROM outbox ORDER BY id'
+        ).fetchall()
+
+    def delete_messages(self, ids):
+        """Убирает доставленные сообщения из очереди."""
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM outbox WHERE id = ?', [(id_,) for id_ in ids]
+            )
+
+    def close(self):
+        """Закрывает базу."""
+        self.connection.close()
@@ -0,0 +1,154 @@
+"""Один процесс бота на многих студентов.
+
+Таблица студентов - CSV с заголовком practicum_token,chat_id и
+необязательной колонкой name; бот Telegram общий (TOKEN из окружения).
+Каждого студента опрашивает своя задача со своим состоянием
+(timestamp, статусы работ, err_mes) и своим интервалом опроса (см.
+scheduler.py). Состояние хранится в StateStore по chat_id студента и
+переживает перезапуск, поэтому chat_id в таблице не повторяются.
+Старты задач равномерно разнесены по RETRY_PERIOD, чтобы запросы не
+шли к API пачкой, а одновременно выполняется не больше MAX_CONCURRENCY
+опросов.
+
+Запуск: TENANTS_FILE=tenants.csv python tenants.py
+"""
+import asyncio
+import csv
+import os
+import signal
+import sys
+from functools import partial
+
+from async_bot import (check_once, load_state, new_state, post_message,
+                       shutdown, wait_stop)
+from homework import (RETRY_PERIOD, STATE_DB, TELEGRAM_TOKEN, logger,
+                      start_metrics)
+from logs import current_tenant
+from outbox import GLOBAL_RATE, Outbox
+from scheduler import Scheduler
+from storage import StateStore
+from transport import ConnectionStats, create_session
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.csv')
+MAX_CONCURRENCY = int(os.getenv('MAX_CONCURRENCY', 20))
+
+
+class Tenant:
+    """Студент: токен Практикума, чат и состояние опроса."""
+
+    def __init__(self, practicum_token, chat_id, name=None):
+        """Запоминает данные студента и заводит состояние опроса."""
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+        self.name = name or str(chat_id)
+        self.key = str(chat_id)
+        self.state = new_state()
+
+
+def load_tenants(path):
+    """Читает таблицу студентов из CSV."""
+    tenants = []
+    tokens = set()
+    chats = set()
+    with open(path, encoding='utf-8', newline='') as stream:
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            token = (row.get('practicum_token') or '').strip()
+            chat_id = (row.get('chat_id') or '').strip()
+            if not token or not chat_id:
+                raise ValueError(f'{path}:{line}: нужны practicum_token '
+                                 f'и chat_id')
+            if token in tokens:
+                raise ValueError(f'{path}:{line}: токен уже встречался')
+            if chat_id in chats:
+                raise ValueError(f'{path}:{line}: chat_id уже встречался')
+            tokens.add(token)
+            chats.add(chat_id)
+            tenants.append(Tenant(token, chat_id, row.get('name')))
+    return tenants
+
+
+def start_offsets(count, period=RETRY_PERIOD):
+    """Равномерно разносит старты count задач по периоду."""
+    return [index * period / count for index in range(count)]
+
+
+async def poll_tenant(session, semaphore, stop, tenant, offset,
+                      period=RETRY_PERIOD, telegram_token=TELEGRAM_TOKEN,
+                      outbox=None, store=None):
+    """Опрашивает API для одного студента по расписанию.
+
+    Если задан store, состояние студента берётся из него и сохраняется
+    после каждого опроса.
+    """
+    loop = asyncio.get_running_loop()
+    current_tenant.set(tenant.name)
+    if store is not None:
+        tenant.state = load_state(store, tenant.key)
+    scheduler = Scheduler(period)
+    next_run = loop.time() + offset
+    while not await wait_stop(stop, max(next_run - loop.time(), 0)):
+        async with semaphore:
+            changed, error = await check_once(
+                session, tenant.state, tenant.practicum_token,
+                telegram_token, tenant.chat_id, outbox, store, tenant.key)
+        # Расписание считается от старта, а не от конца опроса, чтобы
+        # очередь у семафора не сдвигала студентов друг к другу
+        next_run += scheduler.next_delay(tenant.state['statuses'],
+                                         changed, error)
+        if next_run < loop.time():
+            next_run = loop.time()
+
+
+async def run(tenants, stop=None, period=RETRY_PERIOD,
+              max_concurrency=MAX_CONCURRENCY, global_rate=GLOBAL_RATE,
+              state_db=None):
+    """Опрашивает всех студентов до события stop.
+
+    Сообщения всем студентам уходят через одну очередь: она держит
+    общий для бота лимит Telegram global_rate сообщений в секунду.
+    state_db - база состояния, по умолчанию STATE_DB.
+    """
+    if not TELEGRAM_TOKEN:
+        logger.critical('Нет обязательных переменных')
+        sys.exit()
+    stop = stop or asyncio.Event()
+    start_metrics()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    stats = ConnectionStats()
+    store = StateStore(state_db or STATE_DB)
+    # Одна сессия на всех студентов: соединения переиспользуются
+    async with create_session(stats, max_concurrency) as session:
+        outbox = Outbox(partial(post_message, session, token=TELEGRAM_TOKEN),
+                        store, global_rate=global_rate)
+        tasks = [
+            asyncio.create_task(poll_tenant(session, semaphore, stop,
+                                            tenant, offset, period,
+                                            TELEGRAM_TOKEN, outbox, store))
+            for tenant, offset in zip(tenants,
+                                      start_offsets(len(tenants), period))
+        ]
+        tasks.append(asyncio.create_task(outbox.run(stop)))
+        logger.info(f'Опрос {len(tenants)} студентов, не больше '
+                    f'{max_concurrency} одновременно')
+        await stop.wait()
+        await shutdown(tasks)
+    store.close()
+    logger.info(stats.summary())
+
+
+def main():
+    """Многопользовательский запуск бота."""
+    tenants = load_tenants(TENANTS_FILE)
+
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await run(tenants, stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
@@ -18,10 +18,14 @@ if (
     )
 
 pytest_plugins = [
-    'tests.fixtures.fixture_data'
+    'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_apis',
 ]
 
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
-
+# Состояние бота в тестах не должно переживать запуск
+os.environ['STATE_DB'] = ':memory:'
+# Сервер метрик в тестах не нужен, порт может быть занят
+os.environ['METRICS_PORT'] = '0'
@@ -0,0 +1,76 @@
+import functools
+
+import pytest
+
+try:
+    from fake_servers import (PRACTICUM_PATH, TELEGRAM_PATH, FakePracticum,
+                              FakeTelegram, create_app, start)
+except ImportError:
+    FakePracticum = None
+
+
+class Reported:
+    """Работа, которую API отдаёт в каждом ответе со свежей датой.
+
+    Заменяет fake_servers.Homework, чтобы from_date не скрывал статус
+    и повторы отсеивал сам бот.
+    """
+
+    def __init__(self, name, status):
+        self.name = name
+        self.status = status
+        self.transitions = []
+
+    def current(self, now):
+        return now, self.status
+
+
+class FakeApis:
+    """Поддельные API из fake_servers.py для тестов бота.
+
+    homeworks - список домашних работ токена 'token' или словарь
+    токен -> список работ; latency и error_rate передаются
+    FakePracticum, telegram_error_rate - FakeTelegram.
+    """
+
+    def __init__(self, monkeypatch, homeworks, latency=0, error_rate=0,
+                 telegram_error_rate=0):
+        self.monkeypatch = monkeypatch
+        self.homeworks = homeworks
+        self.practicum = FakePracticum(latency, error_rate)
+        self.telegram = FakeTelegram(error_rate=telegram_error_rate)
+        if not isinstance(homeworks, dict):
+            homeworks = {'token': homeworks}
+        for token, items in homeworks.items():
+            for item in items:
+                self.practicum.add(token, Reported(item['homework_name'],
+                                                   item['status']))
+
+    @property
+    def requests(self):
+        return self.practicum.log
+
+    @property
+    def messages(self):
+        return [{'chat_id': chat_id, 'text': text}
+                for chat_id, text, _ in self.telegram.messages]
+
+    async def __aenter__(self):
+        import async_bot
+
+        self.runner, base = await start(
+            create_app(self.practicum, self.telegram))
+        self.monkeypatch.setattr(async_bot, 'ENDPOINT', base + PRACTICUM_PATH)
+        self.monkeypatch.setattr(async_bot, 'TELEGRAM_API',
+                                 base + TELEGRAM_PATH)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+def fake_apis(monkeypatch):
+    if FakePracticum is None:
+        pytest.skip('нужен aiohttp')
+    return functools.partial(FakeApis, monkeypatch)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+
+import async_bot  # noqa: E402
+import homework  # noqa: E402
+import transport  # noqa: E402
+from storage import StateStore  # noqa: E402
+
+
+async def poll_for(apis, seconds, period=0.05, store=None):
+    stop = asyncio.Event()
+    async with apis, aiohttp.ClientSession() as session:
+        task = asyncio.create_task(async_bot.poll(
+            session, stop, 'token', '1234:abc', 42, period, store=store))
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.wait_for(task, 1)
+
+
+def test_poll_sends_status_once(fake_apis):
+    apis = fake_apis([{'homework_name': 'hw', 'status': 'approved'}])
+    asyncio.run(poll_for(apis, 0.3))
+    assert len(apis.requests) > 1
+    assert all('from_date' in query for query in apis.requests)
+    assert len(apis.messages) == 1, (
+        'Один и тот же статус не должен отправляться повторно.'
+    )
+    assert apis.messages[0]['chat_id'] == 42
+    assert homework.parse_status(apis.homeworks[0]) == (
+        apis.messages[0]['text'])
+
+
+def test_poll_batches_changed_statuses(fake_apis):
+    homeworks = [{'homework_name': 'hw1', 'status': 'reviewing'},
+                 {'homework_name': 'hw2', 'status': 'approved'}]
+    apis = fake_apis(homeworks)
+    asyncio.run(poll_for(apis, 0.3))
+    assert len(apis.messages) == 1
+    assert apis.messages[0]['text'] == '\n\n'.join(
+        homework.parse_status(item) for item in homeworks)
+
+
+def test_poll_state_survives_restart(fake_apis, tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    apis = fake_apis([{'homework_name': 'hw', 'status': 'approved'}])
+    for _ in range(2):
+        store = StateStore(path)
+        asyncio.run(poll_for(apis, 0.2, store=store))
+        store.close()
+    assert len(apis.messages) == 1, (
+        'После перезапуска известный статус не должен отправляться снова.'
+    )
+    store = StateStore(path)
+    assert store.statuses('42') == {'hw': 'approved'}
+    assert store.from_date('42', None) >= int(apis.requests[0]['from_date'])
+
+
+def test_poll_reports_error_once(fake_apis, monkeypatch):
+    monkeypatch.setattr(transport, 'backoff', lambda attempt: 0)
+    apis = fake_apis([], error_rate=1)
+    asyncio.run(poll_for(apis, 0.3))
+    assert len(apis.messages) == 1
+    assert apis.messages[0]['text'].startswith('Сбой в работе программы')
+
+
+def test_send_message_logs_rejection(fake_apis, caplog):
+    apis = fake_apis([], telegram_error_rate=1)
+
+    async def send():
+        async with apis, aiohttp.ClientSession() as session:
+            return await async_bot.send_message(session, 'привет',
+                                                '1234:abc', 42)
+    assert asyncio.run(send()) is False
+    assert any(record.levelname == 'ERROR' for record in caplog.records)
+
+
+def test_run_stops_quickly(fake_apis, monkeypatch):
+    apis = fake_apis([{'homework_name': 'hw', 'status': 'reviewing'}])
+    for module in (async_bot, homework):
+        monkeypatch.setattr(module, 'PRACTICUM_TOKEN', 'token')
+        monkeypatch.setattr(module, 'TELEGRAM_TOKEN', '1234:abc')
+        monkeypatch.setattr(module, 'TELEGRAM_CHAT_ID', 42)
+
+    async def scenario():
+        stop = asyncio.Event()
+        async with apis:
+            task = asyncio.create_task(async_bot.run(stop))
+            await asyncio.sleep(0.2)
+            started = time.monotonic()
+            stop.set()
+            await task
+            return time.monotonic() - started
+    assert asyncio.run(scenario()) < 1, (
+        'После сигнала остановки бот должен завершаться меньше чем '
+        'за секунду, не дожидаясь конца RETRY_PERIOD.'
+    )
+    assert len(apis.messages) == 1
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+
+import async_bot  # noqa: E402
+import loadtest  # noqa: E402
+import tenants  # noqa: E402
+from fake_servers import (PRACTICUM_PATH, TELEGRAM_PATH,  # noqa: E402
+                          FakePracticum, FakeTelegram, Homework, create_app,
+                          start)
+
+
+def test_percentiles():
+    assert loadtest.percentiles(range(1, 101), (50, 99)) == {50: 51, 99: 100}
+    assert loadtest.percentiles([]) == {}
+
+
+def test_fake_servers_behave_like_real_apis():
+    now = time.time()
+    practicum = FakePracticum()
+    practicum.add('token', Homework('old', [(now - 100, 'approved')]))
+    practicum.add('token', Homework('new', [(now - 1, 'reviewing'),
+                                            (now + 100, 'approved')]))
+    telegram = FakeTelegram(chat_interval=10)
+
+    async def scenario():
+        runner, base = await start(create_app(practicum, telegram))
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                    base + PRACTICUM_PATH,
+                    headers={'Authorization': 'OAuth token'},
+                    params={'from_date': int(now - 10)}
+                ) as response:
+                    statuses = await response.json()
+                codes = []
+                for _ in range(2):
+                    async with session.post(
+                        base + TELEGRAM_PATH.format(token='1',
+                                                    method='sendMessage'),
+                        json={'chat_id': 1, 'text': 'привет'}
+                    ) as response:
+                        codes.append(response.status)
+                return statuses, codes
+        finally:
+            await runner.cleanup()
+    statuses, codes = asyncio.run(scenario())
+    assert [(homework['homework_name'], homework['status'])
+            for homework in statuses['homeworks']] == [('new', 'reviewing')]
+    assert codes == [200, 429], (
+        'Поддельный Telegram должен ограничивать частоту сообщений в чат.'
+    )
+
+
+def test_run_load_reports_latency(monkeypatch, tmp_path):
+    default_db = tmp_path / 'bot_state.sqlite3'
+    monkeypatch.setattr(tenants, 'STATE_DB', str(default_db))
+    original = (async_bot.ENDPOINT, async_bot.TELEGRAM_API,
+               tenants.TELEGRAM_TOKEN)
+    report = asyncio.run(loadtest.run_load(
+        50, duration=1.5, period=0.1, review_time=0.3, seed=1))
+    assert report['tenants'] == 50
+    assert report['polls'] > 50
+    assert 0 < report['delivered'] <= report['expected']
+    assert set(report['latency']) == set(loadtest.PERCENTILES)
+    assert 0 <= report['latency'][50] <= report['latency_max']
+    assert 'Задержка уведомления' in loadtest.format_report(report)
+    assert not default_db.exists(), (
+        'Нагрузочный прогон не должен писать в рабочую базу бота.'
+    )
+    assert (async_bot.ENDPOINT, async_bot.TELEGRAM_API,
+            tenants.TELEGRAM_TOKEN) == original, (
+        'После прогона бот должен снова смотреть на настоящие API.'
+    )
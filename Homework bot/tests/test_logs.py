@@ -0,0 +1,73 @@
+import asyncio
+import contextvars
+import json
+import logging
+
+import pytest
+
+import logs
+
+
+@pytest.fixture
+def json_log(tmp_path):
+    path = tmp_path / 'bot.log'
+    logger = logging.getLogger('test_logs')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    listeners = []
+
+    def start(**kwargs):
+        listeners.append(logs.setup_logging(
+            logger, logs.file_handler(str(path), **kwargs)))
+        return logger
+
+    def records():
+        listeners[0].stop()
+        lines = path.read_text(encoding='utf-8').splitlines()
+        return [json.loads(line) for line in lines]
+    yield start, records
+    for listener in listeners:
+        listener.stop()
+    logger.handlers.clear()
+
+
+def test_records_are_json_with_tenant(json_log):
+    start, records = json_log
+    logger = start()
+
+    async def poll(name):
+        logs.current_tenant.set(name)
+        await asyncio.sleep(0)
+        logger.info('опрос', extra={'status': 200})
+
+    async def scenario():
+        await asyncio.gather(poll('аня'), poll('боря'))
+    asyncio.run(scenario())
+    contextvars.Context().run(logger.warning, 'без студента')
+    first, second, third = records()
+    assert {first['tenant'], second['tenant']} == {'аня', 'боря'}, (
+        'Каждая задача asyncio должна писать своего студента.'
+    )
+    assert first['message'] == 'опрос' and first['status'] == 200
+    assert first['level'] == 'INFO' and first['logger'] == 'test_logs'
+    assert third['tenant'] is None
+
+
+def test_log_file_is_rotated(json_log, tmp_path):
+    start, records = json_log
+    logger = start(max_bytes=300, backups=2)
+    for index in range(20):
+        logger.info(f'сообщение {index}')
+    records()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'bot.log', 'bot.log.1', 'bot.log.2']
+
+
+def test_homework_logger_still_propagates(caplog):
+    import homework
+
+    with caplog.at_level(logging.ERROR):
+        homework.logger.error('сбой')
+    assert [record.message for record in caplog.records] == ['сбой'], (
+        'Записи должны доходить и до обработчиков корневого логгера.'
+    )
@@ -0,0 +1,84 @@
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+import requests
+
+import homework
+import metrics
+import utils
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(metrics, 'REGISTRY', [])
+    return metrics.REGISTRY
+
+
+def test_render_text_format(registry):
+    counter = metrics.Counter('requests_total', 'Запросы', ['code'])
+    counter.inc('200')
+    counter.inc('200')
+    counter.inc('a"b')
+    histogram = metrics.Histogram('latency_seconds', 'Задержка',
+                                  buckets=(0.1, 1, float('inf')))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    metrics.Gauge('up', 'Работает', lambda: 1)
+    assert len(registry) == 3
+    assert metrics.render().splitlines() == [
+        '# HELP requests_total Запросы',
+        '# TYPE requests_total counter',
+        'requests_total{code="200"} 2',
+        'requests_total{code="a\\"b"} 1',
+        '# HELP latency_seconds Задержка',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        'latency_seconds_sum 5.55',
+        'latency_seconds_count 3',
+        '# HELP up Работает',
+        '# TYPE up gauge',
+        'up 1',
+    ]
+
+
+def test_get_api_answer_is_measured(monkeypatch):
+    def get(*args, **kwargs):
+        return utils.MockResponseGET(http_status=200)
+
+    monkeypatch.setattr(requests, 'get', get)
+    before = (metrics.API_RESPONSES.value('200'), metrics.API_LATENCY.count)
+    homework.get_api_answer(0)
+    assert (metrics.API_RESPONSES.value('200'),
+            metrics.API_LATENCY.count) == (before[0] + 1, before[1] + 1)
+    assert 0 <= metrics.SINCE_LAST_POLL.value() < 5
+
+
+def test_check_response_failures_are_counted():
+    before = metrics.CHECK_FAILURES.value('no_homeworks')
+    with pytest.raises(Exception):
+        homework.check_response({'current_date': 0})
+    assert metrics.CHECK_FAILURES.value('no_homeworks') == before + 1
+
+
+def test_metrics_endpoint():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = metrics.start_server(port)
+    try:
+        url = f'http://127.0.0.1:{port}'
+        with urllib.request.urlopen(url + '/metrics') as response:
+            body = response.read().decode('utf-8')
+            assert response.headers['Content-Type'].startswith('text/plain')
+        assert '# TYPE homework_api_request_seconds histogram' in body
+        assert 'homework_seconds_since_last_poll' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + '/other')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert metrics.start_server(0) is None
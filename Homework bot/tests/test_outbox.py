@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+import fake_servers  # noqa: E402
+import outbox  # noqa: E402
+from exceptions import TelegramSendError  # noqa: E402
+from storage import StateStore  # noqa: E402
+
+
+class FakeTelegram(fake_servers.FakeTelegram):
+    """Отправка без HTTP, которая может задерживаться и отказывать."""
+
+    def __init__(self, failures=(), delay=0):
+        super().__init__()
+        self.failures = list(failures)
+        self.delay = delay
+
+    async def __call__(self, chat_id, message):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        await self.send(chat_id, message)
+
+
+async def deliver(box, seconds):
+    stop = asyncio.Event()
+    task = asyncio.create_task(box.run(stop))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.wait_for(task, 1)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(outbox, 'backoff', lambda attempt: 0)
+
+
+def test_messages_to_one_chat_are_coalesced():
+    telegram = FakeTelegram()
+
+    async def scenario():
+        box = outbox.Outbox(telegram, chat_interval=0.2)
+        for text in ('первое', 'второе', 'третье'):
+            box.put(1, text)
+        box.put(2, 'другой чат')
+        await deliver(box, 0.1)
+        return box
+    box = asyncio.run(scenario())
+    assert sorted(telegram.messages[index][:2] for index in range(2)) == [
+        (1, 'первое\n\nвторое\n\nтретье'), (2, 'другой чат')
+    ], 'Сообщения одного чата должны уходить одним сообщением.'
+    assert len(box) == 0
+
+
+def test_rate_limits_are_respected():
+    telegram = FakeTelegram()
+
+    async def scenario():
+        box = outbox.Outbox(telegram, chat_interval=0.1, global_rate=50)
+        box.put(1, 'раз')
+        await asyncio.sleep(0)
+        for chat_id in range(2, 7):
+            box.put(chat_id, 'всем')
+        task = asyncio.create_task(deliver(box, 0.4))
+        await asyncio.sleep(0.01)
+        box.put(1, 'два')
+        await task
+    asyncio.run(scenario())
+    times = sorted(sent for _, _, sent in telegram.messages)
+    assert len(times) == 7
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.018, (
+        'Между любыми сообщениями должно пройти не меньше 1/global_rate.'
+    )
+    first, second = [sent for chat_id, _, sent in telegram.messages
+                     if chat_id == 1]
+    assert second - first >= 0.1, (
+        'В один чат нельзя писать чаще раза в chat_interval.'
+    )
+
+
+def test_failed_delivery_is_retried_and_honors_retry_after():
+    telegram = FakeTelegram([ConnectionError('нет сети'),
+                             TelegramSendError('Too Many Requests', 429,
+                                               retry_after=0.2)])
+
+    async def scenario():
+        box = outbox.Outbox(telegram, chat_interval=0)
+        box.put(1, 'привет')
+        started = time.time()
+        await deliver(box, 0.5)
+        return started
+    started = asyncio.run(scenario())
+    assert [message for _, message, _ in telegram.messages] == ['привет']
+    assert telegram.messages[0][2] - started >= 0.2
+
+
+def test_permanent_error_drops_message():
+    telegram = FakeTelegram([TelegramSendError('chat not found', 400)])
+    store = StateStore(':memory:')
+
+    async def scenario():
+        box = outbox.Outbox(telegram, store, chat_interval=0)
+        box.put(1, 'потеряется')
+        await deliver(box, 0.1)
+        return box
+    assert len(asyncio.run(scenario())) == 0
+    assert telegram.messages == []
+    assert store.pending_messages() == []
+
+
+def test_undelivered_messages_survive_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+
+    async def first_run():
+        box = outbox.Outbox(FakeTelegram([ConnectionError()] * 100), store,
+                            chat_interval=0)
+        box.put(42, 'не дошло')
+        await deliver(box, 0.05)
+
+    store = StateStore(path)
+    asyncio.run(first_run())
+    store.close()
+
+    telegram = FakeTelegram()
+
+    async def second_run():
+        await deliver(outbox.Outbox(telegram, store), 0.05)
+
+    store = StateStore(path)
+    asyncio.run(second_run())
+    assert [sent[:2] for sent in telegram.messages] == [(42, 'не дошло')]
+    assert store.pending_messages() == []
+
+
+def test_slow_telegram_does_not_delay_polling(fake_apis):
+    import aiohttp
+
+    import async_bot
+
+    telegram = FakeTelegram(delay=0.5)
+    apis = fake_apis([{'homework_name': 'hw', 'status': 'approved'}])
+
+    async def scenario():
+        box = outbox.Outbox(telegram)
+        async with apis, aiohttp.ClientSession() as session:
+            started = time.monotonic()
+            await async_bot.check_once(session, async_bot.new_state(),
+                                       'token', '1234:abc', 42, box)
+            return time.monotonic() - started, len(box)
+    elapsed, queued = asyncio.run(scenario())
+    assert elapsed < 0.5
+    assert queued == 1
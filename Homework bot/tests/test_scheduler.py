@@ -0,0 +1,64 @@
+import pytest
+import requests
+
+import homework
+import utils
+from exceptions import RateLimitError
+from scheduler import Scheduler, parse_retry_after
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120),
+    ('-5', 0),
+    ('Thu, 01 Jan 1970 00:02:00 GMT', 60),
+    ('когда-нибудь', None),
+    (None, None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value, now=60) == expected
+
+
+def test_idle_polls_back_off_up_to_max():
+    scheduler = Scheduler(600, max_period=3600)
+    delays = [scheduler.next_delay({'hw': 'approved'}) for _ in range(5)]
+    assert delays == [600, 1200, 2400, 3600, 3600], (
+        'Первый интервал должен быть RETRY_PERIOD, дальше - расти вдвое '
+        'до MAX_PERIOD.'
+    )
+    assert scheduler.next_delay({'hw': 'approved'}, changed=True) == 600
+
+
+def test_reviewing_tightens_interval():
+    scheduler = Scheduler(600, active_period=120)
+    for _ in range(3):
+        scheduler.next_delay({})
+    assert scheduler.next_delay({'hw1': 'approved',
+                                 'hw2': 'reviewing'}) == 120
+    assert scheduler.next_delay({'hw2': 'approved'}) == 600, (
+        'После вердикта интервал должен вернуться к RETRY_PERIOD.'
+    )
+    assert Scheduler(10, active_period=120).next_delay(
+        {'hw': 'reviewing'}) == 10
+
+
+def test_rate_limit_honors_retry_after():
+    scheduler = Scheduler(600, max_period=3600)
+    assert scheduler.next_delay({}, error=RateLimitError()) == 600
+    assert scheduler.next_delay({}, error=RateLimitError()) == 1200
+    assert scheduler.next_delay({}, error=RateLimitError(7200)) == 7200, (
+        'Пауза из Retry-After должна соблюдаться, даже если она больше '
+        'MAX_PERIOD.'
+    )
+    assert scheduler.next_delay({}, error=ValueError()) == 600
+
+
+def test_get_api_answer_raises_on_429(monkeypatch):
+    def get(*args, **kwargs):
+        response = utils.MockResponseGET(http_status=429)
+        response.headers = {'Retry-After': '30'}
+        return response
+
+    monkeypatch.setattr(requests, 'get', get)
+    with pytest.raises(RateLimitError) as error:
+        homework.get_api_answer(0)
+    assert error.value.retry_after == 30
@@ -0,0 +1,165 @@
+import time
+
+import pytest
+import requests
+import telegram
+
+import homework
+import scheduler
+import utils
+from storage import StateStore
+
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    store = StateStore(path)
+    assert store.from_date('1', 100) == 100
+    assert store.status('1', 'hw') is None
+    store.set_status('1', 'hw', 'reviewing')
+    store.set_status('1', 'hw', 'approved')
+    store.save_cursor('1', 200, 'Сбой')
+    store.close()
+
+    store = StateStore(path)
+    assert store.from_date('1', 100) == 200
+    assert store.last_error('1') == 'Сбой'
+    assert store.status('1', 'hw') == 'approved'
+    assert store.statuses('1') == {'hw': 'approved'}
+    assert store.statuses('2') == {}, (
+        'Состояние разных пользователей не должно смешиваться.'
+    )
+
+
+class BotRun:
+    """Один запуск main() до первого time.sleep()."""
+
+    def __init__(self, monkeypatch, homeworks, fail=False, bot=None):
+        self.requests = []
+        self.messages = []
+
+        def get(url, headers=None, params=None, timeout=None):
+            self.requests.append(params['from_date'])
+            if fail:
+                raise requests.ConnectionError('нет сети')
+            return utils.MockResponseGET(http_status=200)
+
+        def fake_json(response):
+            return {'homeworks': homeworks, 'current_date': 0}
+
+        def stop(seconds):
+            self.delay = seconds
+            raise utils.BreakInfiniteLoop
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(utils.MockResponseGET, 'json', fake_json)
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', bot or utils.MockTelegramBot)
+        if bot is None:
+            monkeypatch.setattr(homework, 'send_message',
+                                lambda bot, message: self.messages.append(
+                                    message) or True)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework.main()
+
+
+@pytest.fixture
+def bot_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(homework, 'STATE_DB', str(tmp_path / 'state.db'))
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+
+
+def test_main_resumes_after_restart(bot_env, monkeypatch):
+    homeworks = [{'homework_name': 'hw', 'status': 'reviewing'}]
+    first = BotRun(monkeypatch, homeworks)
+    assert len(first.messages) == 1
+    assert first.delay == scheduler.ACTIVE_PERIOD, (
+        'Пока работа на проверке, опрос должен идти чаще.'
+    )
+
+    second = BotRun(monkeypatch, homeworks)
+    assert second.messages == [], (
+        'После перезапуска известный статус не должен отправляться снова.'
+    )
+    assert second.requests[0] >= first.requests[0], (
+        'После перезапуска from_date должен браться из сохранённого '
+        'состояния.'
+    )
+
+
+def test_main_keeps_from_date_when_request_fails(bot_env, monkeypatch):
+    store = StateStore(homework.STATE_DB)
+    store.save_cursor(str(homework.TELEGRAM_CHAT_ID), 12345)
+    store.close()
+
+    BotRun(monkeypatch, [], fail=True)
+    after_failure = BotRun(monkeypatch, [])
+    assert after_failure.requests == [12345], (
+        'Если запрос не удался, from_date не должен сдвигаться.'
+    )
+
+
+def test_main_sends_all_changes_in_one_message(bot_env, monkeypatch):
+    first = BotRun(monkeypatch, [
+        {'homework_name': 'hw1', 'status': 'reviewing'},
+        {'homework_name': 'hw2', 'status': 'approved'},
+    ])
+    assert len(first.messages) == 1, (
+        'Изменения всех работ должны приходить одним сообщением.'
+    )
+    assert 'hw1' in first.messages[0] and 'hw2' in first.messages[0]
+
+    second = BotRun(monkeypatch, [
+        {'homework_name': 'hw1', 'status': 'rejected'},
+        {'homework_name': 'hw2', 'status': 'approved'},
+    ])
+    assert len(second.messages) == 1
+    assert 'hw1' in second.messages[0]
+    assert 'hw2' not in second.messages[0], (
+        'Работа с прежним статусом не должна попадать в сообщение.'
+    )
+
+
+def test_main_empty_homeworks_is_not_error(bot_env, monkeypatch):
+    run = BotRun(monkeypatch, [])
+    assert run.messages == [], (
+        'Пустой список работ - обычная ситуация, а не ошибка.'
+    )
+
+
+def test_main_reports_bad_homework_and_sends_the_rest(bot_env, monkeypatch):
+    run = BotRun(monkeypatch, [
+        {'homework_name': 'hw1', 'status': 'unknown'},
+        {'homework_name': 'hw2', 'status': 'approved'},
+    ])
+    assert len(run.messages) == 2
+    assert 'hw2' in run.messages[0]
+    assert run.messages[1].startswith('Сбой в работе программы')
+
+
+class OfflineBot(utils.MockTelegramBot):
+    """Бот, у которого любая отправка заканчивается ошибкой сети."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        raise telegram.error.NetworkError('нет сети')
+
+
+def test_main_keeps_changes_when_send_fails(bot_env, monkeypatch):
+    store = StateStore(homework.STATE_DB)
+    store.save_cursor(str(homework.TELEGRAM_CHAT_ID), 12345)
+    store.close()
+    homeworks = [{'homework_name': 'hw1', 'status': 'approved'}]
+
+    BotRun(monkeypatch, homeworks, bot=OfflineBot)
+    store = StateStore(homework.STATE_DB)
+    assert store.statuses(str(homework.TELEGRAM_CHAT_ID)) == {}, (
+        'Статус, о котором не удалось сообщить, не должен сохраняться.'
+    )
+    store.close()
+
+    retry = BotRun(monkeypatch, homeworks)
+    assert retry.requests == [12345], (
+        'Если сообщение не ушло, from_date не должен сдвигаться.'
+    )
+    assert len(retry.messages) == 1 and 'hw1' in retry.messages[0]
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+import tenants  # noqa: E402
+
+
+def write_table(tmp_path, text):
+    path = tmp_path / 'tenants.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_load_tenants(tmp_path):
+    path = write_table(tmp_path, 'practicum_token,chat_id,name\n'
+                                 'aaa,1,Аня\nbbb,2,\n')
+    loaded = tenants.load_tenants(path)
+    assert [(tenant.practicum_token, tenant.chat_id, tenant.name)
+            for tenant in loaded] == [('aaa', '1', 'Аня'), ('bbb', '2', '2')]
+    assert loaded[0].state is not loaded[1].state, (
+        'У каждого студента должно быть своё состояние опроса.'
+    )
+
+
+@pytest.mark.parametrize('text', [
+    'practicum_token,chat_id\naaa,\n',
+    'practicum_token,chat_id\naaa,1\naaa,2\n',
+    'practicum_token,chat_id\naaa,1\nbbb,1\n',
+])
+def test_load_tenants_rejects_bad_rows(tmp_path, text):
+    with pytest.raises(ValueError):
+        tenants.load_tenants(write_table(tmp_path, text))
+
+
+def test_start_offsets_spread_over_period():
+    assert tenants.start_offsets(4, 600) == [0, 150, 300, 450]
+
+
+def approved(tokens):
+    return {token: [{'homework_name': token, 'status': 'approved'}]
+            for token in tokens}
+
+
+def test_run_polls_every_tenant(fake_apis, monkeypatch):
+    monkeypatch.setattr(tenants, 'TELEGRAM_TOKEN', '1234:abc')
+    students = [tenants.Tenant(f'token{index}', index)
+                for index in range(30)]
+    apis = fake_apis(approved(f'token{index}' for index in range(30)),
+                     latency=0.01)
+
+    async def scenario():
+        stop = asyncio.Event()
+        async with apis:
+            task = asyncio.create_task(tenants.run(
+                students, stop, period=0.3, max_concurrency=5,
+                global_rate=1000))
+            await asyncio.sleep(0.5)
+            stop.set()
+            await task
+    asyncio.run(scenario())
+    assert {message['chat_id'] for message in apis.messages} == set(
+        range(30)), 'Каждый студент должен получить уведомление.'
+    assert len(apis.messages) == 30, (
+        'Повторный опрос без смены статуса не должен давать сообщений.'
+    )
+    for message in apis.messages:
+        assert f'"token{message["chat_id"]}"' in message['text']
+    assert apis.practicum.max_in_flight <= 5, (
+        'Одновременных запросов не должно быть больше max_concurrency.'
+    )
+    first = sorted(request['time'] for request in apis.requests)[:30]
+    assert first[-1] - first[0] > 0.2, (
+        'Первые опросы должны быть разнесены по периоду, а не идти пачкой.'
+    )
+
+
+def test_run_keeps_state_between_runs(fake_apis, monkeypatch, tmp_path):
+    monkeypatch.setattr(tenants, 'TELEGRAM_TOKEN', '1234:abc')
+    path = str(tmp_path / 'state.sqlite3')
+    apis = fake_apis(approved(f'token{index}' for index in range(3)))
+
+    async def scenario():
+        stop = asyncio.Event()
+        students = [tenants.Tenant(f'token{index}', index)
+                    for index in range(3)]
+        async with apis:
+            task = asyncio.create_task(tenants.run(
+                students, stop, period=0.1, global_rate=1000,
+                state_db=path))
+            await asyncio.sleep(0.3)
+            stop.set()
+            await task
+    asyncio.run(scenario())
+    asyncio.run(scenario())
+    assert len(apis.messages) == 3, (
+        'После перезапуска известные статусы не должны отправляться снова.'
+    )
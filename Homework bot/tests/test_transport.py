@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+import transport  # noqa: E402
+from exceptions import EndpointError, RateLimitError  # noqa: E402
+from fake_servers import (PRACTICUM_PATH, FakePracticum,  # noqa: E402
+                          FakeTelegram, Homework, create_app, start)
+
+BACKOFF = transport.backoff
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+async def serve(statuses, scenario):
+    """Запустить API Практикума, отвечающий сначала кодами из statuses."""
+    practicum = FakePracticum(retry_after=7)
+    practicum.add('token', Homework('hw', [(0, 'approved')]))
+    practicum.script(*statuses)
+    runner, base = await start(create_app(practicum, FakeTelegram()))
+    stats = transport.ConnectionStats()
+    try:
+        async with transport.create_session(stats) as session:
+            result = await scenario(session, base + PRACTICUM_PATH)
+    finally:
+        await runner.cleanup()
+    return result, stats, [entry['status'] for entry in practicum.log]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transport, 'backoff', lambda attempt: 0)
+
+
+def test_retries_server_errors():
+    async def scenario(session, url):
+        return await transport.request_json(session, 'GET', url,
+                                            headers=HEADERS)
+    result, stats, calls = asyncio.run(serve([500, 503, 200], scenario))
+    assert result['homeworks'][0]['homework_name'] == 'hw'
+    assert calls == [500, 503, 200]
+    assert stats.retries == 2
+
+
+def test_gives_up_after_retries():
+    async def scenario(session, url):
+        with pytest.raises(EndpointError):
+            await transport.request_json(session, 'GET', url, retries=2)
+    _, _, calls = asyncio.run(serve([502] * 3, scenario))
+    assert len(calls) == 3
+
+
+def test_rate_limit_is_left_to_scheduler():
+    async def scenario(session, url):
+        with pytest.raises(RateLimitError) as error:
+            await transport.request_json(session, 'GET', url)
+        return error.value.retry_after
+    retry_after, _, calls = asyncio.run(serve([429], scenario))
+    assert retry_after == 7
+    assert calls == [429], 'Ответ 429 не должен повторяться сразу.'
+
+
+def test_client_errors_are_not_retried():
+    async def scenario(session, url):
+        with pytest.raises(EndpointError):
+            await transport.request_json(session, 'GET', url)
+    _, _, calls = asyncio.run(serve([401, 200], scenario))
+    assert calls == [401], 'Ответы 4xx не должны повторяться.'
+
+
+def test_connection_errors_are_retried():
+    async def scenario():
+        async with transport.create_session() as session:
+            await transport.request_json(session, 'GET',
+                                         'http://127.0.0.1:9/', retries=1)
+    with pytest.raises(transport.RETRY_ERRORS):
+        asyncio.run(scenario())
+
+
+def test_connections_are_reused():
+    async def scenario(session, url):
+        for _ in range(5):
+            await transport.request_json(session, 'GET', url,
+                                         headers=HEADERS)
+    _, stats, _ = asyncio.run(serve([], scenario))
+    assert stats.requests == 5
+    assert stats.created == 1
+    assert stats.reused == 4, (
+        'Запросы должны идти через соединение из пула.'
+    )
+
+
+def test_backoff_is_bounded():
+    for attempt in range(10):
+        limit = min(transport.BACKOFF_CAP,
+                    transport.BACKOFF_BASE * 2 ** attempt)
+        delays = [BACKOFF(attempt) for _ in range(50)]
+        assert all(0 <= delay <= limit for delay in delays)
+        assert len(set(delays)) > 1, 'Задержка должна быть случайной.'
@@ -0,0 +1,117 @@
+"""Общая HTTP-сессия асинхронного бота: пул соединений, таймауты, повторы.
+
+Одна сессия aiohttp на процесс держит keep-alive соединения с API
+Практикума и Telegram, поэтому опросы всех студентов не платят за
+установку TCP и TLS каждый раз. Таймауты на соединение и на чтение
+настраиваются переменными окружения CONNECT_TIMEOUT и READ_TIMEOUT.
+Ответы 5xx и сетевые ошибки повторяются с экспоненциальной задержкой
+и случайным разбросом (full jitter), чтобы повторы разных студентов
+не совпадали во времени.
+"""
+import asyncio
+import random
+from http import HTTPStatus
+
+import aiohttp
+
+from exceptions import EndpointError, RateLimitError
+from homework import CONNECT_TIMEOUT, READ_TIMEOUT, logger
+from metrics import API_RESPONSES
+from scheduler import parse_retry_after
+
+POOL_SIZE = 100
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30
+RETRY_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class ConnectionStats:
+    """Счётчики запросов, повторов и новых/повторных соединений."""
+
+    def __init__(self):
+        """Обнуляет счётчики."""
+        self.requests = 0
+        self.retries = 0
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self):
+        """Создаёт TraceConfig aiohttp, обновляющий счётчики."""
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self.on_request)
+        trace.on_connection_create_end.append(self.on_created)
+        trace.on_connection_reuseconn.append(self.on_reused)
+        return trace
+
+    async def on_request(self, session, context, params):
+        """Учитывает отправленный запрос и повтор."""
+        self.requests += 1
+        if (context.trace_request_ctx or {}).get('attempt'):
+            self.retries += 1
+
+    async def on_created(self, session, context, params):
+        """Учитывает новое соединение."""
+        self.created += 1
+
+    async def on_reused(self, session, context, params):
+        """Учитывает соединение, взятое из пула."""
+        self.reused += 1
+
+    def summary(self):
+        """Сводка для лога."""
+        return (f'запросов: {self.requests}, повторов: {self.retries}, '
+                f'новых соединений: {self.created}, '
+                f'из пула: {self.reused}')
+
+
+def create_session(stats=None, pool_size=POOL_SIZE,
+                   connect_timeout=CONNECT_TIMEOUT,
+                   read_timeout=READ_TIMEOUT):
+    """Создаёт общую сессию с пулом соединений и таймаутами."""
+    connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                    sock_read=read_timeout)
+    trace_configs = [stats.trace_config()] if stats else []
+    return aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                 trace_configs=trace_configs)
+
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Случайная задержка перед повтором номер attempt, считая с нуля."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def request_json(session, method, url, retries=MAX_RETRIES,
+                       **kwargs):
+    """Выполняет запрос с повторами и возвращает разобранный JSON.
+
+    Повторяются ответы 5xx и ошибки соединения. Ответ 429 сразу даёт
+    RateLimitError с паузой из Retry-After: её соблюдает планировщик
+    опросов. Остальные коды, кроме 200, сразу дают EndpointError.
+    """
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        try:
+            async with session.request(
+                method, url, trace_request_ctx={'attempt': attempt}, **kwargs
+            ) as response:
+                API_RESPONSES.inc(str(response.status))
+                if response.status == HTTPStatus.OK:
+                    return await response.json(content_type=None)
+                if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+                    raise RateLimitError(parse_retry_after(
+                        response.headers.get('Retry-After')))
+                if response.status < 500 or last:
+                    raise EndpointError(
+                        f'Неверный код ответа {response.status}')
+                reason = f'код {response.status}'
+        except RETRY_ERRORS as error:
+            API_RESPONSES.inc('error')
+            if last:
+                raise
+            reason = repr(error)
+        delay = backoff(attempt)
+        logger.warning(f'Запрос {url} не удался ({reason}), '
+                       f'повтор через {delay:.2f} с')
+        await asyncio.sleep(delay)